@@ -29,6 +29,7 @@ from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
+import httpx
 import numpy as np
 from PIL import Image
 from pydantic import ConfigDict
@@ -38,6 +39,8 @@ from fieldworkarena.log.fwa_logger import getLogger
 
 logger = getLogger(__name__)
 
+FILE_URI_TIMEOUT = 300
+
 
 class A2ARunConfig(RunConfig):
     """Custom override of ADK RunConfig to smuggle extra data through the event loop."""
@@ -130,7 +133,7 @@ class PurpleExecutor(AgentExecutor):
         logger.info(f"[Agent] Processing task {task.id} for user {user_id}")
         logger.info("====================================================")
         await self._process_request(
-            types.UserContent(parts=convert_a2a_parts_to_agent_input(context.message.parts)),
+            types.UserContent(parts=await convert_a2a_parts_to_agent_input(context.message.parts)),
             task.context_id,
             updater,
         )
@@ -147,23 +150,28 @@ class PurpleExecutor(AgentExecutor):
         raise ServerError(error=UnsupportedOperationError())
 
 
-def convert_a2a_parts_to_agent_input(parts: list[Part]) -> list[types.Part]:
+async def convert_a2a_parts_to_agent_input(parts: list[Part]) -> list[types.Part]:
     """Convert a list of A2A Part types into a list of Agent Input"""
     result = []
-    for part in parts:
-        converted = convert_a2a_part_to_agent_input(part)
-        # convert_a2a_part_to_agent_input may return a list for video files
-        if isinstance(converted, list):
-            result.extend(converted)
-        else:
-            result.append(converted)
+    # the files sent by URI in a message are fetched over the same connections
+    async with httpx.AsyncClient() as client:
+        for part in parts:
+            converted = await convert_a2a_part_to_agent_input(part, client)
+            # convert_a2a_part_to_agent_input may return a list for video files
+            if isinstance(converted, list):
+                result.extend(converted)
+            else:
+                result.append(converted)
     return result
 
 
-def convert_a2a_part_to_agent_input(part: Part) -> types.Part | list[types.Part]:
+async def convert_a2a_part_to_agent_input(
+    part: Part, client: httpx.AsyncClient | None = None
+) -> types.Part | list[types.Part]:
     """Convert a single A2A Part type into an Agent Input
     Args:
         part (Part): The A2A Part to convert, which can be TextPart and FilePart in FWA benchmark.
+        client (httpx.AsyncClient | None): Client fetching the files sent by URI.
 
     Returns:
         types.Part | list[types.Part]: For images/PDFs, returns single types.Part.
@@ -175,11 +183,12 @@ def convert_a2a_part_to_agent_input(part: Part) -> types.Part | list[types.Part]
         logger.info(f"🎯Task Goal:\n{unwrapped_part.text}")
         return types.Part(text=unwrapped_part.text)
     if isinstance(unwrapped_part, FilePart):
-        if isinstance(unwrapped_part.file, FileWithUri):
-            # FWA don't use FileWithUri, but just in case
-            raise ValueError(f"Unsupported file type: {type(unwrapped_part.file)}")
-        if isinstance(unwrapped_part.file, FileWithBytes):
-            file_data = unwrapped_part.file.bytes
+        if isinstance(unwrapped_part.file, (FileWithBytes, FileWithUri)):
+            if isinstance(unwrapped_part.file, FileWithUri):
+                # large inputs are served by the green agent and fetched by URI
+                file_data = await fetch_file_uri(unwrapped_part.file.uri, client)
+            else:
+                file_data = unwrapped_part.file.bytes
             mime_type = unwrapped_part.file.mime_type
             file_name = unwrapped_part.file.name
             logger.info(
@@ -302,6 +311,27 @@ def convert_a2a_part_to_agent_input(part: Part) -> types.Part | list[types.Part]
     raise ValueError(f"Unsupported part type: {type(unwrapped_part)}")
 
 
+async def fetch_file_uri(
+    uri: str, client: httpx.AsyncClient | None = None, timeout: float = FILE_URI_TIMEOUT
+) -> bytes:
+    """Fetch the content of a FileWithUri.
+    Args:
+        uri: URI of the file, served by the green agent
+        client: Client sending the request. A client is created and closed if not given.
+        timeout: Timeout of the request in seconds
+
+    Returns:
+        bytes: File content
+    """
+    if client is None:
+        async with httpx.AsyncClient() as client:
+            return await fetch_file_uri(uri, client, timeout)
+    logger.info(f"Fetching file from URI: {uri}")
+    response = await client.get(uri, timeout=timeout)
+    response.raise_for_status()
+    return response.content
+
+
 def process_video_to_parts(
     video_data: bytes | str, file_name: str, seconds_per_frame: int = 1
 ) -> list[types.Part]:
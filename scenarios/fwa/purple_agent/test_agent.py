@@ -23,6 +23,7 @@ from google.adk.agents import Agent
 from purple_executor import PurpleExecutor
 from utils.helpers import get_litellm_model, load_yaml_config
 
+from fieldworkarena.agent_core.compression import DecompressionMiddleware, compression_extension
 from fieldworkarena.log.fwa_logger import getLogger, set_logger
 
 set_logger()
@@ -65,7 +66,8 @@ def main():
         version="1.0.0",
         default_input_modes=["text", "text/plain", "application/pdf", "image/jpeg", "video/mp4"],
         default_output_modes=["text", "text/plain"],
-        capabilities=AgentCapabilities(streaming=True),
+        # request bodies compressed by the green agent are accepted (see DecompressionMiddleware)
+        capabilities=AgentCapabilities(streaming=True, extensions=[compression_extension()]),
         skills=[skill],
     )
     request_handler = DefaultRequestHandler(
@@ -73,9 +75,11 @@ def main():
     )
 
     server = A2AStarletteApplication(agent_card=agent_card, http_handler=request_handler)
+    app = server.build()
+    app.add_middleware(DecompressionMiddleware)
 
     logger.info("[Agent] Starting Test Purple Agent A2A server")
-    uvicorn.run(server.build(), host=args.host, port=args.port)
+    uvicorn.run(app, host=args.host, port=args.port)
 
 
 if __name__ == "__main__":
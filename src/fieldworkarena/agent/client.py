@@ -15,7 +15,7 @@ from a2a.types import (
 )
 from pydantic import HttpUrl
 
-from fieldworkarena.agent_core.client_utils import send_message
+from fieldworkarena.agent_core.client_utils import close_client_registry, send_message
 from fieldworkarena.agent_core.models import EvalRequest
 from fieldworkarena.log.fwa_logger import getLogger, set_logger
 
@@ -31,14 +31,19 @@ def parse_toml(cfg: dict[str, Any]) -> tuple[EvalRequest, str]:
 
     green_endpoint: str = green["endpoint"]
 
-    # collect participants
-    parts: dict[str, HttpUrl] = {}
+    # collect participants, the endpoints of participants sharing a role are its replicas
+    parts: dict[str, HttpUrl | list[HttpUrl]] = {}
     for p in cfg.get("participants", []):
         if isinstance(p, dict):
             role = p.get("role")
             endpoint = p.get("endpoint")
             if role and endpoint:
-                parts[role] = endpoint
+                if role not in parts:
+                    parts[role] = endpoint
+                elif isinstance(parts[role], list):
+                    parts[role].append(endpoint)
+                else:
+                    parts[role] = [parts[role], endpoint]
 
     # create Request for GreenAgent
     eval_req = EvalRequest(participants=parts, config=cfg.get("config", {}) or {})
@@ -113,7 +118,10 @@ async def main():
     msg = req.model_dump_json()
 
     # send eval request to GreenAgent
-    await send_message(msg, green_url, streaming=True, consumer=event_consumer)
+    try:
+        await send_message(msg, green_url, streaming=True, consumer=event_consumer)
+    finally:
+        await close_client_registry()
 
 
 if __name__ == "__main__":
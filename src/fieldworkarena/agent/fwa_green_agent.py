@@ -1,8 +1,12 @@
 import argparse
 import asyncio
+from collections.abc import Awaitable, Callable
 import contextlib
+import itertools
 import os
+from pathlib import Path
 import sys
+import time
 from typing import Any
 
 from a2a.server.apps import A2AStarletteApplication
@@ -10,6 +14,7 @@ from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore, TaskUpdater
 from a2a.types import (
     FileWithBytes,
+    FileWithUri,
     InvalidParamsError,
     Part,
     TaskState,
@@ -24,26 +29,80 @@ load_dotenv(override=True)
 
 from fieldworkarena.agent.common import FWAEval, get_fwa_green_agent_card
 import fieldworkarena.agent.metrics.automatic.automatic_evaluation as auto_eval
+from fieldworkarena.agent.metrics.automatic.batch_judge import FuzzyMatchBatcher
 from fieldworkarena.agent.metrics.tasks import (
     BenchmarkDataSource,
-    TaskLoader,
+    LocalDirectoryDataSource,
+    PayloadPrefetcher,
+    Task,
     build_goal,
+    get_task_loader,
 )
+from fieldworkarena.agent.metrics.tasks.data_source import DEFAULT_MAX_PARALLEL_FILES
+from fieldworkarena.agent.metrics.tasks.prefetcher import (
+    DEFAULT_PREFETCH_MAX_BYTES,
+    DEFAULT_PREFETCH_TASKS,
+)
+from fieldworkarena.agent_core.client_utils import close_client_registry, get_client_registry
 from fieldworkarena.agent_core.green_executor import GreenAgent, GreenExecutor
 from fieldworkarena.agent_core.models import EvalRequest, EvalResult
-from fieldworkarena.agent_core.purple_client import PurpleClient
+from fieldworkarena.agent_core.payload_server import PayloadServer
+from fieldworkarena.agent_core.purple_client import (
+    DEFAULT_HEDGE_DELAY,
+    DEFAULT_MAX_RETRIES,
+    PurpleClient,
+)
+from fieldworkarena.agent_core.replica_pool import (
+    DEFAULT_EJECT_SECONDS,
+    DEFAULT_MAX_FAILURES,
+    ReplicaPool,
+)
 from fieldworkarena.log.fwa_logger import getLogger, set_logger
 
 set_logger()
 logger = getLogger(__name__)
 
+# number of tasks evaluated at the same time unless overridden by config["concurrency"]
+DEFAULT_CONCURRENCY = 1
+
+# optional integer config keys and their minimum values
+OPTIONAL_INT_CONFIG_KEYS = {
+    "concurrency": 1,
+    "prefetch_tasks": 0,
+    "prefetch_max_bytes": 1,
+    "file_parallelism": 1,
+    "uri_threshold_bytes": 0,
+    "judge_batch_size": 1,
+    "video_deadline": 1,
+    "text_deadline": 1,
+    "max_retries": 0,
+    "hedge_delay": 0,
+    "replica_max_failures": 1,
+    "replica_eject_seconds": 0,
+}
+
+# optional boolean config keys
+OPTIONAL_BOOL_CONFIG_KEYS = ("streaming",)
+
+# responses are streamed from purple agents that support it unless config["streaming"] is false
+DEFAULT_STREAMING = True
+
+# seconds the purple agents may take to respond to a task with a video input file, or without,
+# unless overridden by config["video_deadline"] / config["text_deadline"]
+DEFAULT_VIDEO_DEADLINE = 900
+DEFAULT_TEXT_DEADLINE = 300
+
 
 class FWAGreenAgent(GreenAgent):
-    def __init__(self):
+    def __init__(self, payload_server: PayloadServer | None = None):
+        """
+        Args:
+            payload_server: Server of the payloads sent by URI (config.uri_threshold_bytes).
+        """
         self._required_roles = ["agent"]
         self._required_config_keys = ["target"]
-        self._client = PurpleClient()
         self._data_source = None
+        self._payload_server = payload_server
 
     def validate_request(self, request: EvalRequest) -> tuple[bool, str]:
         """Validate the EvalRequest."""
@@ -59,13 +118,64 @@ class FWAGreenAgent(GreenAgent):
         if missing_config_keys:
             return False, f"Missing config keys: {missing_config_keys}"
 
+        # validate the optional integer config values
+        for key, minimum in OPTIONAL_INT_CONFIG_KEYS.items():
+            if key not in request.config:
+                continue
+            value = request.config[key]
+            if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+                return False, f"Invalid {key}: {value} (must be an integer >= {minimum})"
+
+        # validate the optional boolean config values
+        for key in OPTIONAL_BOOL_CONFIG_KEYS:
+            if key in request.config and not isinstance(request.config[key], bool):
+                return False, f"Invalid {key}: {request.config[key]} (must be a boolean)"
+
+        # validate the second replicas of the participants for hedged requests
+        hedge_endpoints = request.config.get("hedge_endpoints", {})
+        if not isinstance(hedge_endpoints, dict) or not all(
+            isinstance(endpoint, str) for endpoint in hedge_endpoints.values()
+        ):
+            return False, f"Invalid hedge_endpoints: {hedge_endpoints} (must map roles to URLs)"
+        unknown_roles = set(hedge_endpoints) - set(request.participants.keys())
+        if unknown_roles:
+            return False, f"Unknown roles in hedge_endpoints: {unknown_roles}"
+
+        if "uri_threshold_bytes" in request.config and self._payload_server is None:
+            return False, "uri_threshold_bytes is set, but payloads cannot be served by URI"
+
+        # serve the data from a local mirror without network access if configured
+        local_data_dir = os.getenv("FWA_LOCAL_DATA_DIR")
+        if local_data_dir:
+            try:
+                if not isinstance(
+                    self._data_source, LocalDirectoryDataSource
+                ) or self._data_source.root_dir != Path(local_data_dir):
+                    self._data_source = LocalDirectoryDataSource(
+                        root_dir=local_data_dir,
+                        payload_store_dir=os.getenv("FWA_PAYLOAD_STORE_DIR") or None,
+                    )
+                self._data_source.validate_access()
+            except Exception as e:
+                return False, f"Local data directory validation failed: {e}"
+            return True, "ok"
+
         # validate the access token from environment variable
         access_token = os.getenv("HF_TOKEN")
         if not access_token:
             return False, "HF_TOKEN environment variable is not set"
 
         try:
-            self._data_source = BenchmarkDataSource(access_token=access_token)
+            # keep the data source (and its payload cache) across requests using the same token
+            if (
+                not isinstance(self._data_source, BenchmarkDataSource)
+                or isinstance(self._data_source, LocalDirectoryDataSource)
+                or self._data_source.access_token != access_token.strip()
+            ):
+                self._data_source = BenchmarkDataSource(
+                    access_token=access_token,
+                    payload_store_dir=os.getenv("FWA_PAYLOAD_STORE_DIR") or None,
+                )
             self._data_source.validate_access()
             logger.info("Access token validated successfully.")
         except Exception as e:
@@ -92,79 +202,111 @@ class FWAGreenAgent(GreenAgent):
             )
 
         try:
-            # Load task from json
-            tasks = TaskLoader()
-            tasks = tasks.extract_tasks(req.config["target"])
-            logger.info(f"Loaded tasks: {tasks}")
+            # Stream the tasks from the task index, reusing the tasks parsed for previous requests
+            loader = get_task_loader()
+            tasks = loader.iter_tasks(req.config["target"])
+            total_tasks = loader.count_tasks(req.config["target"])
+            logger.info(f"Loaded {total_tasks} tasks of target '{req.config['target']}'")
+
+            concurrency = int(req.config.get("concurrency", DEFAULT_CONCURRENCY))
+            prefetch_tasks = int(req.config.get("prefetch_tasks", DEFAULT_PREFETCH_TASKS))
+            prefetch_max_bytes = int(
+                req.config.get("prefetch_max_bytes", DEFAULT_PREFETCH_MAX_BYTES)
+            )
+            file_parallelism = int(req.config.get("file_parallelism", DEFAULT_MAX_PARALLEL_FILES))
+            uri_threshold_bytes = req.config.get("uri_threshold_bytes")
+            streaming = req.config.get("streaming", DEFAULT_STREAMING)
+            video_deadline = int(req.config.get("video_deadline", DEFAULT_VIDEO_DEADLINE))
+            text_deadline = int(req.config.get("text_deadline", DEFAULT_TEXT_DEADLINE))
+            max_retries = int(req.config.get("max_retries", DEFAULT_MAX_RETRIES))
+            hedge_delay = req.config.get("hedge_delay", DEFAULT_HEDGE_DELAY)
+            hedge_urls = {
+                url: endpoint
+                for role, endpoint in req.config.get("hedge_endpoints", {}).items()
+                for url in req.replica_urls(role)
+            }
+
+            def client_factory(task: Task) -> PurpleClient:
+                # video tasks get a longer deadline than text tasks
+                return PurpleClient(
+                    streaming=streaming,
+                    deadline=video_deadline if task.has_video else text_deadline,
+                    max_retries=max_retries,
+                    hedge_urls=hedge_urls,
+                    hedge_delay=hedge_delay,
+                )
 
-            task_results = []
-            total_score = 0.0
+            # tasks are distributed across the replicas of each participant
+            replica_pools = {
+                role: ReplicaPool(
+                    req.replica_urls(role),
+                    max_failures=int(req.config.get("replica_max_failures", DEFAULT_MAX_FAILURES)),
+                    eject_seconds=req.config.get("replica_eject_seconds", DEFAULT_EJECT_SECONDS),
+                )
+                for role in req.participants
+            }
+            # fuzzy_match judgements of concurrent tasks are sent together; a batch larger than
+            # the number of workers could never fill and would always wait for its timeout
+            judge_batch_size = min(int(req.config.get("judge_batch_size", 1)), concurrency)
+            batcher = FuzzyMatchBatcher(judge_batch_size)
+            # judgements of this evaluation decided by the deterministic pre-judge vs. by the LLM
+            judge_stats = {"pre_judged": 0, "llm": 0}
 
             await updater.update_status(
                 TaskState.working,
-                new_agent_text_message(f"=== Starting evaluation of {len(tasks)} tasks. ==="),
+                new_agent_text_message(
+                    f"=== Starting evaluation of {total_tasks} tasks "
+                    f"(concurrency: {concurrency}). ==="
+                ),
             )
 
-            for task in tasks:
-                try:
-                    logger.info("===============================================")
-                    logger.info(f"Processing task ID: {task['id']}")
-                    logger.info("===============================================")
-                    goal = build_goal(task)
-                    file_payloads = self._data_source.load_file_payload(task["input_data"])
-
-                    # orchestrate purple agents to perform the task
-                    result = await self.orchestrate(req.participants, goal, file_payloads, updater)
-
-                    # TODO: need to check if the format of result is correct by using task['output_format']  # noqa: E501
-
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            "=== Orchestration finished. Analyzing result... ==="
-                        ),
-                    )
-                    logger.info("Orchestration finished. Evaluating results.")
-
-                    # Evaluate the results using the eval method of FWA
-                    analyze_eval: FWAEval = await self.judge(
-                        task["query"], task["answer"], result["agent"][-1], task["eval_func"]
-                    )
-                    logger.info(f"★★★Evaluation★★★:{analyze_eval.model_dump_json()}")
-
-                    # Save the evaluation result
-                    task_result = {
-                        "task_id": task["id"],
-                        "score": float(analyze_eval.score),
-                        "eval_func": task["eval_func"],
-                    }
-                    task_results.append(task_result)
-                    total_score += float(analyze_eval.score)
-
-                    await updater.update_status(
-                        TaskState.working,
-                        new_agent_text_message(
-                            f"=== Task {task['id']} completed. Score: {analyze_eval.score} ==="
-                        ),
-                    )
-                except Exception as e:
-                    logger.error(f"Error during task execution: {e}")
-                    # Record tasks with errors as having a score of 0
-                    task_results.append(
-                        {"task_id": task.get("id", "unknown"), "score": 0.0, "error": str(e)}
-                    )
-                finally:
-                    # reset client to initiate conversation with PurpleAgents
-                    self._client.reset()
+            # the workers and the prefetcher consume the same task stream; tee only buffers the
+            # tasks the prefetcher has read ahead of the workers
+            worker_stream, prefetch_stream = itertools.tee(enumerate(tasks))
+
+            # payloads of the next tasks are loaded in a thread pool while earlier tasks run
+            prefetcher = PayloadPrefetcher(
+                self._data_source,
+                (task.files for _, task in prefetch_stream),
+                max_tasks=concurrency + prefetch_tasks,
+                max_bytes=prefetch_max_bytes,
+                max_parallel_files=file_parallelism,
+            )
+            results_by_index: dict[int, dict[str, Any]] = {}
+
+            async def worker() -> None:
+                # each worker takes the next task of the stream once its previous task is done
+                for index, task in worker_stream:
+                    try:
+                        results_by_index[index] = await self.run_task(
+                            replica_pools,
+                            task,
+                            prefetcher.get(index),
+                            updater,
+                            uri_threshold_bytes=uri_threshold_bytes,
+                            batcher=batcher,
+                            client_factory=client_factory,
+                            judge_stats=judge_stats,
+                        )
+                    finally:
+                        await prefetcher.release(index)
+
+            async with prefetcher:
+                await asyncio.gather(*(worker() for _ in range(concurrency)))
+            # task_results follow the order of the tasks
+            task_results = [results_by_index[i] for i in range(len(results_by_index))]
+            total_score = sum(result["score"] for result in task_results)
 
             # After all tasks are completed, add the aggregated results as an artifact
-            score_rate = total_score / len(tasks) if len(tasks) > 0 else 0.0
+            score_rate = total_score / len(task_results) if len(task_results) > 0 else 0.0
             eval_result = EvalResult(
                 target=req.config["target"],
-                total_tasks=len(tasks),
+                total_tasks=len(task_results),
                 total_score=total_score,
                 score_rate=score_rate,
                 task_results=task_results,
+                replica_stats={role: pool.stats() for role, pool in replica_pools.items()},
+                judge_stats=judge_stats,
             )
             await updater.add_artifact(
                 parts=[
@@ -173,35 +315,173 @@ class FWAGreenAgent(GreenAgent):
                 name="EvaluationResult",
             )
             logger.info(
-                f"★★★Final Evaluation Summary★★★: Total Tasks: {len(tasks)}, "
+                f"★★★Final Evaluation Summary★★★: Total Tasks: {len(task_results)}, "
                 f"Total Score: {total_score}, Score Rate: {score_rate:.2%}"
             )
+            logger.info(f"Replica stats: {eval_result.replica_stats}")
+            logger.info(f"Request compression stats: {get_client_registry().compression_stats()}")
+            logger.info(f"Payload cache stats: {self._data_source.payload_cache.stats()}")
+            logger.info(f"JPEG stats: {self._data_source.jpeg_stats}")
+            if self._data_source.payload_store is not None:
+                logger.info(f"Payload store stats: {self._data_source.payload_store.stats()}")
+            logger.info(
+                f"Judge stats: {judge_stats}, "
+                f"LLM calls avoided by pre-judge: {judge_stats['pre_judged']}"
+            )
+            if batcher.batch_size > 1:
+                logger.info(f"Judge batch stats: {batcher.stats()}")
+            if (judge_cache := auto_eval.get_judge_cache()) is not None:
+                logger.info(f"Judge cache stats: {judge_cache.stats()}")
         except Exception as e:
             logger.error(f"Error in run_eval: {e}")
 
+    async def run_task(
+        self,
+        replica_pools: dict[str, ReplicaPool],
+        task: Task,
+        file_payloads_loader: Awaitable[list[FileWithBytes]],
+        updater: TaskUpdater,
+        uri_threshold_bytes: int | None = None,
+        batcher: FuzzyMatchBatcher | None = None,
+        client_factory: Callable[[Task], PurpleClient] | None = None,
+        judge_stats: dict[str, int] | None = None,
+    ) -> dict[str, Any]:
+        """Run a single FWA task: load payloads, orchestrate PurpleAgents and judge the result.
+        Args:
+            replica_pools: Dictionary mapping role names to the replicas of their endpoints.
+            task: The Task record extracted by TaskLoader.
+            file_payloads_loader: Awaitable resolving to the file payloads of the task.
+            updater: The task updater to report progress.
+            uri_threshold_bytes: Payloads of at least this size (Base64) are sent by URI.
+                                 If None, all payloads are sent inline.
+            batcher: Batcher of the fuzzy_match judgements. If None, they are judged one by one.
+            client_factory: Creates the PurpleClient of the task (default: PurpleClient()).
+            judge_stats: Counts of the judgements by the pre-judge and by the LLM (fuzzy_match,
+                         json_match and numerical_match), updated in place.
+        Returns:
+            The task result dictionary. Tasks with errors are recorded with a score of 0.
+        """
+        # each task gets its own client so that conversations never leak between tasks
+        client = client_factory(task) if client_factory is not None else PurpleClient()
+        try:
+            logger.info("===============================================")
+            logger.info(f"Processing task ID: {task.id}")
+            logger.info("===============================================")
+            file_payloads = await file_payloads_loader
+            goal = build_goal(task)
+
+            # large payloads are served by URI instead of being inlined in the message
+            transport_payloads: list[FileWithBytes | FileWithUri] = list(file_payloads)
+            if uri_threshold_bytes is not None and self._payload_server is not None:
+                transport_payloads = await self._payload_server.to_transport(
+                    file_payloads, uri_threshold_bytes
+                )
+
+            # orchestrate purple agents to perform the task, on the least loaded replicas
+            participants = {role: pool.acquire() for role, pool in replica_pools.items()}
+            started = time.perf_counter()
+            try:
+                result = await self.orchestrate(
+                    participants, goal, transport_payloads, updater, client
+                )
+            except Exception:
+                for role, pool in replica_pools.items():
+                    pool.release(participants[role], ok=False)
+                raise
+            else:
+                latency = time.perf_counter() - started
+                for role, pool in replica_pools.items():
+                    pool.release(participants[role], ok=True, latency=latency)
+            finally:
+                if self._payload_server is not None:
+                    self._payload_server.release(transport_payloads)
+
+            # TODO: need to check if the format of result is correct by using task['output_format']  # noqa: E501
+
+            await updater.update_status(
+                TaskState.working,
+                new_agent_text_message(
+                    f"=== Task {task.id}: Orchestration finished. Analyzing result... ==="
+                ),
+            )
+            logger.info("Orchestration finished. Evaluating results.")
+
+            # Evaluate the results using the eval method of FWA
+            analyze_eval: FWAEval = await self.judge(
+                task.query,
+                task.answer,
+                result["agent"][-1],
+                task.eval_func,
+                batcher=batcher,
+                judge_stats=judge_stats,
+            )
+            logger.info(f"★★★Evaluation★★★:{analyze_eval.model_dump_json()}")
+
+            await updater.update_status(
+                TaskState.working,
+                new_agent_text_message(
+                    f"=== Task {task.id} completed. Score: {analyze_eval.score} ==="
+                ),
+            )
+            return {
+                "task_id": task.id,
+                "score": float(analyze_eval.score),
+                "eval_func": task.eval_func,
+                # time to the first token of the first response and total response time
+                "ttft": client.timings[0]["ttft"] if client.timings else None,
+                "latency": sum(timing["latency"] or 0.0 for timing in client.timings),
+                "retries": client.stats["retries"],
+                "hedge_wins": client.stats["hedge_wins"],
+            }
+        except Exception as e:
+            logger.error(f"Error during task execution: {e}")
+            # Record tasks with errors as having a score of 0
+            return {"task_id": task.id, "score": 0.0, "error": str(e)}
+
     async def orchestrate(
         self,
         participants: dict[str, Any],
         goal: str,
-        file_payloads: list[FileWithBytes],
+        file_payloads: list[FileWithBytes | FileWithUri],
         updater: TaskUpdater,
+        client: PurpleClient,
     ) -> dict[str, list[str]]:
         """Orchestrate the PurpleAgents(participants) to perform the FWA task.
         Args:
             participants: Dictionary mapping role names to their endpoints.
             goal: The task goal to be processed.
-            file_payloads: The file payloads for FilePart, which includes data encoded in base64.
+            file_payloads: The file payloads for FilePart, either data encoded in base64 or URIs.
             updater: The task updater to report progress.
+            client: The PurpleClient holding the conversation contexts of this task.
         Returns:
             A dictionary containing the analysis results from each participant."""
         analyze: dict[str, list[str]] = {"agent": []}
 
+        # progress of streamed responses is forwarded without waiting for the status updates
+        pending_updates: set[asyncio.Task] = set()
+
+        def forward_progress(role: str, text: str) -> None:
+            update = asyncio.create_task(
+                updater.update_status(
+                    TaskState.working, new_agent_text_message(f"--- {role}: {text} ---")
+                )
+            )
+            pending_updates.add(update)
+            update.add_done_callback(pending_updates.discard)
+
         async def turn(role: str, query: str) -> str:
             """Manage a conversation with PurpleAgents"""
             logger.info(f"Turn for role {role} with query:\n{query}")
-            response = await self._client.send_message(
-                query, file_payloads, str(participants[role]), new_conversation=False
-            )
+            try:
+                response = await client.send_message(
+                    query,
+                    file_payloads,
+                    str(participants[role]),
+                    new_conversation=False,
+                    on_progress=lambda text: forward_progress(role, text),
+                )
+            finally:
+                await asyncio.gather(*pending_updates, return_exceptions=True)
             logger.info(f"{role}: {response}")
             analyze[role].append(response)
             await updater.update_status(
@@ -214,13 +494,24 @@ class FWAGreenAgent(GreenAgent):
 
         return analyze
 
-    async def judge(self, query: str, reference: str, predicted: str, eval_func: str) -> FWAEval:
+    async def judge(
+        self,
+        query: str,
+        reference: str,
+        predicted: str,
+        eval_func: str,
+        batcher: FuzzyMatchBatcher | None = None,
+        judge_stats: dict[str, int] | None = None,
+    ) -> FWAEval:
         """Judge the analysis result from PurpleAgents.
         Args:
             query: The original task query.
             reference: The reference answer for evaluation.
             predicted: The analysis result from PurpleAgents.
             eval_func: The evaluation function to use.
+            batcher: Batcher of the fuzzy_match judgements. If None, they are judged one by one.
+            judge_stats: Counts of the judgements by the pre-judge and by the LLM (fuzzy_match,
+                         json_match and numerical_match), updated in place.
         Returns:
             FWAEval: The evaluation result including score and reason.
         """
@@ -230,11 +521,24 @@ class FWAGreenAgent(GreenAgent):
 
         score = 0.0
         reason = None
+        if judge_stats is None:
+            judge_stats = {"pre_judged": 0, "llm": 0}
 
         match eval_func:
             case "fuzzy_match":
-                score, reason = auto_eval.llm_fuzzy_match(predicted, reference, query)
-                logger.info(f" ==> fuzzy_match, score: {score}")
+                pre_judged = auto_eval.pre_judge_fuzzy_match(predicted, reference)
+                if pre_judged is not None:
+                    score, reason = pre_judged
+                    judge_stats["pre_judged"] += 1
+                else:
+                    if batcher is not None:
+                        score, reason = await batcher.judge(predicted, reference, query)
+                    else:
+                        score, reason = await auto_eval.allm_fuzzy_match(
+                            predicted, reference, query
+                        )
+                    judge_stats["llm"] += 1
+                logger.info(f" ==> fuzzy_match, score: {score}, reason: {reason}")
             case "exact_match":
                 score, reason = auto_eval.exact_match(reference, predicted)
                 logger.info(f" ==> exact_match, score: {score}")
@@ -245,10 +549,12 @@ class FWAGreenAgent(GreenAgent):
                 score, reason = auto_eval.must_exclude(reference, predicted)
                 logger.info(f" ==> must_exclude, score: {score}")
             case "json_match":
-                score, reason = auto_eval.json_match(predicted, reference, query)
+                score, reason = await auto_eval.ajson_match(predicted, reference, query)
+                judge_stats["llm"] += 1
                 logger.info(f" ==> json_match, score: {score}")
             case "numerical_match":
-                score, reason = auto_eval.numerical_match(predicted, reference, query)
+                score, reason = await auto_eval.anumerical_match(predicted, reference, query)
+                judge_stats["llm"] += 1
                 logger.info(f" ==> numerical_match, score: {score}")
 
         # return score as a EWAEval
@@ -272,7 +578,8 @@ async def async_main():
 
     async with agent_url_cm as agent_url:
         try:
-            agent = FWAGreenAgent()
+            payload_server = PayloadServer(agent_url)
+            agent = FWAGreenAgent(payload_server=payload_server)
             executor = GreenExecutor(agent)
             agent_card = get_fwa_green_agent_card(agent_url)
 
@@ -286,7 +593,9 @@ async def async_main():
                 http_handler=request_handler,
             )
 
-            uvicorn_config = uvicorn.Config(server.build(), host=args.host, port=args.port)
+            uvicorn_config = uvicorn.Config(
+                server.build(routes=payload_server.routes()), host=args.host, port=args.port
+            )
             uvicorn_server = uvicorn.Server(uvicorn_config)
             await uvicorn_server.serve()
         except KeyboardInterrupt:
@@ -294,6 +603,10 @@ async def async_main():
         except Exception as e:
             logger.error(f"Error running FWA Green Agent server: {e}")
             sys.exit(1)
+        finally:
+            # close the pooled connections to PurpleAgents and the judge
+            await close_client_registry()
+            await auto_eval.async_judge_client.aclose()
 
 
 def main():
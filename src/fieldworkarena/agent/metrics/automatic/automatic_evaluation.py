@@ -1,27 +1,186 @@
+import asyncio
+import json
 import os
-from typing import Any
+from pathlib import Path
+import random
+import re
+import threading
+from typing import TYPE_CHECKING, Any
+
+from fieldworkarena.agent.metrics.automatic.judge_backend import (
+    JudgeBackend,
+    OpenAIJudgeBackend,
+    create_judge_backend,
+)
+from fieldworkarena.agent.metrics.automatic.judge_cache import JudgeCache
+from fieldworkarena.agent.metrics.automatic.tokenizer import tokenize_reference, word_tokenize
+from fieldworkarena.log.fwa_logger import getLogger
 
-import nltk
-from openai import OpenAI
-from openai.types.chat import ChatCompletionMessageParam
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
 
-nltk.download("punkt_tab")
+logger = getLogger(__name__)
 
-import json
-import re
+# openai is imported on first use, so that importing this module (and starting the green
+# agent) neither loads it nor needs OPENAI_API_KEY or network access
+_client: "OpenAI | None" = None
+_client_lock = threading.Lock()
 
-from nltk.tokenize import word_tokenize
 
-from fieldworkarena.log.fwa_logger import getLogger
+def get_client() -> "OpenAI":
+    """Return the process-wide synchronous OpenAI client, created on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            from openai import OpenAI
 
-logger = getLogger(__name__)
+            _client = OpenAI(
+                api_key=os.environ["OPENAI_API_KEY"], base_url=os.environ.get("OPENAI_BASE_URL")
+            )
+        return _client
 
-client = OpenAI(api_key=os.environ["OPENAI_API_KEY"], base_url=os.environ.get("OPENAI_BASE_URL"))
 
+# number of judge requests sent to the OpenAI API at the same time
+DEFAULT_JUDGE_CONCURRENCY = 8
+DEFAULT_JUDGE_MAX_RETRIES = 5
+DEFAULT_JUDGE_BACKOFF_BASE = 1.0
+DEFAULT_JUDGE_BACKOFF_MAX = 30.0
 
-def llm_fuzzy_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
-    """Check whether the prediction matches the reference with GPT-4o"""
-    messages: list[ChatCompletionMessageParam] = []
+
+def retryable_errors() -> tuple[type[Exception], ...]:
+    """Errors worth retrying: rate limits, timeouts/connection errors and 5xx responses."""
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+
+    return (RateLimitError, APIConnectionError, InternalServerError)
+
+
+class AsyncJudgeClient:
+    """Shared async client for judging.
+
+    Limits the number of in-flight chat completions and retries retryable errors with
+    exponential backoff and full jitter, so concurrent tasks do not hit rate limits in lockstep.
+    Chat completions are answered by a JudgeBackend (the OpenAI API by default). The semaphore
+    is bound to the running event loop and recreated when it changes.
+    """
+
+    def __init__(
+        self,
+        backend: JudgeBackend | None = None,
+        max_concurrency: int = DEFAULT_JUDGE_CONCURRENCY,
+        max_retries: int = DEFAULT_JUDGE_MAX_RETRIES,
+        backoff_base: float = DEFAULT_JUDGE_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_JUDGE_BACKOFF_MAX,
+    ):
+        """
+        Args:
+            backend: Backend answering the chat completions. Defaults to the backend named by
+                FWA_JUDGE_BACKEND, created on first use so that a bad name is reported by the
+                first judgement rather than at import time.
+            max_concurrency: Maximum number of chat completions in flight.
+            max_retries: Maximum number of retries of a chat completion.
+            backoff_base: Upper bound in seconds of the first backoff delay.
+            backoff_max: Upper bound in seconds of any backoff delay.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._backend = backend
+        self.retries = 0
+        self._semaphore: asyncio.Semaphore | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def backend(self) -> JudgeBackend:
+        """Backend answering the chat completions."""
+        if self._backend is None:
+            self._backend = create_judge_backend()
+        return self._backend
+
+    def _bind_loop(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._semaphore is None:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def cache_key(self, **request: Any) -> str:
+        """Return the judge cache key of a chat completion request sent to the backend."""
+        return JudgeCache.make_key(backend=self.backend.name, **request)
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay in seconds before the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def create(self, **kwargs: Any) -> str:
+        """Create a chat completion and return the content of the first choice.
+
+        Raises the last error once max_retries is exhausted.
+        """
+        semaphore = self._bind_loop()
+        attempt = 0
+        while True:
+            try:
+                async with semaphore:
+                    return await self.backend.complete(**kwargs)
+            except Exception as e:
+                if not isinstance(e, retryable_errors()) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt)
+                attempt += 1
+                self.retries += 1
+                logger.warning(
+                    f"Judge request failed ({type(e).__name__}), "
+                    f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        """Close the backend."""
+        self._semaphore = None
+        self._loop = None
+        if self._backend is not None:
+            await self._backend.aclose()
+
+
+async_judge_client = AsyncJudgeClient(
+    max_concurrency=int(os.getenv("FWA_JUDGE_CONCURRENCY") or DEFAULT_JUDGE_CONCURRENCY),
+)
+
+DEFAULT_JUDGE_CACHE_PATH = Path.home() / ".cache" / "fieldworkarena" / "judge_cache.sqlite3"
+
+_judge_cache: JudgeCache | None = None
+_judge_cache_disabled = False
+_judge_cache_lock = threading.Lock()
+
+
+def get_judge_cache() -> JudgeCache | None:
+    """Return the process-wide judge cache, opened on first use.
+
+    The cache is stored at FWA_JUDGE_CACHE_PATH
+    (default: ~/.cache/fieldworkarena/judge_cache.sqlite3).
+    Returns None if FWA_JUDGE_CACHE_DISABLE is set or the cache cannot be opened.
+    """
+    global _judge_cache, _judge_cache_disabled
+    with _judge_cache_lock:
+        if _judge_cache is not None or _judge_cache_disabled:
+            return _judge_cache
+        if os.getenv("FWA_JUDGE_CACHE_DISABLE", "").lower() in ("1", "true", "yes"):
+            _judge_cache_disabled = True
+            return None
+        path = os.getenv("FWA_JUDGE_CACHE_PATH") or DEFAULT_JUDGE_CACHE_PATH
+        try:
+            _judge_cache = JudgeCache(path)
+        except Exception as e:
+            logger.warning(f"Judge cache is disabled, failed to open {path}: {e}")
+            _judge_cache_disabled = True
+        return _judge_cache
+
+
+def _fuzzy_match_messages(
+    pred: str, reference: str, question: str
+) -> list["ChatCompletionMessageParam"]:
     # construct the question to ask
     message = (
         "Help a teacher to grade the answer of a student given a question. "
@@ -40,11 +199,26 @@ def llm_fuzzy_match(pred: str, reference: str, question: str) -> tuple[float, st
         "Only output one of these options, and nothing else."
     )
     # message += "Also answer the reason why you judged so."
-    messages = [
+    return [
         {"role": "system", "content": "You are a helpful assistant"},
         {"role": "user", "content": message},
     ]
 
+
+def _score_fuzzy_match(response: str) -> tuple[float, str | None]:
+    response = response.lower()
+    logger.info(f"response: {response}")
+    if "partially correct" in response or "incorrect" in response:
+        return 0.0, None
+    else:
+        assert "correct" in response, response
+        return 1.0, None
+
+
+def llm_fuzzy_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
+    """Check whether the prediction matches the reference with GPT-4o"""
+    messages = _fuzzy_match_messages(pred, reference, question)
+
     try:
         response = generate_from_openai_chat_completion(
             model="gpt-4o",
@@ -53,21 +227,34 @@ def llm_fuzzy_match(pred: str, reference: str, question: str) -> tuple[float, st
             max_tokens=768,
             top_p=1.0,
             context_length=0,
-        ).lower()
-
-        logger.info(f"response: {response}")
-        if "partially correct" in response or "incorrect" in response:
-            return 0.0, None
-        else:
-            assert "correct" in response, response
-            return 1.0, None
+        )
+        return _score_fuzzy_match(response)
     except Exception as e:
         logger.error(f"Error in llm_fuzzy_match: {e}")
         return 0.0, None
 
 
+async def allm_fuzzy_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
+    """Async version of llm_fuzzy_match using the shared judge client"""
+    messages = _fuzzy_match_messages(pred, reference, question)
+
+    try:
+        response = await agenerate_from_openai_chat_completion(
+            model="gpt-4o",
+            messages=messages,
+            temperature=0,
+            max_tokens=768,
+            top_p=1.0,
+            context_length=0,
+        )
+        return _score_fuzzy_match(response)
+    except Exception as e:
+        logger.error(f"Error in allm_fuzzy_match: {e}")
+        return 0.0, None
+
+
 def generate_from_openai_chat_completion(
-    messages: list[ChatCompletionMessageParam],
+    messages: list["ChatCompletionMessageParam"],
     model: str,
     temperature: float,
     max_tokens: int,
@@ -75,10 +262,22 @@ def generate_from_openai_chat_completion(
     context_length: int,  # noqa: ARG001
     stop_token: str | None = None,  # noqa: ARG001
 ) -> str:
+    judge_cache = get_judge_cache()
+    key = JudgeCache.make_key(
+        backend=OpenAIJudgeBackend().name,
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        top_p=top_p,
+    )
+    if judge_cache is not None and (cached := judge_cache.get(key)) is not None:
+        return cached
+
     if "OPENAI_API_KEY" not in os.environ:
         raise ValueError("OPENAI_API_KEY environment variable must be set when using OpenAI API.")
     try:
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model=model,
             messages=messages,
             temperature=temperature,
@@ -86,12 +285,47 @@ def generate_from_openai_chat_completion(
             top_p=top_p,
         )
         answer: str = response.choices[0].message.content or ""
+        if judge_cache is not None and answer:
+            judge_cache.put(key, answer)
         return answer
     except Exception as e:
         logger.error(f"Error in generate_from_openai_chat_completion: {e}")
         return ""
 
 
+async def agenerate_from_openai_chat_completion(
+    messages: list["ChatCompletionMessageParam"],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    top_p: float,
+    context_length: int,  # noqa: ARG001
+    stop_token: str | None = None,  # noqa: ARG001
+) -> str:
+    """Async version of generate_from_openai_chat_completion using the shared judge client"""
+    judge_cache = get_judge_cache()
+    key = async_judge_client.cache_key(
+        model=model, messages=messages, temperature=temperature, max_tokens=max_tokens, top_p=top_p
+    )
+    if judge_cache is not None and (cached := await judge_cache.aget(key)) is not None:
+        return cached
+
+    try:
+        answer = await async_judge_client.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            top_p=top_p,
+        )
+        if judge_cache is not None and answer:
+            await judge_cache.aput(key, answer)
+        return answer
+    except Exception as e:
+        logger.error(f"Error in agenerate_from_openai_chat_completion: {e}")
+        return ""
+
+
 def clean_answer(answer: str) -> tuple[str, None]:
     if answer.startswith("'") and answer.endswith("'"):
         answer = answer[1:-1]
@@ -108,11 +342,11 @@ def exact_match(ref: str, pred: str) -> tuple[float, None]:
 
 
 def must_include(ref: str, pred: str) -> tuple[float, None]:
-    clean_ref = clean_answer(ref)
-    clean_pred = clean_answer(pred)
+    clean_ref, _ = clean_answer(ref)
+    clean_pred, _ = clean_answer(pred)
     # tokenize the answer if the ref is a single word
     # prevent false positive (e.g, 0)
-    if len(word_tokenize(clean_ref)) == 1:
+    if len(tokenize_reference(clean_ref)) == 1:
         tok_pred = word_tokenize(clean_pred)
         return float(clean_ref in tok_pred), None
     else:
@@ -121,20 +355,103 @@ def must_include(ref: str, pred: str) -> tuple[float, None]:
 
 def must_exclude(ref: str, pred: str) -> tuple[float, None]:
     """Returns 1 if pred is not in ref, and 0 otherwise"""
-    clean_ref = clean_answer(ref)
-    clean_pred = clean_answer(pred)
+    clean_ref, _ = clean_answer(ref)
+    clean_pred, _ = clean_answer(pred)
     # tokenize the answer if the ref is a single word
     # prevent false positive (e.g, 0)
-    if len(word_tokenize(clean_ref)) == 1:
+    if len(tokenize_reference(clean_ref)) == 1:
         tok_pred = word_tokenize(clean_pred)
         return float(clean_ref not in tok_pred), None
     else:
         return float(clean_ref not in clean_pred), None
 
 
-def json_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
-    """Check whether the prediction matches the reference with GPT-4o"""
-    messages: list[ChatCompletionMessageParam] = []
+# tokens of the pre-judge: times (hh:mm[:ss]), numbers and words
+_TIME_PATTERN = re.compile(r"\b(\d{1,2}):\s?(\d{2})(?::(\d{2}(?:\.\d+)?))?\b")
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_WORD_PATTERN = re.compile(r"[a-z]+(?:'[a-z]+)?")
+# words that may follow the reference in a correct answer without adding anything to it
+TRAILING_STOPWORDS = frozenset(
+    {"a", "an", "the", "it", "is", "are", "was", "were", "that", "this", "there", "so"}
+)
+
+
+def _extract_times(text: str) -> tuple[set[float], str]:
+    """Return the times in the text in seconds and the text without them."""
+    times = set()
+    for match in _TIME_PATTERN.finditer(text):
+        first, second, third = match.groups()
+        if third is None:
+            times.add(int(first) * 3600 + int(second) * 60.0)
+        else:
+            times.add(int(first) * 3600 + int(second) * 60 + float(third))
+    return times, _TIME_PATTERN.sub(" ", text)
+
+
+def _pre_judge_tokens(answer: str) -> tuple[list[str], set[float], list[str]]:
+    """Return the words, times and numbers of a normalized answer."""
+    text = clean_answer(answer.strip())[0]
+    times, text = _extract_times(text)
+    numbers = _NUMBER_PATTERN.findall(text)
+    words = _WORD_PATTERN.findall(_NUMBER_PATTERN.sub(" ", text))
+    return words, times, numbers
+
+
+def pre_judge_fuzzy_match(pred: str, reference: str) -> tuple[float, str] | None:
+    """Decide fuzzy_match without the LLM when the answer is definitely correct or incorrect.
+
+    Applies the exact_match normalization, then compares integer counts of predictions stating
+    only a count, yes/no polarity and times, and accepts a prediction made of the reference
+    followed only by stopwords.
+    Returns (score, reason), or None when the case is ambiguous and must be judged by the LLM.
+    """
+    if exact_match(reference, pred)[0] == 1.0:
+        return 1.0, "pre-judge: exact match"
+
+    ref_words, ref_times, ref_numbers = _pre_judge_tokens(reference)
+    pred_words, pred_times, pred_numbers = _pre_judge_tokens(pred)
+
+    # only integer counts are compared, decimals may be the same value in another unit; and only
+    # for predictions made of numbers and words of the reference, as the numbers of free-text
+    # answers may be unrelated to the count (e.g. "Three people are visible in camera 2.")
+    integer_counts = (
+        not ref_times
+        and not pred_times
+        and all("." not in n for n in ref_numbers + pred_numbers)
+        and set(pred_words) <= set(ref_words)
+    )
+    ref_counts = {int(n) for n in ref_numbers} if integer_counts else set()
+    pred_counts = {int(n) for n in pred_numbers} if integer_counts else set()
+    if ref_counts and pred_counts and ref_counts.isdisjoint(pred_counts):
+        return 0.0, "pre-judge: different numbers"
+
+    if not ref_words or not pred_words:
+        return None
+
+    ref_polarity = ref_words[0] if ref_words[0] in ("yes", "no") else None
+    pred_polarity = pred_words[0] if pred_words[0] in ("yes", "no") else None
+    if ref_polarity and pred_polarity and ref_polarity != pred_polarity:
+        return 0.0, "pre-judge: opposite yes/no answer"
+
+    if ref_times and pred_times and ref_times.isdisjoint(pred_times):
+        return 0.0, "pre-judge: different times"
+
+    # any other word after the reference may qualify it (e.g. "Yes, partially"), so only
+    # stopwords are accepted and every other containment is left to the LLM
+    if (
+        ref_times == pred_times
+        and ref_numbers == pred_numbers
+        and pred_words[: len(ref_words)] == ref_words
+        and set(pred_words[len(ref_words) :]) <= TRAILING_STOPWORDS
+    ):
+        return 1.0, "pre-judge: reference followed by stopwords"
+
+    return None
+
+
+def _json_match_messages(
+    pred: str, reference: str, question: str
+) -> list["ChatCompletionMessageParam"]:
     # construct the question to ask
     message = (
         "Help a teacher to grade the answer of a student given a question. "
@@ -150,11 +467,29 @@ def json_match(pred: str, reference: str, question: str) -> tuple[float, str | N
     message += "Conclude the judgement by 'correct', 'incorrect', or 'partially correct'. Only output one of these options, and nothing else."
     message += "Answer is given in JSON format. so you should compare the number of incidents, violations or other things and the keys of the answer"
     message += "Also answer the reason why the answer is correct, incorrect or partially correct"
-    messages = [
+    return [
         {"role": "system", "content": "You are a helpful assistant"},
         {"role": "user", "content": message},
     ]
 
+
+def _score_json_match(response: str, reference: str) -> tuple[float, str | None]:
+    response = response.lower()
+
+    if reference == "[ ]":
+        return 0.0, None
+
+    if "partially correct" in response or "incorrect" in response:
+        return 0.0, response.replace("\n", " ")
+    else:
+        assert "correct" in response, response
+        return 1.0, response.replace("\n", " ")
+
+
+def json_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
+    """Check whether the prediction matches the reference with GPT-4o"""
+    messages = _json_match_messages(pred, reference, question)
+
     try:
         response = generate_from_openai_chat_completion(
             model="gpt-4o",
@@ -163,25 +498,29 @@ def json_match(pred: str, reference: str, question: str) -> tuple[float, str | N
             max_tokens=768,
             top_p=1.0,
             context_length=0,
-        ).lower()
+        )
+        return _score_json_match(response, reference)
+    except Exception as e:
+        logger.error(f"Error in json_match: {e}")
+        return 0.0, None
 
-        if reference == "[ ]":
-            return 0.0, None
 
-        # #"=================================")
-        # import json
-        # print("question: ", question)
-        # print("pred: ", pred)
-        # print("reference: ", reference)
+async def ajson_match(pred: str, reference: str, question: str) -> tuple[float, str | None]:
+    """Async version of json_match using the shared judge client"""
+    messages = _json_match_messages(pred, reference, question)
 
-        # print("response: ", response)
-        if "partially correct" in response or "incorrect" in response:
-            return 0.0, response.replace("\n", " ")
-        else:
-            assert "correct" in response, response
-            return 1.0, response.replace("\n", " ")
+    try:
+        response = await agenerate_from_openai_chat_completion(
+            model="gpt-4o",
+            messages=messages,
+            temperature=0,
+            max_tokens=768,
+            top_p=1.0,
+            context_length=0,
+        )
+        return _score_json_match(response, reference)
     except Exception as e:
-        logger.error(f"Error in json_match: {e}")
+        logger.error(f"Error in ajson_match: {e}")
         return 0.0, None
 
 
@@ -210,11 +549,9 @@ def eval_time(pred: float, reference: float) -> float:
     return 0.0
 
 
-def numerical_match(
-    pred: str, reference: str, question: str, numerical_ratio=0.5
-) -> tuple[float, Any]:
-
-    messages: list[ChatCompletionMessageParam] = []
+def _numerical_match_messages(
+    pred: str, reference: str, question: str
+) -> list["ChatCompletionMessageParam"]:
     # construct the question to ask
     message = (
         "Help a teacher to grade the answer of a student given a question. "
@@ -261,24 +598,13 @@ UNIT: The unit of the numerical value. (e.g., "m", "cm", "s", "min" or name of t
 TYPE: The type of the numerical value. ("length", "time", "number")
 All values should be numerical values. If the units are different, you should convert the units to the same unit. (SI unit is recommended).
     """
-    messages = [
+    return [
         {"role": "system", "content": "You are a helpful assistant"},
         {"role": "user", "content": message},
     ]
 
-    try:
-        response = generate_from_openai_chat_completion(
-            model="gpt-4o",
-            messages=messages,
-            temperature=0,
-            max_tokens=768,
-            top_p=1.0,
-            context_length=0,
-        )
-    except Exception as e:
-        logger.error(f"Error in numerical_match: {e}")
-        return 0.0, None
 
+def _score_numerical_match(response: str, numerical_ratio: float) -> tuple[float, Any]:
     # Extract JSON from the response
     json_pattern = re.compile(r"\{.*\}", re.DOTALL)
     json_match = json_pattern.search(response)
@@ -360,3 +686,46 @@ All values should be numerical values. If the units are different, you should co
         # print("response: \n", response)
         score = (1 - numerical_ratio) + numerical_score * numerical_ratio
     return score, json_data
+
+
+def numerical_match(
+    pred: str, reference: str, question: str, numerical_ratio=0.5
+) -> tuple[float, Any]:
+    messages = _numerical_match_messages(pred, reference, question)
+
+    try:
+        response = generate_from_openai_chat_completion(
+            model="gpt-4o",
+            messages=messages,
+            temperature=0,
+            max_tokens=768,
+            top_p=1.0,
+            context_length=0,
+        )
+    except Exception as e:
+        logger.error(f"Error in numerical_match: {e}")
+        return 0.0, None
+
+    return _score_numerical_match(response, numerical_ratio)
+
+
+async def anumerical_match(
+    pred: str, reference: str, question: str, numerical_ratio=0.5
+) -> tuple[float, Any]:
+    """Async version of numerical_match using the shared judge client"""
+    messages = _numerical_match_messages(pred, reference, question)
+
+    try:
+        response = await agenerate_from_openai_chat_completion(
+            model="gpt-4o",
+            messages=messages,
+            temperature=0,
+            max_tokens=768,
+            top_p=1.0,
+            context_length=0,
+        )
+    except Exception as e:
+        logger.error(f"Error in anumerical_match: {e}")
+        return 0.0, None
+
+    return _score_numerical_match(response, numerical_ratio)
@@ -0,0 +1,232 @@
+# batch_judge.py
+
+import asyncio
+import json
+import re
+from typing import TYPE_CHECKING
+
+import fieldworkarena.agent.metrics.automatic.automatic_evaluation as auto_eval
+from fieldworkarena.log.fwa_logger import getLogger
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessageParam
+
+logger = getLogger(__name__)
+
+
+# seconds a judge request waits for other requests to fill its batch
+DEFAULT_JUDGE_BATCH_WAIT = 2.0
+# completion tokens per item of a batch ({"id": N, "judgement": "partially correct"})
+BATCH_TOKENS_PER_ITEM = 32
+
+VERDICTS = ("correct", "incorrect", "partially correct")
+# prefix of the judge cache keys of batched verdicts
+BATCH_CACHE_PREFIX = "batch:"
+
+FuzzyMatchItem = tuple[str, str, str]  # (pred, reference, question)
+
+
+def _batch_fuzzy_match_messages(items: list[FuzzyMatchItem]) -> list["ChatCompletionMessageParam"]:
+    # same instructions as llm_fuzzy_match, stated once for all items
+    message = (
+        "Help a teacher to grade the answers of students given questions. "
+        "Keep in mind that the students may use different phrasing or wording "
+        "to answer the questions. The goal is to evaluate whether each answer is "
+        "semantically equivalent to its reference answer.\n"
+        "all the string 'N/A' that you see is a special sequence that means 'not achievable'\n"
+    )
+    for i, (pred, reference, question) in enumerate(items, start=1):
+        message += f"\n### item {i}\n"
+        message += f"question: {question}\n"
+        message += f"reference answer: {reference}\n"
+        message += f"student answer: {pred}\n"
+    message += (
+        "\nJudge each item independently. Conclude the judgement of each item by "
+        "'correct', 'incorrect', or 'partially correct'. "
+        "Output only a JSON object of the form "
+        '{"verdicts": [{"id": 1, "judgement": "correct"}, ...]} with one entry per item.'
+    )
+    return [
+        {"role": "system", "content": "You are a helpful assistant"},
+        {"role": "user", "content": message},
+    ]
+
+
+def _parse_verdicts(response: str) -> dict[int, str]:
+    """Return the valid verdicts of a batch response by item id."""
+    match = re.search(r"\{.*\}", response, re.DOTALL)
+    if not match:
+        return {}
+    try:
+        data = json.loads(match.group(0))
+        verdicts = {}
+        for entry in data["verdicts"]:
+            judgement = str(entry["judgement"]).strip().lower()
+            if judgement in VERDICTS:
+                verdicts[int(entry["id"])] = judgement
+        return verdicts
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return {}
+
+
+def _batch_item_cache_key(item: FuzzyMatchItem) -> str:
+    # batched verdicts are not responses to the single-item prompt, so they are cached apart
+    # from the responses of llm_fuzzy_match, under the key of its request for the item
+    key = auto_eval.async_judge_client.cache_key(
+        model="gpt-4o",
+        messages=auto_eval._fuzzy_match_messages(*item),
+        temperature=0,
+        max_tokens=768,
+        top_p=1.0,
+    )
+    return f"{BATCH_CACHE_PREFIX}{key}"
+
+
+async def _abatch_llm_fuzzy_match(
+    items: list[FuzzyMatchItem],
+) -> tuple[list[tuple[float, str | None]], int]:
+    """Judge the items with one chat completion. Returns the results and the number of
+    items that fell back to single-item calls."""
+    results: list[tuple[float, str | None] | None] = [None] * len(items)
+
+    # verdicts are cached per item, so batches of any composition share them
+    judge_cache = auto_eval.get_judge_cache()
+    keys = [_batch_item_cache_key(item) for item in items]
+    cached_responses = (
+        await asyncio.gather(*(judge_cache.aget(key) for key in keys))
+        if judge_cache is not None
+        else [None] * len(keys)
+    )
+    pending = []
+    for i, cached in enumerate(cached_responses):
+        try:
+            if cached is not None:
+                results[i] = auto_eval._score_fuzzy_match(cached)
+                continue
+        except AssertionError:
+            pass
+        pending.append(i)
+
+    # a single pending item is judged by llm_fuzzy_match directly
+    batched = len(pending) > 1
+    verdicts: dict[int, str] = {}
+    if batched:
+        try:
+            response = await auto_eval.async_judge_client.create(
+                model="gpt-4o",
+                messages=_batch_fuzzy_match_messages([items[i] for i in pending]),
+                temperature=0,
+                max_tokens=BATCH_TOKENS_PER_ITEM * len(pending) + 64,
+                top_p=1.0,
+                response_format={"type": "json_object"},
+            )
+            verdicts = _parse_verdicts(response)
+        except Exception as e:
+            logger.error(f"Error in batch fuzzy_match: {e}")
+
+    fallback = []
+    judged = []
+    for position, i in enumerate(pending, start=1):
+        verdict = verdicts.get(position)
+        if verdict is None:
+            fallback.append(i)
+            continue
+        results[i] = auto_eval._score_fuzzy_match(verdict)
+        judged.append((keys[i], verdict))
+    if judge_cache is not None and judged:
+        await asyncio.gather(*(judge_cache.aput(key, verdict) for key, verdict in judged))
+
+    if fallback:
+        if batched:
+            logger.warning(
+                f"No verdict for {len(fallback)}/{len(pending)} batched item(s), "
+                "judging them one by one"
+            )
+        fallback_results = await asyncio.gather(
+            *(auto_eval.allm_fuzzy_match(*items[i]) for i in fallback)
+        )
+        for i, result in zip(fallback, fallback_results, strict=True):
+            results[i] = result
+
+    return results, len(fallback) if batched else 0  # type: ignore[return-value]
+
+
+async def abatch_llm_fuzzy_match(items: list[FuzzyMatchItem]) -> list[tuple[float, str | None]]:
+    """Judge several fuzzy_match items with one chat completion.
+
+    Items whose verdict is missing or cannot be parsed are judged one by one with allm_fuzzy_match.
+    Args:
+        items: (pred, reference, question) triples.
+    Returns:
+        (score, reason) of each item, in order.
+    """
+    results, _ = await _abatch_llm_fuzzy_match(items)
+    return results
+
+
+class FuzzyMatchBatcher:
+    """Collects fuzzy_match judge requests of concurrent tasks into batched chat completions.
+
+    A batch is sent when batch_size requests are waiting or max_wait seconds after its first
+    request, whichever comes first. With batch_size 1, requests are judged one by one.
+    """
+
+    def __init__(self, batch_size: int, max_wait: float = DEFAULT_JUDGE_BATCH_WAIT):
+        """
+        Args:
+            batch_size: Maximum number of items per chat completion.
+            max_wait: Seconds a request waits for the batch to fill.
+        """
+        self.batch_size = batch_size
+        self.max_wait = max_wait
+        self._pending: list[tuple[FuzzyMatchItem, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.fallbacks = 0
+
+    async def judge(self, pred: str, reference: str, question: str) -> tuple[float, str | None]:
+        """Judge one item, batched with the requests of other tasks."""
+        if self.batch_size <= 1:
+            return await auto_eval.allm_fuzzy_match(pred, reference, question)
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append(((pred, reference, question), future))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[FuzzyMatchItem, asyncio.Future]]) -> None:
+        futures = [future for _, future in batch]
+        try:
+            results, fallbacks = await _abatch_llm_fuzzy_match([item for item, _ in batch])
+            # a short result list is an error, not items left without a verdict
+            outcomes = list(zip(futures, results, strict=True))
+        except Exception as e:
+            logger.error(f"Error in batch fuzzy_match: {e}")
+            outcomes, fallbacks = [(future, (0.0, None)) for future in futures], 0
+        self.batches += 1
+        self.items += len(batch)
+        self.fallbacks += fallbacks
+        for future, result in outcomes:
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> dict[str, int]:
+        """Return the batch statistics."""
+        return {"batches": self.batches, "items": self.items, "fallbacks": self.fallbacks}
@@ -0,0 +1,119 @@
+# judge_backend.py
+
+from abc import ABC, abstractmethod
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any
+
+from fieldworkarena.agent.metrics.automatic.judge_rules import respond
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+class JudgeBackend(ABC):
+    """Backend answering the chat completions of the judge."""
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """Identity of the backend. Cached judge responses are kept separate per backend."""
+        pass
+
+    @abstractmethod
+    async def complete(self, **request: Any) -> str:
+        """Create a chat completion and return the content of the first choice.
+
+        Args:
+            request: Arguments of the OpenAI chat completions API (model, messages, ...).
+        """
+        pass
+
+    async def aclose(self) -> None:  # noqa: B027 - most backends have nothing to release
+        """Release the resources of the backend."""
+
+
+class OpenAIJudgeBackend(JudgeBackend):
+    """Judge backend calling the OpenAI API, or any compatible server at OPENAI_BASE_URL.
+
+    The AsyncOpenAI client is bound to the running event loop and recreated when it changes.
+    """
+
+    def __init__(self, base_url: str | None = None):
+        """
+        Args:
+            base_url: URL of the API. Defaults to OPENAI_BASE_URL, then to the OpenAI API.
+        """
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        self._client: AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def name(self) -> str:
+        return f"openai:{self.base_url or 'default'}"
+
+    def _get_client(self) -> "AsyncOpenAI":
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._client is None:
+            if "OPENAI_API_KEY" not in os.environ:
+                raise ValueError(
+                    "OPENAI_API_KEY environment variable must be set when using OpenAI API."
+                )
+            from openai import AsyncOpenAI
+
+            self._loop = loop
+            # retries are handled by AsyncJudgeClient with jitter instead of by the OpenAI client
+            self._client = AsyncOpenAI(
+                api_key=os.environ["OPENAI_API_KEY"], base_url=self.base_url, max_retries=0
+            )
+        return self._client
+
+    async def complete(self, **request: Any) -> str:
+        response = await self._get_client().chat.completions.create(**request)
+        return response.choices[0].message.content or ""
+
+    async def aclose(self) -> None:
+        client = self._client
+        self._client = None
+        self._loop = None
+        if client is not None:
+            await client.close()
+
+
+class StubJudgeBackend(JudgeBackend):
+    """In-process, rule-based judge backend for offline runs and load tests.
+
+    Answers like the fwa-judge-stub server without any network access.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Simulated response time in seconds.
+        """
+        self.latency = latency
+
+    @property
+    def name(self) -> str:
+        return "stub"
+
+    async def complete(self, **request: Any) -> str:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return respond(request.get("messages", []))
+
+
+def create_judge_backend(name: str | None = None) -> JudgeBackend:
+    """Create the judge backend by name ("openai" or "stub").
+
+    Args:
+        name: Name of the backend. Defaults to FWA_JUDGE_BACKEND, then to "openai".
+    """
+    name = (name or os.getenv("FWA_JUDGE_BACKEND") or "openai").lower()
+    match name:
+        case "openai":
+            return OpenAIJudgeBackend()
+        case "stub":
+            return StubJudgeBackend(latency=float(os.getenv("FWA_JUDGE_STUB_LATENCY") or 0.0))
+        case _:
+            raise ValueError(f"Unknown judge backend: {name}")
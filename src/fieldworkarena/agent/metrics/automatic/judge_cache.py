@@ -0,0 +1,100 @@
+# judge_cache.py
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+import sqlite3
+import threading
+from typing import Any
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+class JudgeCache:
+    """
+    Persistent SQLite cache of judge responses.
+
+    Entries are keyed by the hash of the full chat completion request (model, messages and
+    sampling parameters), so re-running a benchmark or judging identical answers of another
+    PurpleAgent does not call the OpenAI API again. Only successful responses are cached.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Args:
+            path: Path of the SQLite database. It is created if it does not exist.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS judge_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        """Return the cache key of a chat completion request."""
+        serialized = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for the key, or None if it is not cached."""
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT response FROM judge_cache WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read judge cache {self.path}: {e}")
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Cache the response for the key."""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO judge_cache (key, response) VALUES (?, ?)",
+                    (key, response),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                # the cache is an optimization, failing to write must not fail the judgement
+                logger.warning(f"Failed to write judge cache {self.path}: {e}")
+                return
+            self.writes += 1
+
+    async def aget(self, key: str) -> str | None:
+        """Async variant of get. The query runs in a worker thread, off the event loop."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def aput(self, key: str, response: str) -> None:
+        """Async variant of put. The write runs in a worker thread, off the event loop."""
+        await asyncio.to_thread(self.put, key, response)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM judge_cache").fetchone()[0]
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache statistics."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
@@ -0,0 +1,76 @@
+# judge_rules.py
+
+import json
+import re
+from typing import Any
+
+# share of reference words an answer must contain to be judged correct
+OVERLAP_THRESHOLD = 0.6
+
+_ITEM_PATTERN = re.compile(
+    r"question: (?P<question>.*?)\n"
+    r"reference answer: (?P<reference>.*?)\n"
+    r"(?:all the string 'N/A'.*?\n)?"
+    r"student answer: (?P<pred>.*?)\n",
+    re.DOTALL,
+)
+_NUMBER_PATTERN = re.compile(r"-?\d+(?:\.\d+)?")
+_WORD_PATTERN = re.compile(r"[a-z]+")
+
+
+def judge_item(pred: str, reference: str) -> str:
+    """Rule-based verdict of an answer: 'correct' or 'incorrect'.
+
+    The answer is correct if it equals the reference after normalization, or if it has the same
+    numbers and contains most of the words of the reference.
+    """
+    pred, reference = pred.strip().lower(), reference.strip().lower()
+    if pred == reference:
+        return "correct"
+    if set(_NUMBER_PATTERN.findall(pred)) != set(_NUMBER_PATTERN.findall(reference)):
+        return "incorrect"
+    ref_words = set(_WORD_PATTERN.findall(reference))
+    if not ref_words:
+        return "correct"
+    overlap = len(ref_words & set(_WORD_PATTERN.findall(pred))) / len(ref_words)
+    return "correct" if overlap >= OVERLAP_THRESHOLD else "incorrect"
+
+
+def respond(messages: list[dict[str, Any]]) -> str:
+    """Answer a judge prompt of automatic_evaluation or batch_judge in the expected format."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user")
+    items = [match.groupdict() for match in _ITEM_PATTERN.finditer(prompt)]
+    if not items:
+        return "incorrect"
+
+    # batch_judge: one verdict per item
+    if '"verdicts"' in prompt:
+        verdicts = [
+            {"id": i, "judgement": judge_item(item["pred"], item["reference"])}
+            for i, item in enumerate(items, start=1)
+        ]
+        return json.dumps({"verdicts": verdicts})
+
+    item = items[0]
+    verdict = judge_item(item["pred"], item["reference"])
+
+    # numerical_match: correctness and the numerical values of both answers
+    if "You MUST ANSWER JSON FORMAT" in prompt:
+        teacher = _NUMBER_PATTERN.findall(item["reference"])
+        student = _NUMBER_PATTERN.findall(item["pred"])
+        return json.dumps(
+            {
+                "correctness": verdict,
+                "numerical_values": {
+                    "value": {
+                        "teacher": teacher[0] if teacher else "N/A",
+                        "student": student[0] if student else "N/A",
+                        "unit": "",
+                        "type": "number",
+                    }
+                },
+            }
+        )
+
+    # llm_fuzzy_match and json_match
+    return verdict
@@ -0,0 +1,130 @@
+# judge_stub.py
+
+import argparse
+import asyncio
+import itertools
+import random
+import time
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+import uvicorn
+
+from fieldworkarena.agent.metrics.automatic.judge_rules import respond
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+DEFAULT_STUB_PORT = 9099
+
+
+def create_app(
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    error_rate: float = 0.0,
+    seed: int | None = None,
+) -> Starlette:
+    """Create an OpenAI-compatible chat completions server answering with respond().
+
+    Args:
+        latency: Mean response time in seconds.
+        jitter: Response times are drawn uniformly from latency +/- jitter.
+        error_rate: Probability of answering with an injected 429 rate-limit error.
+        seed: Seed of the latency and error draws.
+    """
+    rng = random.Random(seed)
+    counter = itertools.count(1)
+    stats = {"requests": 0, "errors": 0}
+
+    async def chat_completions(request: Request) -> JSONResponse:
+        body = await request.json()
+        stats["requests"] += 1
+        delay = max(0.0, latency + rng.uniform(-jitter, jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        if rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(
+                {
+                    "error": {
+                        "message": "Rate limit reached (injected by the judge stub)",
+                        "type": "rate_limit_error",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                status_code=429,
+            )
+
+        messages = body.get("messages", [])
+        content = respond(messages)
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in messages)
+        completion_tokens = len(content.split())
+        return JSONResponse(
+            {
+                "id": f"chatcmpl-stub-{next(counter)}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            }
+        )
+
+    async def get_stats(_request: Request) -> JSONResponse:
+        return JSONResponse(stats)
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/chat/completions", chat_completions, methods=["POST"]),
+            Route("/stats", get_stats, methods=["GET"]),
+        ]
+    )
+
+
+def main():
+    """Entry point for fwa-judge-stub command.
+
+    Serve a local stand-in for the OpenAI judge, for load tests of the green agent without
+    network access: set OPENAI_BASE_URL=http://{host}:{port}/v1 and any OPENAI_API_KEY.
+    """
+    # --- Parse command-line arguments ---
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible stub judge.")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Host to bind the server")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_STUB_PORT, help="Port to bind the server"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Mean response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Response time jitter in seconds")
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Probability of an injected 429 error"
+    )
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed of the latency and error draws"
+    )
+    args = parser.parse_args()
+    # --- end ---
+
+    app = create_app(
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed
+    )
+    logger.info(f"Judge stub listening on http://{args.host}:{args.port}/v1")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+# tokenizer.py
+
+from functools import lru_cache
+import re
+
+# Single-pass equivalent of nltk.word_tokenize (Punkt sentence splitting + NLTKWordTokenizer)
+# for the answers of the benchmark. Sentence splitting only matters to NLTK for the final
+# period of each sentence, so a period ending a word is split off unless the word is a
+# known abbreviation, or a number followed by a lowercase word.
+
+_CLOSERS = "\\]\\)}>\"'»”’"
+_SEPARATORS = ';@#$%&?!*\\[\\](){}<>"«“‘„»”’`‒-―'
+_SEPARATOR_CHARS = frozenset(";@#$%&?!*[](){}<>«“‘„»”’`‒–—―")
+# Punkt also ends a sentence at a period directly followed by one of these characters
+_BREAK_CHARS = "?!)\";}\\]*:@'({\\["
+_SENTENCE_END = rf"(?:[{_CLOSERS}]*(?:\s|$)|[{_BREAK_CHARS}])"
+
+# abbreviations that do not end a sentence in the Punkt english model
+ABBREVIATIONS = frozenset({"e.g", "i.e", "etc", "vs", "mr", "mrs", "ms", "dr", "u.s", "a.m", "p.m"})
+
+_TOKEN_PATTERN = re.compile(
+    rf"""
+    (
+        \.{{2,}}                                 # ellipsis
+      | --
+      | "|''                                    # closing double quote
+      | `+                                      # opening double quote, backticks
+      | [{_SEPARATORS}]
+      | [:,](?!\d)
+      | (?:                                     # word
+            [^\s{_SEPARATORS}:,.'\-]
+          | '(?!')
+          | [:,](?=\d)
+          | -(?!-)
+          | \.(?!\.|{_SENTENCE_END})
+        )+
+      | \.
+    )
+    (\.(?={_SENTENCE_END}))?                    # sentence-final period
+    """,
+    re.VERBOSE,
+)
+# a double quote opens at the start of the text or after a space or an opening bracket, and
+# at the start of a sentence ended by a period directly followed by it
+_OPENING_DOUBLE_QUOTE_PATTERN = re.compile(
+    rf"^\"|(?<=[ (\[{{<])(?:\"|'')|(?<=[^.]\.)\"(?=[{_CLOSERS}]*[^\s{_CLOSERS}])"
+)
+# Punkt types a token as a number when it matches this pattern
+_NUMBER_PATTERN = re.compile(r"-?[.,]?\d[\d,.\-]*")
+_CLOSING_TOKENS = frozenset({"''", "'", ")", "]", "}", ">", "»", "”", "’"})
+
+# clitics split off the end of a word, e.g. "don't" -> "do", "n't"
+_CLITIC_PATTERN = re.compile(r"(?i)^(?P<stem>.*[^' ])(?P<clitic>'s|'m|'d|'ll|'re|'ve|n't|')$")
+# opening single quote split off the start of a word, e.g. "'hello" -> "'", "hello"
+_OPENING_QUOTE_PATTERN = re.compile(r"(?i)^'(?!(?:re|ve|ll|m|t|s|d|n)\b)(?=\w)")
+# contractions split into two tokens, e.g. "cannot" -> "can", "not"
+CONTRACTIONS = {
+    "cannot": 3,
+    "d'ye": 1,
+    "gimme": 3,
+    "gonna": 3,
+    "gotta": 3,
+    "lemme": 3,
+    "more'n": 4,
+    "wanna": 3,
+    "'tis": 2,
+    "'twas": 2,
+}
+
+
+def _split_word(word: str) -> list[str]:
+    # most words have nothing to split
+    if "'" not in word and word.lower() not in CONTRACTIONS:
+        return [word]
+
+    tokens = []
+    # words never follow a word character, so a leading quote may open a quotation
+    if _OPENING_QUOTE_PATTERN.match(word):
+        tokens.append("'")
+        word = word[1:]
+
+    clitic = None
+    match = _CLITIC_PATTERN.match(word)
+    if match:
+        word, clitic = match.group("stem"), match.group("clitic")
+
+    split = CONTRACTIONS.get(word.lower())
+    if split:
+        tokens.extend((word[:split], word[split:]))
+    else:
+        tokens.append(word)
+
+    if clitic:
+        tokens.append(clitic)
+    return tokens
+
+
+def word_tokenize(text: str) -> list[str]:
+    """Tokenize the text like nltk.word_tokenize, in a single regex pass."""
+    if '"' in text or "''" in text:
+        text = _OPENING_DOUBLE_QUOTE_PATTERN.sub(" `` ", text)
+
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    raw_tokens = [match.groups("") for match in matches]
+    tokens: list[str] = []
+    for i, (token, period) in enumerate(raw_tokens):
+        if token == '"' or token == "''":
+            tokens.append("''")
+        elif token[0] in _SEPARATOR_CHARS or token[0] in ".:,`":
+            tokens.append(token)
+        # an abbreviation keeps its period unless only closing tokens follow it
+        elif (
+            period
+            and token.lower().lstrip("'") in ABBREVIATIONS
+            and not all(t in _CLOSING_TOKENS or t == '"' for t, _ in raw_tokens[i + 1 :])
+        ):
+            tokens.extend(_split_word(token + period))
+            continue
+        # Punkt does not end a sentence at a number followed by a lowercase word
+        elif period and _is_number_before_lowercase(token, text, matches[i].end()):
+            tokens.append(token + period)
+            continue
+        else:
+            tokens.extend(_split_word(token))
+        if period:
+            tokens.append(period)
+    return tokens
+
+
+def _is_number_before_lowercase(token: str, text: str, end: int) -> bool:
+    # Punkt splits words at colons, so the number of a time is its last field
+    if not _NUMBER_PATTERN.fullmatch(token.rsplit(":", 1)[-1]):
+        return False
+    rest = text[end:]
+    stripped = rest.lstrip()
+    return rest[:1].isspace() and stripped[:1].islower()
+
+
+@lru_cache(maxsize=4096)
+def tokenize_reference(reference: str) -> tuple[str, ...]:
+    """Memoized word_tokenize for reference answers, which are tokenized for every judgement."""
+    return tuple(word_tokenize(reference))
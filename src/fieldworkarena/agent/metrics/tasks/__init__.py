@@ -2,7 +2,23 @@
 Tasks package for loading task data.
 """
 
-from .task_loader import TaskLoader, build_goal
-from .data_source import BenchmarkDataSource
+from .task_loader import TaskLoader, build_goal, get_task_loader
+from .task import Task
+from .task_index import TaskIndex
+from .data_source import BenchmarkDataSource, LocalDirectoryDataSource
+from .prefetcher import PayloadPrefetcher
+from .payload_cache import PayloadCache
+from .payload_store import EncodedPayloadStore
 
-__all__ = ['TaskLoader', 'build_goal', 'BenchmarkDataSource']
+__all__ = [
+    'TaskLoader',
+    'build_goal',
+    'get_task_loader',
+    'Task',
+    'TaskIndex',
+    'BenchmarkDataSource',
+    'LocalDirectoryDataSource',
+    'PayloadPrefetcher',
+    'PayloadCache',
+    'EncodedPayloadStore',
+]
@@ -1,21 +1,84 @@
 # data_source.py
 
+import asyncio
 import base64
+import hashlib
 import io
 import mimetypes
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Union
+import threading
 
 from a2a.types import FileWithBytes
 from huggingface_hub import HfApi, hf_hub_download
 from huggingface_hub.utils import HfHubHTTPError
 from PIL import Image
 
+from fieldworkarena.agent_core.streamed_payload import StreamedFileWithBytes
 from fieldworkarena.log.fwa_logger import getLogger
+from .payload_cache import DEFAULT_PAYLOAD_CACHE_MAX_BYTES, PayloadCache
+from .payload_store import EncodedPayloadStore
 logger = getLogger(__name__)
 
 
+# input_data of a task: a list of file names (V1), a space-separated string (V2) or a Task's files
+InputData = str | list[str] | tuple[str, ...]
+
+# Number of files of a task loaded at the same time by aload_file_payload
+DEFAULT_MAX_PARALLEL_FILES = 4
+
+# Files at least this large (other than images) are streamed from disk instead of held in memory
+DEFAULT_STREAM_THRESHOLD_BYTES = 4 << 20
+
+# Subdirectory of the dataset repository holding each allowed file extension
+SUBDIRECTORIES = {
+    '.pdf': 'document',
+    '.txt': 'document',
+    '.mp4': 'movie',
+    '.jpg': 'image',
+}
+
+
+def normalize_file_names(input_data: InputData) -> list[str]:
+    """
+    Normalize the input_data of a task to a list of file names.
+
+    Args:
+        input_data: Either a list of filenames (V1 format), space-separated string (V2 format),
+                    or the tuple of file names of a Task record.
+
+    Returns:
+        list[str]: List of file names.
+    """
+    if isinstance(input_data, list):
+        return input_data
+    if isinstance(input_data, tuple):
+        return list(input_data)
+    return input_data.split()
+
+
+def get_repo_path(file_name: str) -> str:
+    """
+    Get the path of a data file in the dataset repository: data/{subdirectory}/{file_name}
+
+    Args:
+        file_name: Name of the data file.
+
+    Returns:
+        str: Repository path of the file.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    extension = Path(file_name).suffix.lower()
+    subdirectory = SUBDIRECTORIES.get(extension)
+    if subdirectory is None:
+        error_msg = f"Unsupported file extension: {extension} for file '{file_name}'"
+        logger.error(error_msg)
+        raise ValueError(error_msg)
+    return f"data/{subdirectory}/{file_name}"
+
+
 class DataSource(ABC):
     """
     Abstract class for benchmark data sources.
@@ -42,6 +105,14 @@ class DataSource(ABC):
         """
         raise NotImplementedError
 
+    async def aload_file_payload(
+        self, input_data: InputData, max_parallel: int | None = None
+    ) -> list[FileWithBytes]:
+        """
+        Async variant of load_file_payload. By default, load_file_payload runs in a worker thread.
+        """
+        return await asyncio.to_thread(self.load_file_payload, input_data)
+
 
 class BenchmarkDataSource(DataSource):
     """
@@ -55,12 +126,23 @@ class BenchmarkDataSource(DataSource):
         repo_type: str = "dataset",
         cache_dir: str | None = None,
         force_download: bool = False,
+        payload_cache_max_bytes: int = DEFAULT_PAYLOAD_CACHE_MAX_BYTES,
+        payload_store_dir: str | None = None,
+        stream_threshold_bytes: int | None = DEFAULT_STREAM_THRESHOLD_BYTES,
     ):
         self.repo_id = repo_id
         self.access_token = access_token.strip() if access_token else ""
         self.repo_type = repo_type
         self.cache_dir = cache_dir
         self.force_download = force_download
+        self.payload_cache = PayloadCache(max_bytes=payload_cache_max_bytes)
+        self.payload_store = EncodedPayloadStore(payload_store_dir) if payload_store_dir else None
+        # files at least this large (None: no file) are loaded as StreamedFileWithBytes, whose
+        # Base64 data is encoded from the memory-mapped file while the request is sent
+        self.stream_threshold_bytes = stream_threshold_bytes
+        # number of .jpg files sent as is / re-encoded by _load_base64
+        self.jpeg_stats = {"passthrough": 0, "reencoded": 0}
+        self._jpeg_stats_lock = threading.Lock()
 
     def validate_access(self) -> None:
         """
@@ -83,7 +165,8 @@ class BenchmarkDataSource(DataSource):
     def _load_base64(self, file_path: Path) -> str:
         """
         Retrieve the data from the specified path and return it as a Base64-encoded string.
-        For image files, converts to JPEG format and handles transparency channels.
+        Baseline RGB or grayscale JPEG images are passed through untouched. Other image files
+        are converted to JPEG format, handling transparency channels.
 
         Args:
             file_path (Path): Path to the data file.
@@ -91,19 +174,42 @@ class BenchmarkDataSource(DataSource):
             str: Base64-encoded string of the file content.
         """
         if file_path.suffix.lower() in ['.jpg']:
-            image = Image.open(file_path)
-            if image.mode in ("RGBA", "LA"):
-                image = image.convert("RGB")
-            
-            with io.BytesIO() as buffer:
-                image.save(buffer, format="JPEG")
-                encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+            with Image.open(file_path) as image:
+                # Image.open only reads the header, so this check does not decode the image
+                if self._is_passthrough_jpeg(image):
+                    self._count_jpeg("passthrough")
+                    with file_path.open("rb") as f:
+                        return base64.b64encode(f.read()).decode("utf-8")
+
+                self._count_jpeg("reencoded")
+                if image.mode in ("RGBA", "LA"):
+                    image = image.convert("RGB")
+
+                with io.BytesIO() as buffer:
+                    image.save(buffer, format="JPEG")
+                    encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
         else:
             with file_path.open("rb") as f:
                 encoded = base64.b64encode(f.read()).decode("utf-8")
 
         return encoded
 
+    @staticmethod
+    def _is_passthrough_jpeg(image: Image.Image) -> bool:
+        """
+        Check from the image header whether the image is a baseline JPEG that can be sent as is.
+        """
+        return (
+            image.format == "JPEG"
+            and image.mode in ("RGB", "L")
+            and not image.info.get("progressive")
+            and not image.info.get("progression")
+        )
+
+    def _count_jpeg(self, path: str) -> None:
+        with self._jpeg_stats_lock:
+            self.jpeg_stats[path] += 1
+
     def _download(self, file_name: str) -> Path:
         """
         Retrieve remote data locally (considering cache).
@@ -144,6 +250,64 @@ class BenchmarkDataSource(DataSource):
             logger.error(error_msg)
             raise RuntimeError(error_msg) from e
 
+    def _file_revision(self, file_path: Path) -> str | None:
+        """
+        Get an identifier of the file content used as part of the payload cache key.
+
+        Files in the Hugging Face cache are symlinks to content-addressed blobs, so the blob name
+        is used. Otherwise, the size and modification time of the file are used.
+
+        Args:
+            file_path (Path): Path to the downloaded data file.
+        Returns:
+            str | None: The revision identifier, or None if the file cannot be inspected.
+        """
+        try:
+            resolved = file_path.resolve()
+            if resolved.parent.name == "blobs":
+                return resolved.name
+            stat = resolved.stat()
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        except OSError:
+            return None
+
+    def _content_hash(self, file_path: Path) -> str:
+        """
+        Get the hash of the file content used as the payload store key.
+
+        Files in the Hugging Face cache are symlinks to blobs named after their hash, so the blob
+        name is used without reading the file. Otherwise, the SHA-256 of the content is computed.
+
+        Args:
+            file_path (Path): Path to the downloaded data file.
+        Returns:
+            str: Hash of the file content.
+        """
+        resolved = file_path.resolve()
+        if resolved.parent.name == "blobs":
+            return resolved.name
+        with resolved.open("rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+    def _load_encoded(self, file_path: Path) -> str:
+        """
+        Get the Base64-encoded payload of the file, using the persistent payload store if enabled.
+
+        Args:
+            file_path (Path): Path to the downloaded data file.
+        Returns:
+            str: Base64-encoded string of the file content.
+        """
+        if self.payload_store is None:
+            return self._load_base64(file_path)
+
+        content_hash = self._content_hash(file_path)
+        encoded = self.payload_store.get(content_hash)
+        if encoded is None:
+            encoded = self._load_base64(file_path)
+            self.payload_store.put(content_hash, encoded)
+        return encoded
+
     def _get_media_type(self, file_path: Path) -> str:
         """
         Get the media type based on the file extension.
@@ -156,6 +320,23 @@ class BenchmarkDataSource(DataSource):
             raise ValueError(f"Unsupported file type: {file_path.suffix}")
         return media_type
     
+    def _is_streamed(self, file_path: Path) -> bool:
+        """
+        Check if the file is loaded as a StreamedFileWithBytes.
+        JPEG images may be re-encoded by _load_base64, so they are always held in memory.
+
+        Args:
+            file_path (Path): Path to the downloaded data file.
+        Returns:
+            bool: False if the file is small or cannot be inspected.
+        """
+        if self.stream_threshold_bytes is None or file_path.suffix.lower() == ".jpg":
+            return False
+        try:
+            return file_path.stat().st_size >= self.stream_threshold_bytes
+        except OSError:
+            return False
+
     def _load_single_file(self, file_name: str) -> FileWithBytes:
         """
         Load a single file and return as FileWithBytes.
@@ -166,36 +347,36 @@ class BenchmarkDataSource(DataSource):
         Returns:
             FileWithBytes: File payload with mediaType, name, and Base64-encoded data.
         """
-        # Determine subdirectory based on file extension
-        file_path_obj = Path(file_name)
-        extension = file_path_obj.suffix.lower()
-        
-        if extension in ['.pdf', '.txt']:
-            subdirectory = 'document'
-        elif extension == '.mp4':
-            subdirectory = 'movie'
-        elif extension in ['.jpg']:
-            subdirectory = 'image'
-        else:
-            error_msg = f"Unsupported file extension: {extension} for file '{file_name}'"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-        
-        # Construct repository path: data/{subdirectory}/{file_name}
-        repo_path = f"data/{subdirectory}/{file_name}"
+        # Construct repository path based on file extension: data/{subdirectory}/{file_name}
+        repo_path = get_repo_path(file_name)
         
         try:
             logger.info(f"Loading file: {file_name} from path: {repo_path}")
             local_path = self._download(repo_path)
-            base64_data = self._load_base64(local_path)
+
+            # files shared by many tasks are encoded only once
+            revision = self._file_revision(local_path)
+            cache_key = (repo_path, revision)
+            if revision is not None:
+                cached = self.payload_cache.get(cache_key)
+                if cached is not None:
+                    logger.info(f"Loaded file from payload cache: {file_name}")
+                    return cached
+
             media_type = self._get_media_type(local_path)
+            if self._is_streamed(local_path):
+                payload = StreamedFileWithBytes.from_file(local_path, media_type, local_path.name)
+            else:
+                payload = FileWithBytes(
+                    bytes=self._load_encoded(local_path),
+                    mime_type=media_type,
+                    name=local_path.name,
+                )
+            if revision is not None:
+                self.payload_cache.put(cache_key, payload)
 
             logger.info(f"Successfully loaded file: {file_name}")
-            return FileWithBytes(
-                bytes=base64_data,
-                mime_type=media_type,
-                name=local_path.name,
-            )
+            return payload
         except (ValueError, FileNotFoundError, RuntimeError) as e:
             logger.error(f"Error loading file '{file_name}': {e}")
             raise
@@ -204,7 +385,7 @@ class BenchmarkDataSource(DataSource):
             logger.error(error_msg)
             raise RuntimeError(error_msg) from e 
 
-    def load_file_payload(self, input_data: Union[str, list[str]]) -> list[FileWithBytes]:
+    def load_file_payload(self, input_data: InputData) -> list[FileWithBytes]:
         """
         Retrieve file payloads from input data. Supports both V1 (list) and V2 (space-separated string) formats.
 
@@ -217,10 +398,7 @@ class BenchmarkDataSource(DataSource):
             list[FileWithBytes]: List of file payloads with mediaType, name, and Base64-encoded data.
         """
         # Normalize input to list of filenames
-        if isinstance(input_data, list):
-            file_names = input_data
-        else:
-            file_names = input_data.split()
+        file_names = normalize_file_names(input_data)
         
         logger.info(f"Loading {len(file_names)} file(s): {file_names}")
         
@@ -235,4 +413,95 @@ class BenchmarkDataSource(DataSource):
         except Exception as e:
             error_msg = f"Unexpected error loading file payloads: {type(e).__name__} - {e}"
             logger.error(error_msg)
-            raise RuntimeError(error_msg) from e    
\ No newline at end of file
+            raise RuntimeError(error_msg) from e
+
+    async def aload_file_payload(
+        self, input_data: InputData, max_parallel: int | None = None
+    ) -> list[FileWithBytes]:
+        """
+        Async variant of load_file_payload. Downloads and encodes the files of a task in parallel
+        worker threads. The order of the payloads and the raised errors are the same as
+        load_file_payload: if several files fail, the error of the first failing file is raised.
+
+        Args:
+            input_data: Either a list of filenames (V1 format) or space-separated string
+                        (V2 format).
+            max_parallel: Maximum number of files loaded at the same time
+                          (default: DEFAULT_MAX_PARALLEL_FILES).
+
+        Returns:
+            list[FileWithBytes]: List of file payloads with mediaType, name, and Base64-encoded
+                                 data.
+        """
+        file_names = normalize_file_names(input_data)
+        semaphore = asyncio.Semaphore(max_parallel or DEFAULT_MAX_PARALLEL_FILES)
+
+        logger.info(f"Loading {len(file_names)} file(s) in parallel: {file_names}")
+
+        async def load(file_name: str) -> FileWithBytes:
+            async with semaphore:
+                return await asyncio.to_thread(self._load_single_file, file_name)
+
+        results = await asyncio.gather(
+            *(load(fname) for fname in file_names), return_exceptions=True
+        )
+
+        for result in results:
+            if isinstance(result, (ValueError, FileNotFoundError, RuntimeError)):
+                logger.error(f"Error loading file payloads: {result}")
+                raise result
+            if isinstance(result, BaseException):
+                error_msg = (
+                    f"Unexpected error loading file payloads: {type(result).__name__} - {result}"
+                )
+                logger.error(error_msg)
+                raise RuntimeError(error_msg) from result
+
+        logger.info(f"Successfully loaded all {len(results)} file(s)")
+        return results
+
+
+class LocalDirectoryDataSource(BenchmarkDataSource):
+    """
+    Implementation of DataSource over a local directory mirroring the dataset repository
+    (e.g. synced in advance with fwa-prefetch). It never accesses the network.
+
+    Layout: {root_dir}/data/{document|movie|image}/{file_name}
+    """
+
+    def __init__(
+        self,
+        root_dir: str,
+        payload_cache_max_bytes: int = DEFAULT_PAYLOAD_CACHE_MAX_BYTES,
+        payload_store_dir: str | None = None,
+        stream_threshold_bytes: int | None = DEFAULT_STREAM_THRESHOLD_BYTES,
+    ):
+        super().__init__(
+            access_token="",
+            payload_cache_max_bytes=payload_cache_max_bytes,
+            payload_store_dir=payload_store_dir,
+            stream_threshold_bytes=stream_threshold_bytes,
+        )
+        self.root_dir = Path(root_dir)
+
+    def validate_access(self) -> None:
+        """
+        Validate the benchmark data access by checking the local directory.
+        """
+        data_dir = self.root_dir / "data"
+        if not data_dir.is_dir():
+            error_msg = f"Access validation failed: Data directory not found: {data_dir}"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+        logger.info(f"Access validation successful: {data_dir}")
+
+    def _download(self, file_name: str) -> Path:
+        """
+        Retrieve the data from the local directory.
+        """
+        local_path = self.root_dir / file_name
+        if not local_path.is_file():
+            error_msg = f"File '{file_name}' not found in the local directory '{self.root_dir}'."
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+        return local_path
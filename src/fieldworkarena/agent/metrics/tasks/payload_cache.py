@@ -0,0 +1,93 @@
+# payload_cache.py
+
+from collections import OrderedDict
+import threading
+from typing import Any
+
+from a2a.types import FileWithBytes
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+DEFAULT_PAYLOAD_CACHE_MAX_BYTES = 512 * 1024 * 1024  # 512 MiB of encoded payloads
+
+
+class PayloadCache:
+    """
+    Thread-safe, size-bounded LRU cache of file payloads.
+
+    Keys identify the content of a file (e.g. repository path and file revision hash), so a file
+    referenced by many tasks is read and encoded only once. The size of an entry is the length of
+    its Base64-encoded data. Entries larger than max_bytes are never cached.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_PAYLOAD_CACHE_MAX_BYTES):
+        """
+        Args:
+            max_bytes: Maximum total size of the cached payloads. 0 disables the cache.
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Any, FileWithBytes] = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(payload: FileWithBytes) -> int:
+        return len(payload.bytes)
+
+    def get(self, key: Any) -> FileWithBytes | None:
+        """Return the cached payload for the key, or None if it is not cached."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Any, payload: FileWithBytes) -> None:
+        """Cache the payload, evicting the least recently used entries to stay within max_bytes."""
+        size = self._size(payload)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= self._size(previous)
+
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= self._size(evicted)
+                self.evictions += 1
+                logger.debug(f"Evicted payload from cache: {evicted_key}")
+
+            self._entries[key] = payload
+            self.current_bytes += size
+
+    def clear(self) -> None:
+        """Remove all entries. Statistics are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict[str, int]:
+        """Return the cache statistics."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "current_bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,99 @@
+# payload_store.py
+
+import os
+from pathlib import Path
+import tempfile
+import threading
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+# bump when the encoding of payloads changes so that stale entries are not served
+PAYLOAD_STORE_VERSION = 2
+
+
+class EncodedPayloadStore:
+    """
+    Persistent on-disk store of Base64-encoded payloads.
+
+    Entries are keyed by the hash of the source file and hold the final Base64 form of the
+    payload (e.g. after JPEG re-encoding), so a restarted green agent serves payloads without
+    decoding or encoding anything.
+
+    Layout: {root_dir}/v{PAYLOAD_STORE_VERSION}/{key[:2]}/{key}.b64
+    """
+
+    def __init__(self, root_dir: str | Path):
+        """
+        Args:
+            root_dir: Directory of the store. It is created if it does not exist.
+        """
+        self.root_dir = Path(root_dir)
+        self._dir = self.root_dir / f"v{PAYLOAD_STORE_VERSION}"
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _path(self, key: str) -> Path:
+        return self._dir / key[:2] / f"{key}.b64"
+
+    def get(self, key: str) -> str | None:
+        """
+        Return the stored Base64 payload for the key, or None if it is not stored.
+
+        Args:
+            key: Hash of the source file.
+        """
+        path = self._path(key)
+        try:
+            # a plain read decodes straight into the string, a memory map would add a copy
+            encoded = path.read_text(encoding="ascii")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to read payload store entry {path}: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return encoded
+
+    def put(self, key: str, encoded: str) -> None:
+        """
+        Store the Base64 payload for the key. The entry is written atomically.
+
+        Args:
+            key: Hash of the source file.
+            encoded: Base64-encoded payload.
+        """
+        path = self._path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(encoded.encode("ascii"))
+                os.replace(tmp_name, path)
+            except BaseException:
+                Path(tmp_name).unlink(missing_ok=True)
+                raise
+        except OSError as e:
+            # the store is an optimization, failing to write must not fail the task
+            logger.warning(f"Failed to write payload store entry {path}: {e}")
+            return
+
+        with self._lock:
+            self.writes += 1
+
+    def stats(self) -> dict[str, int]:
+        """Return the store statistics."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
@@ -0,0 +1,203 @@
+# prefetcher.py
+
+import asyncio
+from collections.abc import Iterable, Iterator
+
+from a2a.types import FileWithBytes
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+from .data_source import DataSource, InputData
+
+logger = getLogger(__name__)
+
+
+DEFAULT_PREFETCH_TASKS = 2
+DEFAULT_PREFETCH_MAX_BYTES = 1 << 30  # 1 GiB of encoded payloads
+
+
+class PayloadPrefetcher:
+    """
+    Loads the file payloads of upcoming tasks in worker threads while earlier tasks are being
+    orchestrated and judged.
+
+    Loads start in task order and run concurrently, one per task, so up to max_tasks tasks are
+    loaded in parallel. A payload is held from the moment its load starts until the consumer
+    calls release(), and the next load only starts while both the number of held tasks and the
+    total size of loaded payloads stay below their limits.
+
+    The input_data of the tasks may be a lazy iterable (e.g. a generator of tasks). It is consumed
+    by the prefetcher as loads start, so at most max_tasks items ahead of the consumer.
+
+    Usage:
+        async with PayloadPrefetcher(data_source, input_data_list) as prefetcher:
+            payloads = await prefetcher.get(0)
+            ...
+            await prefetcher.release(0)
+    """
+
+    def __init__(
+        self,
+        data_source: DataSource,
+        input_data_list: Iterable[InputData],
+        max_tasks: int = DEFAULT_PREFETCH_TASKS,
+        max_bytes: int = DEFAULT_PREFETCH_MAX_BYTES,
+        max_parallel_files: int | None = None,
+    ):
+        """
+        Args:
+            data_source: Data source used to load the payloads.
+            input_data_list: The input_data of each task, in the order the tasks are consumed.
+                             It is iterated once, lazily.
+            max_tasks: Maximum number of tasks whose payloads are loading or held at the same time.
+            max_bytes: Memory budget for loaded, not yet released payloads (Base64 bytes).
+                       The size of a payload is only known once it is loaded, so the budget can
+                       be exceeded by the tasks loading when it is reached. At least one task is
+                       always held, even if it alone exceeds the budget.
+            max_parallel_files: Maximum number of files of a task loaded at the same time.
+        """
+        self._data_source = data_source
+        self._input_data: Iterator[InputData] = iter(input_data_list)
+        self.max_tasks = max(1, max_tasks)
+        self.max_bytes = max_bytes
+        self.max_parallel_files = max_parallel_files
+
+        self._producer: asyncio.Task | None = None
+        # loads started by the producer and not finished yet
+        self._loads: set[asyncio.Task] = set()
+        self._condition: asyncio.Condition | None = None
+        # futures of the tasks between the consumer and the producer, created by whichever
+        # of get() and the producer reaches the task first
+        self._results: dict[int, asyncio.Future] = {}
+        # tasks released before the producer reached them
+        self._released_ahead: set[int] = set()
+        self._next_index = 0
+        self._count: int | None = None
+        # error raised by the input_data iterable, for the tasks it did not reach
+        self._error: Exception | None = None
+        self._held: set[int] = set()
+        self._sizes: dict[int, int] = {}
+        self.loaded_bytes = 0
+
+    async def __aenter__(self) -> "PayloadPrefetcher":
+        self._condition = asyncio.Condition()
+        self._producer = asyncio.create_task(self._produce())
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if self._producer:
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+            except Exception:
+                # already raised to the consumer by get()
+                pass
+        for load in self._loads:
+            load.cancel()
+        await asyncio.gather(*self._loads, return_exceptions=True)
+        self._loads.clear()
+        for result in self._results.values():
+            if not result.done():
+                result.cancel()
+        self._results.clear()
+        self._released_ahead.clear()
+        self._held.clear()
+        self._sizes.clear()
+        self.loaded_bytes = 0
+
+    def _has_capacity(self) -> bool:
+        # always allow one task so that a payload larger than the budget cannot stall the pipeline
+        if not self._held:
+            return True
+        return len(self._held) < self.max_tasks and self.loaded_bytes < self.max_bytes
+
+    def _future(self, index: int) -> asyncio.Future:
+        result = self._results.get(index)
+        if result is None:
+            result = self._results[index] = asyncio.get_running_loop().create_future()
+        return result
+
+    async def _produce(self) -> None:
+        """Start the load of each task, in task order, while the budget allows it."""
+        try:
+            for index, input_data in enumerate(self._input_data):
+                async with self._condition:
+                    await self._condition.wait_for(self._has_capacity)
+                    self._next_index = index + 1
+                    # the consumer may have given up on the task before it was reached
+                    if index in self._released_ahead:
+                        self._released_ahead.discard(index)
+                        continue
+                    self._held.add(index)
+                    result = self._future(index)
+
+                load = asyncio.create_task(self._load(index, input_data, result))
+                self._loads.add(load)
+                load.add_done_callback(self._loads.discard)
+        except Exception as e:
+            # tasks the iterable did not reach will never be loaded, fail them with its error
+            self._error = e
+            for index, result in list(self._results.items()):
+                if index >= self._next_index and not result.done():
+                    result.set_exception(e)
+            raise
+
+        # tasks past the end will never be loaded
+        self._count = self._next_index
+        for index, result in list(self._results.items()):
+            if index >= self._count and not result.done():
+                result.set_exception(IndexError(f"No task #{index}"))
+
+    async def _load(self, index: int, input_data: InputData, result: asyncio.Future) -> None:
+        """Load the payloads of one task and resolve its future."""
+        logger.info(f"Prefetching payloads of task #{index}: {input_data}")
+        try:
+            payloads: list[FileWithBytes] = await self._data_source.aload_file_payload(
+                input_data, max_parallel=self.max_parallel_files
+            )
+        except Exception as e:
+            if not result.done():
+                result.set_exception(e)
+            return
+
+        # the consumer may have given up on the task while it was loading
+        if index not in self._held or result.done():
+            return
+        size = sum(len(payload.bytes) for payload in payloads)
+        self._sizes[index] = size
+        self.loaded_bytes += size
+        result.set_result(payloads)
+
+    async def get(self, index: int) -> list[FileWithBytes]:
+        """
+        Wait for the payloads of the task at the given position.
+
+        Raises:
+            The error raised by the data source while loading the payloads.
+            IndexError: If there is no task at the given position.
+            The error raised by the input_data iterable before reaching the task.
+        """
+        released = (
+            index in self._released_ahead
+            if index >= self._next_index
+            else index not in self._results
+        )
+        if released:
+            raise RuntimeError(f"Payloads of task #{index} have already been released")
+        if self._count is not None and index >= self._count:
+            raise IndexError(f"No task #{index}")
+        if self._error is not None and index >= self._next_index:
+            raise self._error
+        return await self._future(index)
+
+    async def release(self, index: int) -> None:
+        """Release the payloads of the task at the given position so later tasks can be loaded."""
+        async with self._condition:
+            self._results.pop(index, None)
+            if index >= self._next_index:
+                self._released_ahead.add(index)
+            self._held.discard(index)
+            self.loaded_bytes -= self._sizes.pop(index, 0)
+            self._condition.notify_all()
@@ -0,0 +1,83 @@
+# task.py
+
+from dataclasses import dataclass
+import os
+import sys
+from typing import Any
+
+from .data_source import SUBDIRECTORIES, normalize_file_names
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    """
+    Compact, immutable record of a benchmark task, holding only the fields used by the evaluation.
+
+    The few distinct eval_func and output_format values are interned so that all tasks share them.
+    """
+
+    id: str
+    files: tuple[str, ...]  # normalized input_data (see normalize_file_names)
+    query: str | None
+    answer: str | None
+    output_format: str | None
+    eval_func: str | None
+
+    @classmethod
+    def from_raw(cls, task: dict[str, Any]) -> "Task":
+        """
+        Create the record of a raw task of the task JSON files, with the query and answer
+        extracted from its conversations.
+        """
+        query = None
+        answer = None
+        for conversation in task.get("conversations", []):
+            if conversation.get("from") == "human":
+                query = conversation.get("value")
+            elif conversation.get("from") == "gpt":
+                answer = conversation.get("value")
+
+        input_data = task.get("input_data")
+        return cls(
+            id=task.get("id"),
+            files=tuple(normalize_file_names(input_data)) if input_data is not None else (),
+            query=query,
+            answer=answer,
+            output_format=_intern(task.get("output_format")),
+            eval_func=_intern(task.get("eval_func")),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Task":
+        """Create a record from the dictionary returned by to_dict()."""
+        return cls(
+            id=data["id"],
+            files=tuple(data["files"]),
+            query=data["query"],
+            answer=data["answer"],
+            output_format=_intern(data["output_format"]),
+            eval_func=_intern(data["eval_func"]),
+        )
+
+    @property
+    def has_video(self) -> bool:
+        """True if an input file of the task is a video."""
+        return any(
+            SUBDIRECTORIES.get(os.path.splitext(file_name)[1].lower()) == "movie"
+            for file_name in self.files
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the record as a JSON-serializable dictionary."""
+        return {
+            "id": self.id,
+            "files": list(self.files),
+            "query": self.query,
+            "answer": self.answer,
+            "output_format": self.output_format,
+            "eval_func": self.eval_func,
+        }
@@ -0,0 +1,265 @@
+# task_index.py
+
+import argparse
+from collections.abc import Iterable, Iterator
+import hashlib
+import json
+import os
+from pathlib import Path
+import sys
+import tempfile
+import threading
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+from .task import Task
+
+logger = getLogger(__name__)
+
+
+# bump when the layout of the index or of its records changes so that stale indexes are rebuilt
+TASK_INDEX_VERSION = 2
+
+DEFAULT_TASKS_DIR = "benchmark/tasks/group2"
+
+
+def default_index_path(tasks_dir: str | Path) -> Path:
+    """Return the path of the index of a tasks directory, next to it (e.g. group2.index.json)."""
+    tasks_dir = Path(tasks_dir)
+    return tasks_dir.with_name(f"{tasks_dir.name}.index.json")
+
+
+def _read_task_files(tasks_dir: Path) -> list[tuple[Path, bytes]]:
+    return [(json_file, json_file.read_bytes()) for json_file in sorted(tasks_dir.glob("*.json"))]
+
+
+def _hash_task_files(task_files: list[tuple[Path, bytes]]) -> str:
+    digest = hashlib.sha256(f"v{TASK_INDEX_VERSION}".encode("ascii"))
+    for json_file, content in task_files:
+        name = json_file.name.encode("utf-8")
+        digest.update(len(name).to_bytes(8, "big") + name)
+        digest.update(len(content).to_bytes(8, "big") + content)
+    return digest.hexdigest()
+
+
+def compute_tasks_hash(tasks_dir: str | Path) -> str:
+    """Return the hash of the names and contents of the task files of a tasks directory."""
+    return _hash_task_files(_read_task_files(Path(tasks_dir)))
+
+
+class TaskIndex:
+    """
+    Compiled index of the task files of a tasks directory.
+
+    Holds the Task record of every task by task id, in the order of the task files, so that
+    the tasks of a target are found with dictionary lookups instead of parsing and scanning all
+    task files. The index is stored as a single JSON file with the hash of the task files it
+    was built from, and rebuilt when they change.
+    """
+
+    def __init__(self, records: dict[str, Task], tasks_hash: str):
+        """
+        Args:
+            records: Task records by task id, in the order of the task files.
+            tasks_hash: Hash of the task files the records were built from.
+        """
+        self.records = records
+        self.tasks_hash = tasks_hash
+        self._records = list(records.values())
+        self._positions = {task_id: i for i, task_id in enumerate(records)}
+
+    @classmethod
+    def build(cls, tasks_dir: str | Path) -> "TaskIndex":
+        """
+        Build the index by parsing the task files of a tasks directory.
+
+        Files that cannot be parsed are skipped with a warning. If a task id appears more than
+        once, its first occurrence is kept.
+
+        Args:
+            tasks_dir: Directory of the task JSON files.
+        """
+        task_files = _read_task_files(Path(tasks_dir))
+        records: dict[str, Task] = {}
+        for json_file, content in task_files:
+            try:
+                tasks_data = json.loads(content)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                logger.warning(f"Warning: Failed to parse JSON file {json_file}: {e}")
+                continue
+            if not isinstance(tasks_data, list):
+                continue
+
+            for task in tasks_data:
+                if not isinstance(task, dict) or "id" not in task:
+                    continue
+                if task["id"] in records:
+                    logger.warning(f"Warning: Duplicate task id {task['id']} in {json_file}")
+                    continue
+                records[task["id"]] = Task.from_raw(task)
+
+        return cls(records, _hash_task_files(task_files))
+
+    @classmethod
+    def load(cls, path: str | Path) -> "TaskIndex | None":
+        """Load an index file, or return None if it is missing, unreadable or of another version."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != TASK_INDEX_VERSION:
+                return None
+            records = {task_id: Task.from_dict(task) for task_id, task in data["tasks"].items()}
+            return cls(records, data["hash"])
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Failed to read task index {path}: {e}")
+            return None
+
+    def save(self, path: str | Path) -> None:
+        """Write the index file atomically."""
+        path = Path(path)
+        data = {
+            "version": TASK_INDEX_VERSION,
+            "hash": self.tasks_hash,
+            "tasks": {task_id: task.to_dict() for task_id, task in self.records.items()},
+        }
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def get(self, task_id: str) -> Task | None:
+        """Return the record of a task, or None if it is not indexed."""
+        return self.records.get(task_id)
+
+    def _find(self, task_ids: Iterable[str]) -> list[int]:
+        positions = self._positions
+        return sorted({positions[task_id] for task_id in task_ids if task_id in positions})
+
+    def iter_records(self, task_ids: Iterable[str]) -> Iterator[Task]:
+        """
+        Return an iterator over the records of the indexed tasks among task_ids, in the order of
+        the task files. Unknown and repeated ids are ignored. The ids are looked up immediately.
+        """
+        records = self._records
+        return (records[i] for i in self._find(task_ids))
+
+    def lookup(self, task_ids: Iterable[str]) -> list[Task]:
+        """Return the list of the records of iter_records(task_ids)."""
+        return list(self.iter_records(task_ids))
+
+    def count(self, task_ids: Iterable[str]) -> int:
+        """Return the number of indexed tasks among task_ids, ignoring repeated ids."""
+        positions = self._positions
+        return len({task_id for task_id in task_ids if task_id in positions})
+
+    def __contains__(self, task_id: object) -> bool:
+        return task_id in self.records
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+
+def open_task_index(tasks_dir: str | Path, index_path: str | Path | None = None) -> TaskIndex:
+    """
+    Open the index of a tasks directory, rebuilding it if it is missing or stale.
+
+    Args:
+        tasks_dir: Directory of the task JSON files.
+        index_path: Path of the index file. Defaults to default_index_path(tasks_dir).
+    """
+    tasks_dir = Path(tasks_dir)
+    if not tasks_dir.exists():
+        logger.error(f"Tasks directory not found: {tasks_dir}")
+        raise FileNotFoundError(f"Tasks directory not found: {tasks_dir}")
+    index_path = Path(index_path) if index_path is not None else default_index_path(tasks_dir)
+
+    index = TaskIndex.load(index_path)
+    if index is not None and index.tasks_hash == compute_tasks_hash(tasks_dir):
+        return index
+
+    logger.info(f"Building task index {index_path} from {tasks_dir}")
+    index = TaskIndex.build(tasks_dir)
+    try:
+        index.save(index_path)
+    except OSError as e:
+        # the index file is an optimization, the rebuilt index is still used by this process
+        logger.warning(f"Failed to write task index {index_path}: {e}")
+    return index
+
+
+def _stat_task_files(tasks_dir: Path) -> tuple[tuple[str, int, int], ...] | None:
+    # names, modification times and sizes of the task files, without reading them
+    try:
+        with os.scandir(tasks_dir) as entries:
+            return tuple(
+                sorted(
+                    (entry.name, stat.st_mtime_ns, stat.st_size)
+                    for entry in entries
+                    if entry.name.endswith(".json")
+                    for stat in (entry.stat(),)
+                )
+            )
+    except OSError:
+        return None
+
+
+_indexes: dict[tuple[Path, Path | None], tuple[tuple | None, TaskIndex]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_task_index(tasks_dir: str | Path, index_path: str | Path | None = None) -> TaskIndex:
+    """
+    Return the index of a tasks directory, kept in memory by the process.
+
+    The index is opened again (see open_task_index) only when the modification time or size
+    of a task file changes, or a task file is added or removed. Checking this only needs the
+    stat of the task files.
+    """
+    tasks_dir = Path(tasks_dir)
+    key = (tasks_dir.resolve(), Path(index_path).resolve() if index_path else None)
+    signature = _stat_task_files(tasks_dir)
+    with _indexes_lock:
+        cached = _indexes.get(key)
+        if cached is not None and signature is not None and cached[0] == signature:
+            return cached[1]
+        index = open_task_index(tasks_dir, index_path)
+        _indexes[key] = (signature, index)
+        return index
+
+
+def main():
+    """Entry point for fwa-build-task-index command.
+
+    Compile the task files into the index read by TaskLoader, e.g. at image build time, so that
+    the green agent does not parse the task files.
+    """
+    # --- Parse command-line arguments ---
+    parser = argparse.ArgumentParser(description="Build the task index of the FWA benchmark.")
+    parser.add_argument("--tasks-dir", type=str, default=DEFAULT_TASKS_DIR)
+    parser.add_argument(
+        "--index-path",
+        type=str,
+        default=None,
+        help="Path of the index file (default: next to the tasks directory)",
+    )
+    args = parser.parse_args()
+    # --- end ---
+
+    if not Path(args.tasks_dir).is_dir():
+        print(f"Error: Tasks directory not found: {args.tasks_dir}")
+        sys.exit(1)
+
+    index_path = args.index_path or default_index_path(args.tasks_dir)
+    index = TaskIndex.build(args.tasks_dir)
+    index.save(index_path)
+    print(f"Indexed {len(index)} task(s) of {args.tasks_dir} in {index_path}")
+
+
+if __name__ == "__main__":
+    main()
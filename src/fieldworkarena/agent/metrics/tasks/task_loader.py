@@ -3,26 +3,87 @@ Task loader module for loading task IDs from configuration files.
 """
 
 import json
+import os
+import threading
 import tomllib
+from collections.abc import Iterator
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any
 
+from fieldworkarena.agent.metrics.tasks.task import Task
+from fieldworkarena.agent.metrics.tasks.task_index import get_task_index
 from fieldworkarena.log.fwa_logger import getLogger
 logger = getLogger(__name__)
 
 
+def to_numeric_task_id(task_id: str) -> str:
+    """
+    Extract the numeric part of a task ID (e.g., "1.1.0001" from "fieldworkarena.1.1.0001"),
+    which is the id of the task in the task JSON files.
+    """
+    # This assumes the format is "prefix.X.X.XXXX"
+    parts = task_id.split('.')
+    if len(parts) >= 3:
+        # Split by '.' and take the last 3 parts (e.g., "1.1.0001")
+        return '.'.join(parts[-3:])
+    # If format is unexpected, use the full task_id
+    return task_id
+
+
 class TaskLoader:
-    """Loads task IDs from TOML configuration files."""
+    """
+    Loads task IDs from TOML configuration files.
+
+    The parsed TOML file is kept in memory and parsed again only when its modification time
+    or size changes, so a loader can be reused across evaluation requests (see get_task_loader).
+    """
 
     def __init__(
             self, 
             tasks_dir:str = "benchmark/tasks/group2",
-            ids_path:str="benchmark/all_task_ids.toml"
+            ids_path:str="benchmark/all_task_ids.toml",
+            index_path:str | None = None
         ):
+        """
+        Args:
+            tasks_dir: Directory of the task JSON files.
+            ids_path: Path to the TOML file containing task IDs.
+            index_path: Path of the compiled task index. Defaults to a file next to tasks_dir.
+        """
         self.tasks_dir = tasks_dir
         self.ids_path = ids_path
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._targets: dict[str, Any] | None = None
+        self._targets_stat: tuple[int, int] | None = None
 
-    def load_task_ids(self, target: str) -> List[str]:
+    def _load_targets(self) -> dict[str, Any]:
+        """Return the parsed TOML file of task IDs, parsing it again only if it has changed."""
+        # Check if file exists
+        try:
+            stat = os.stat(self.ids_path)
+        except FileNotFoundError:
+            logger.error(f"Task IDs file not found: {self.ids_path}")
+            raise FileNotFoundError(f"Task IDs file not found: {self.ids_path}")
+        toml_stat = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            if self._targets is not None and self._targets_stat == toml_stat:
+                return self._targets
+
+            # Load TOML file
+            try:
+                with open(self.ids_path, 'rb') as f:
+                    data = tomllib.load(f)
+            except Exception as e:
+                logger.error(f"Failed to parse TOML file {self.ids_path}: {e}")
+                raise ValueError(f"Failed to parse TOML file {self.ids_path}: {e}")
+
+            self._targets = data
+            self._targets_stat = toml_stat
+            return data
+
+    def load_task_ids(self, target: str) -> list[str]:
         """
         Load task IDs from a TOML file based on the target category.
 
@@ -34,22 +95,9 @@ class TaskLoader:
         Returns:
             List of task IDs for the specified target category
         """
-        # Convert to Path object for better path handling
-        toml_path = Path(self.ids_path)
-        
-        # Check if file exists
-        if not toml_path.exists():
-            logger.error(f"Task IDs file not found: {self.ids_path}")
-            raise FileNotFoundError(f"Task IDs file not found: {self.ids_path}")
-        
-        # Load TOML file
-        try:
-            with open(toml_path, 'rb') as f:
-                data = tomllib.load(f)
-        except Exception as e:
-            logger.error(f"Failed to parse TOML file {self.ids_path}: {e}")
-            raise ValueError(f"Failed to parse TOML file {self.ids_path}: {e}")
-        
+        # Load TOML file, or reuse it if it has not changed
+        data = self._load_targets()
+
         # Check if target exists or is 'all'
         if target == 'all':
             # Extract all task IDs except from 'custom' category
@@ -68,8 +116,10 @@ class TaskLoader:
                     f"Available targets: {available_targets}"
                 )
             
-            # Get task IDs for the target
+            # Get task IDs for the target (a copy, so that callers cannot modify the cached TOML)
             task_ids = data[target]
+            if isinstance(task_ids, list):
+                task_ids = list(task_ids)
         
         # Ensure it's a list
         if not isinstance(task_ids, list):
@@ -92,7 +142,7 @@ class TaskLoader:
     def load_tasks_by_ids(
         self,
         target: str
-    ) -> List[Dict[str, Any]]:
+    ) -> list[dict[str, Any]]:
         """
         Load task information from JSON files based on task IDs from scenario.toml.
 
@@ -120,17 +170,7 @@ class TaskLoader:
         task_ids = self.load_task_ids(target)
 
         # Extract just the numeric part of task IDs (e.g., "1.1.0001" from "fieldworkarena.1.1.0001")
-        # This assumes the format is "prefix.X.X.XXXX"
-        task_id_set = set()
-        for task_id in task_ids:
-            # Split by '.' and take the last 3 parts (e.g., "1.1.0001")
-            parts = task_id.split('.')
-            if len(parts) >= 3:
-                numeric_id = '.'.join(parts[-3:])
-                task_id_set.add(numeric_id)
-            else:
-                # If format is unexpected, use the full task_id
-                task_id_set.add(task_id)
+        task_id_set = {to_numeric_task_id(task_id) for task_id in task_ids}
 
         # Load all JSON files from tasks directory
         matching_tasks = []
@@ -163,72 +203,93 @@ class TaskLoader:
 
         return matching_tasks
 
-    def extract_tasks(self, target: str) -> List[Dict[str, Any]]:
+    def iter_tasks(self, target: str) -> Iterator[Task]:
         """
-        Extract tasks from JSON files based on task IDs.
+        Iterate over the tasks of a target in the order of the task files, without building
+        the list of all tasks.
+
+        The target and the task index are resolved immediately, so an unknown target raises
+        here rather than on the first iteration.
 
         Args:
             target: Target category key (e.g., "factory", "warehouse").
 
         Returns:
-            List of task dictionaries matching the task IDs.
+            Iterator over Task records matching the task IDs.
         """
-        tasks = self.load_tasks_by_ids(target)
+        # Load task IDs first so that an unknown target fails before the index is opened
+        task_ids = self.load_task_ids(target)
 
-        # extract only necessary fields from each task
-        extracted_tasks = []
+        # Look up the tasks in the compiled task index, opened once per process
+        index = get_task_index(self.tasks_dir, self.index_path)
+        return index.iter_records(to_numeric_task_id(task_id) for task_id in task_ids)
 
-        for task in tasks:
-            extracted_task = {
-                'id': task.get('id'),
-                'input_data': task.get('input_data'),
-                'query': None,
-                'answer': None,
-                'output_format': task.get('output_format'),
-                'eval_func': task.get('eval_func')
-            }
+    def count_tasks(self, target: str) -> int:
+        """
+        Count the tasks of a target, i.e. the number of tasks iter_tasks(target) yields.
 
-            # Extract query and answer from conversations
-            conversations = task.get('conversations', [])
-            for conversation in conversations:
-                if conversation.get('from') == 'human':
-                    extracted_task['query'] = conversation.get('value')
-                elif conversation.get('from') == 'gpt':
-                    extracted_task['answer'] = conversation.get('value')
+        Args:
+            target: Target category key (e.g., "factory", "warehouse").
+        """
+        task_ids = self.load_task_ids(target)
+        index = get_task_index(self.tasks_dir, self.index_path)
+        return index.count(to_numeric_task_id(task_id) for task_id in task_ids)
 
-            extracted_tasks.append(extracted_task)
+    def extract_tasks(self, target: str) -> list[Task]:
+        """
+        Extract tasks from the compiled task index based on task IDs.
 
-        return extracted_tasks
+        Args:
+            target: Target category key (e.g., "factory", "warehouse").
+
+        Returns:
+            List of Task records matching the task IDs.
+        """
+        return list(self.iter_tasks(target))
+
+
+_loaders: dict[tuple[str, str, str | None], TaskLoader] = {}
+_loaders_lock = threading.Lock()
+
+
+def get_task_loader(
+    tasks_dir: str = "benchmark/tasks/group2",
+    ids_path: str = "benchmark/all_task_ids.toml",
+    index_path: str | None = None,
+) -> TaskLoader:
+    """
+    Return the process-wide TaskLoader for the given files, created on first use.
+
+    The loader keeps the parsed TOML file and the task index in memory and only checks the
+    modification time and size of the files on each call.
+    """
+    key = (tasks_dir, ids_path, index_path)
+    with _loaders_lock:
+        loader = _loaders.get(key)
+        if loader is None:
+            loader = _loaders[key] = TaskLoader(
+                tasks_dir=tasks_dir, ids_path=ids_path, index_path=index_path
+            )
+        return loader
 
 
-def build_goal(task: Dict[str, Any]) -> str:
+def build_goal(task: Task) -> str:
     """
     Build a task query string from task data.
     
     Args:
-        task: Task dictionary containing query, input_data, and output_format
+        task: Task record containing query, files, and output_format
         
     Returns:
         Formatted task query string
     """
-    query = task['query']
-    input_data = task['input_data']
-    output_format = task['output_format']
-
-    goal = '# Question\n' + query + '\n\n'
-
-    if type(input_data) == str:
-        # V2 task is stored as a single string with space-separated file names
-        file_names = input_data.split()
-        goal = goal + "# Input Data\n"
-        for file_name in file_names:
-            goal = goal + f"{file_name.strip()}\n"
-    if type(input_data) == list:
-        # V1 task is stored as a list of data paths
-        goal = goal + "# Input Data\n"
-        for data_path in input_data:
-            goal = goal + f"{data_path}\n"
+    goal = '# Question\n' + task.query + '\n\n'
+
+    # files hold the data paths of V1 tasks and the space-separated file names of V2 tasks
+    goal = goal + "# Input Data\n"
+    for file_name in task.files:
+        goal = goal + f"{file_name}\n"
     
-    goal = goal + f"\n# Output Format\n{output_format}\n"
+    goal = goal + f"\n# Output Format\n{task.output_format}\n"
     
     return goal
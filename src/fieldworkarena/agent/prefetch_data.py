@@ -0,0 +1,88 @@
+import argparse
+import os
+from pathlib import Path
+import sys
+
+from dotenv import load_dotenv
+from huggingface_hub import snapshot_download
+
+load_dotenv(override=True)
+
+from fieldworkarena.agent.metrics.tasks import TaskLoader
+from fieldworkarena.agent.metrics.tasks.data_source import get_repo_path
+
+DEFAULT_REPO_ID = "Fujitsu/FieldWorkArena_Dataset"
+DEFAULT_MAX_WORKERS = 8
+
+
+def collect_repo_paths(loader: TaskLoader, target: str) -> list[str]:
+    """Collect the repository paths of all input files of the target tasks.
+    Args:
+        loader: TaskLoader to read the tasks from.
+        target: Target category key (e.g., "factory", "warehouse", "all").
+    Returns:
+        Sorted list of unique repository paths (data/{subdirectory}/{file_name}).
+    """
+    repo_paths = set()
+    for task in loader.iter_tasks(target):
+        for file_name in task.files:
+            repo_paths.add(get_repo_path(file_name))
+    return sorted(repo_paths)
+
+
+def main():
+    """Entry point for fwa-prefetch command.
+
+    Download all input files of the target tasks into a local directory in one parallel bulk pass,
+    so that the green agent can serve them with FWA_LOCAL_DATA_DIR without network access.
+    """
+
+    # --- Parse command-line arguments ---
+    parser = argparse.ArgumentParser(description="Download the FWA benchmark data for a target.")
+    parser.add_argument("--target", type=str, default="all", help="Target category of tasks")
+    parser.add_argument(
+        "--local-dir",
+        type=str,
+        default=os.getenv("FWA_LOCAL_DATA_DIR"),
+        help="Directory to download the data into (default: FWA_LOCAL_DATA_DIR)",
+    )
+    parser.add_argument("--tasks-dir", type=str, default="benchmark/tasks/group2")
+    parser.add_argument("--ids-path", type=str, default="benchmark/all_task_ids.toml")
+    parser.add_argument("--repo-id", type=str, default=DEFAULT_REPO_ID)
+    parser.add_argument(
+        "--max-workers", type=int, default=DEFAULT_MAX_WORKERS, help="Number of parallel downloads"
+    )
+    args = parser.parse_args()
+    # --- end ---
+
+    if not args.local_dir:
+        print("Error: --local-dir or FWA_LOCAL_DATA_DIR is required")
+        sys.exit(1)
+
+    access_token = os.getenv("HF_TOKEN")
+    if not access_token:
+        print("Error: HF_TOKEN environment variable is not set")
+        sys.exit(1)
+
+    loader = TaskLoader(tasks_dir=args.tasks_dir, ids_path=args.ids_path)
+    repo_paths = collect_repo_paths(loader, args.target)
+    print(f"Downloading {len(repo_paths)} file(s) for target '{args.target}' to {args.local_dir}")
+
+    snapshot_download(
+        repo_id=args.repo_id,
+        repo_type="dataset",
+        token=access_token.strip(),
+        local_dir=args.local_dir,
+        allow_patterns=repo_paths,
+        max_workers=args.max_workers,
+    )
+
+    missing = [path for path in repo_paths if not (Path(args.local_dir) / path).is_file()]
+    if missing:
+        print(f"Error: {len(missing)} file(s) were not downloaded: {missing}")
+        sys.exit(1)
+    print(f"Downloaded {len(repo_paths)} file(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,47 @@
+import asyncio
+from collections.abc import Callable
+import os
+import time
 from typing import Any
 from uuid import uuid4
 
 from a2a.client import (
     A2ACardResolver,
+    Client,
+    ClientCallContext,
     ClientConfig,
     ClientFactory,
     Consumer,
 )
 from a2a.types import (
+    AgentCard,
     DataPart,
     FilePart,
     FileWithBytes,
+    FileWithUri,
     Message,
     Part,
     Role,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
     TextPart,
 )
 import httpx
 
+from fieldworkarena.agent_core.compression import (
+    CompressingTransport,
+    CompressionPolicy,
+    negotiate_encodings,
+    payload_mix,
+)
+from fieldworkarena.agent_core.streamed_payload import StreamedPayloadTransport
 from fieldworkarena.log.fwa_logger import getLogger
 
 logger = getLogger(__name__)
 
 
 DEFAULT_TIMEOUT = 300
+DEFAULT_CARD_TTL = 300
 
 
 def create_message(*, role: Role = Role.user, text: str, context_id: str | None = None) -> Message:
@@ -41,7 +59,7 @@ def create_message_with_file(
     *,
     role: Role = Role.user,
     text: str,
-    file_payloads: list[FileWithBytes],
+    file_payloads: list[FileWithBytes | FileWithUri],
     context_id: str | None = None,
 ) -> Message:
     """Create a Message object with text and multiple file attachments.
@@ -80,12 +98,300 @@ def merge_parts(parts: list[Part]) -> str:
     return "\n".join(chunks)
 
 
+class ResponseAssembler:
+    """Assembles the response of an agent from the events of send_message as they arrive.
+
+    Works for both streaming and non-streaming responses, and gives the same response as the
+    final task would: the message of the final status followed by the text of each artifact.
+    Artifact chunks are appended to a list per artifact and joined once at the end, and the
+    messages of intermediate statuses are passed to on_progress.
+    Also measures the time to the first text of the response (TTFT) and the total latency.
+    """
+
+    def __init__(self, on_progress: Callable[[str], None] | None = None):
+        """
+        Args:
+            on_progress: Called with the text of each intermediate status message. It must not
+                         block, since the stream is not read while it runs.
+        """
+        self.on_progress = on_progress
+        self.context_id: str | None = None
+        self.status: str | None = None
+        self.ttft: float | None = None
+        self.latency: float | None = None
+        self._message: str | None = None
+        self._status_text = ""
+        self._artifacts: dict[str, list[str]] = {}
+        self._started = time.perf_counter()
+
+    def _received(self, text: str) -> None:
+        if text and self.ttft is None:
+            self.ttft = time.perf_counter() - self._started
+
+    def add(self, event: Any) -> None:
+        """Add an event (Message or (Task, update event)) of send_message."""
+        match event:
+            case Message() as msg:
+                self.context_id = msg.context_id
+                self._message = merge_parts(msg.parts)
+                self._received(self._message)
+
+            case (task, TaskArtifactUpdateEvent() as update):
+                self.context_id = task.context_id
+                self.status = task.status.state.value
+                text = merge_parts(update.artifact.parts)
+                chunks = self._artifacts.get(update.artifact.artifact_id)
+                if update.append and chunks is not None:
+                    chunks.append(text)
+                else:
+                    self._artifacts[update.artifact.artifact_id] = [text]
+                self._received(text)
+
+            case (task, TaskStatusUpdateEvent() as update):
+                self.context_id = task.context_id
+                self.status = update.status.state.value
+                msg = update.status.message
+                text = merge_parts(msg.parts) if msg else ""
+                if update.final:
+                    self._status_text = text
+                    self._received(text)
+                elif text and self.on_progress is not None:
+                    self.on_progress(text)
+
+            case (task, None):
+                # the whole task of a non-streaming response, or the first event of a stream
+                self.context_id = task.context_id
+                self.status = task.status.state.value
+                msg = task.status.message
+                self._status_text = merge_parts(msg.parts) if msg else ""
+                self._received(self._status_text)
+                for artifact in task.artifacts or []:
+                    text = merge_parts(artifact.parts)
+                    self._artifacts[artifact.artifact_id] = [text]
+                    self._received(text)
+
+            case _:
+                pass
+
+    def finish(self) -> dict[str, Any]:
+        """Stop the latency timer and return the outputs (response, context_id, status, ttft and
+        latency)."""
+        self.latency = time.perf_counter() - self._started
+        outputs: dict[str, Any] = {
+            "context_id": self.context_id,
+            "ttft": self.ttft,
+            "latency": self.latency,
+        }
+        if self._message is not None:
+            outputs["response"] = self._message
+            return outputs
+
+        outputs["response"] = self._status_text + "".join(
+            "\n".join(chunks) for chunks in self._artifacts.values()
+        )
+        if self.status is not None:
+            outputs["status"] = self.status
+        return outputs
+
+
+class A2AClientRegistry:
+    """Registry of long-lived A2A clients keyed by base URL.
+
+    For each base URL, the registry keeps a connection-pooled httpx.AsyncClient, the AgentCard
+    (refetched after card_ttl seconds) and the A2A clients built from them, so repeated messages
+    to the same agent skip the TCP/TLS handshake and the agent card round trip.
+    Request bodies are compressed for agents whose card accepts it (see compression.py), and
+    the files of StreamedFileWithBytes payloads are encoded into them while they are sent.
+    Call aclose() on shutdown to close the pooled connections.
+    """
+
+    def __init__(
+        self,
+        timeout: float = DEFAULT_TIMEOUT,
+        card_ttl: float = DEFAULT_CARD_TTL,
+        limits: httpx.Limits | None = None,
+        compression: bool | None = None,
+    ):
+        """
+        Args:
+            timeout: Timeout in seconds of the HTTP requests.
+            card_ttl: Seconds an agent card is cached.
+            limits: Connection pool limits of each base URL.
+            compression: Whether request bodies may be compressed. If None, they may unless the
+                         FWA_REQUEST_COMPRESSION environment variable is "off".
+        """
+        self.timeout = timeout
+        self.card_ttl = card_ttl
+        self.limits = limits or httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        self.compression = compression
+        # compression policies outlive the httpx clients, to keep the measured link throughput
+        self._policies: dict[str, CompressionPolicy] = {}
+        self._httpx_clients: dict[str, httpx.AsyncClient] = {}
+        self._cards: dict[str, tuple[AgentCard, float]] = {}
+        self._clients: dict[tuple[str, bool], Client] = {}
+        self._lock: asyncio.Lock | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _bind_loop(self) -> asyncio.Lock:
+        """httpx and asyncio objects are bound to an event loop, so start over on a new loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._httpx_clients.clear()
+            self._cards.clear()
+            self._clients.clear()
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+
+    async def get_httpx_client(self, base_url: str) -> httpx.AsyncClient:
+        """Get the pooled httpx client for the base URL."""
+        async with self._bind_loop():
+            return self._get_httpx_client(base_url)
+
+    def _get_httpx_client(self, base_url: str) -> httpx.AsyncClient:
+        httpx_client = self._httpx_clients.get(base_url)
+        if httpx_client is None or httpx_client.is_closed:
+            transport = CompressingTransport(
+                StreamedPayloadTransport(httpx.AsyncHTTPTransport(limits=self.limits)),
+                self._get_policy(base_url),
+            )
+            httpx_client = httpx.AsyncClient(timeout=self.timeout, transport=transport)
+            self._httpx_clients[base_url] = httpx_client
+        return httpx_client
+
+    def _get_policy(self, base_url: str) -> CompressionPolicy:
+        policy = self._policies.get(base_url)
+        if policy is None:
+            policy = CompressionPolicy(httpx.URL(base_url).host)
+            self._policies[base_url] = policy
+        return policy
+
+    def _compression_enabled(self) -> bool:
+        if self.compression is not None:
+            return self.compression
+        return os.getenv("FWA_REQUEST_COMPRESSION", "auto").lower() != "off"
+
+    async def _get_agent_card(self, base_url: str) -> AgentCard:
+        cached = self._cards.get(base_url)
+        if cached is not None and time.monotonic() - cached[1] < self.card_ttl:
+            return cached[0]
+
+        resolver = A2ACardResolver(httpx_client=self._get_httpx_client(base_url), base_url=base_url)
+        agent_card = await resolver.get_agent_card()
+        self._cards[base_url] = (agent_card, time.monotonic())
+        self._get_policy(base_url).encodings = (
+            negotiate_encodings(agent_card) if self._compression_enabled() else []
+        )
+        # clients built from the previous card are stale
+        self._clients = {key: c for key, c in self._clients.items() if key[0] != base_url}
+        return agent_card
+
+    async def get_agent_card(self, base_url: str) -> AgentCard:
+        """Get the AgentCard of the agent at the base URL, fetching it if expired."""
+        async with self._bind_loop():
+            return await self._get_agent_card(base_url)
+
+    async def get_client(
+        self, base_url: str, streaming: bool = False, consumer: Consumer | None = None
+    ) -> Client:
+        """Get an A2A client for the agent at the base URL.
+
+        Clients without consumer are shared. A client with a consumer is created on each call
+        (still on the pooled connections and cached card), so consumers never pile up.
+        """
+        async with self._bind_loop():
+            agent_card = await self._get_agent_card(base_url)
+            if consumer is None and (base_url, streaming) in self._clients:
+                return self._clients[(base_url, streaming)]
+
+            config = ClientConfig(
+                httpx_client=self._get_httpx_client(base_url),
+                streaming=streaming,
+            )
+            factory = ClientFactory(config)
+            if consumer:
+                return factory.create(agent_card, consumers=[consumer])
+
+            client = factory.create(agent_card)
+            self._clients[(base_url, streaming)] = client
+            return client
+
+    def invalidate(self, base_url: str) -> None:
+        """Forget the agent card and clients of the base URL, e.g. after a communication error."""
+        self._cards.pop(base_url, None)
+        self._clients = {key: c for key, c in self._clients.items() if key[0] != base_url}
+
+    def compression_stats(self) -> dict[str, dict[str, Any]]:
+        """Return the request compression stats of each base URL."""
+        return {base_url: policy.stats() for base_url, policy in self._policies.items()}
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        httpx_clients = list(self._httpx_clients.values())
+        self._httpx_clients.clear()
+        self._cards.clear()
+        self._clients.clear()
+        for httpx_client in httpx_clients:
+            await httpx_client.aclose()
+
+
+_client_registry = A2AClientRegistry()
+
+
+def get_client_registry() -> A2AClientRegistry:
+    """Get the process-wide A2A client registry shared by PurpleClient and send_message."""
+    return _client_registry
+
+
+async def close_client_registry() -> None:
+    """Close the pooled connections of the process-wide A2A client registry."""
+    await _client_registry.aclose()
+
+
+async def _send(
+    outbound_msg: Message,
+    base_url: str,
+    streaming: bool,
+    consumer: Consumer | None,
+    registry: A2AClientRegistry | None,
+    on_progress: Callable[[str], None] | None = None,
+    deadline: float | None = None,
+) -> dict[str, Any]:
+    """Send the message to the agent and assemble the response from its events."""
+    registry = registry or _client_registry
+    context = None
+    if deadline is not None:
+        # the deadline, not the read timeout of the pooled client, bounds the wait for the response
+        timeout = httpx.Timeout(registry.timeout, read=deadline)
+        context = ClientCallContext(state={"http_kwargs": {"timeout": timeout}})
+    try:
+        client = await registry.get_client(base_url, streaming=streaming, consumer=consumer)
+
+        # the compression policy estimates the compressibility of the message from its files
+        files = [part.root.file for part in outbound_msg.parts if isinstance(part.root, FilePart)]
+        with payload_mix(files):
+            # if streaming == False, only one event is generated
+            assembler = ResponseAssembler(on_progress)
+            async for event in client.send_message(outbound_msg, context=context):
+                assembler.add(event)
+        return assembler.finish()
+    except Exception as e:
+        registry.invalidate(base_url)
+        logger.error(f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}")
+        raise RuntimeError(
+            f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}"
+        ) from e
+
+
 async def send_message(
     message: str,
     base_url: str,
     context_id: str | None = None,
     streaming=False,
     consumer: Consumer | None = None,
+    registry: A2AClientRegistry | None = None,
+    on_progress: Callable[[str], None] | None = None,
+    deadline: float | None = None,
 ) -> dict[str, Any]:
     """Client function to interact with PurpleAgent.
     Args:
@@ -94,120 +400,48 @@ async def send_message(
         context_id: Optional context ID for the conversation.
         streaming: Whether to use streaming mode.
         consumer: Callback to process streaming events (ClientEvent or Message) from the agent.
+        registry: Registry of the pooled A2A clients (default: the process-wide registry).
+        on_progress: Called with the text of each intermediate status message of the agent.
+        deadline: Seconds to wait for the response, replacing the read timeout of the registry.
+    Returns:
+        The response, context_id, status (for task responses), ttft and latency in seconds.
     Notice:
         This Client way using CleintFactory is need for Google Auth,
         We can not find if it is necessary for this development, but we use this way for future compatibility.
     """  # noqa: E501
-    try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as httpx_client:
-            resolver = A2ACardResolver(httpx_client=httpx_client, base_url=base_url)
-            agent_card = await resolver.get_agent_card()
-            config = ClientConfig(
-                httpx_client=httpx_client,
-                streaming=streaming,
-            )
-            factory = ClientFactory(config)
-            client = factory.create(agent_card)
-            if consumer:
-                await client.add_event_consumer(consumer)
-
-            outbound_msg = create_message(text=message, context_id=context_id)
-            last_event = None
-            outputs = {"response": "", "context_id": None}
-
-            async for event in client.send_message(outbound_msg):
-                last_event = event
-
-            match last_event:
-                case Message() as msg:
-                    outputs["context_id"] = msg.context_id
-                    outputs["response"] += merge_parts(msg.parts)
-
-                case (task, update):  # noqa: F841
-                    outputs["context_id"] = task.context_id
-                    outputs["status"] = task.status.state.value
-                    msg = task.status.message
-                    if msg:
-                        outputs["response"] += merge_parts(msg.parts)
-                    if task.artifacts:
-                        for artifact in task.artifacts:
-                            outputs["response"] += merge_parts(artifact.parts)
-
-                case _:
-                    pass
-
-            return outputs
-    except Exception as e:
-        logger.error(f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}")
-        raise RuntimeError(
-            f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}"
-        ) from e
+    outbound_msg = create_message(text=message, context_id=context_id)
+    return await _send(outbound_msg, base_url, streaming, consumer, registry, on_progress, deadline)
 
 
 async def send_message_with_file(
     message: str,
-    file_payloads: list[FileWithBytes],
+    file_payloads: list[FileWithBytes | FileWithUri],
     base_url: str,
     context_id: str | None = None,
     streaming=False,
     consumer: Consumer | None = None,
+    registry: A2AClientRegistry | None = None,
+    on_progress: Callable[[str], None] | None = None,
+    deadline: float | None = None,
 ) -> dict[str, Any]:
     """Client function to interact with PurpleAgent.
     Args:
         message: The query message to send to the agent.
-        file_payloads: The file payloads for A2A FilePart, which includes data encoded in base64.
+        file_payloads: The file payloads for A2A FilePart, either data encoded in base64 or URIs.
         base_url: The base URL of the PurpleAgent.
         context_id: Optional context ID for the conversation.
         streaming: Whether to use streaming mode.
         consumer: Callback to process streaming events (ClientEvent or Message) from the agent.
+        registry: Registry of the pooled A2A clients (default: the process-wide registry).
+        on_progress: Called with the text of each intermediate status message of the agent.
+        deadline: Seconds to wait for the response, replacing the read timeout of the registry.
+    Returns:
+        The response, context_id, status (for task responses), ttft and latency in seconds.
     Notice:
         This Client way using CleintFactory is need for Google Auth,
         We can not find if it is necessary for this development, but we use this way for future compatibility.
     """  # noqa: E501
-    try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as httpx_client:
-            resolver = A2ACardResolver(httpx_client=httpx_client, base_url=base_url)
-            agent_card = await resolver.get_agent_card()
-            config = ClientConfig(
-                httpx_client=httpx_client,
-                streaming=streaming,
-            )
-            factory = ClientFactory(config)
-            client = factory.create(agent_card)
-            if consumer:
-                await client.add_event_consumer(consumer)
-
-            outbound_msg = create_message_with_file(
-                text=message, file_payloads=file_payloads, context_id=context_id
-            )
-            last_event = None
-            outputs = {"response": "", "context_id": None}
-
-            # if streaming == False, only one event is generated
-            async for event in client.send_message(outbound_msg):
-                last_event = event
-
-            match last_event:
-                case Message() as msg:
-                    outputs["context_id"] = msg.context_id
-                    outputs["response"] += merge_parts(msg.parts)
-
-                case (task, update):  # noqa: F841
-                    outputs["context_id"] = task.context_id
-                    outputs["status"] = task.status.state.value
-                    msg = task.status.message
-                    if msg:
-                        outputs["response"] += merge_parts(msg.parts)
-                    if task.artifacts:
-                        for artifact in task.artifacts:
-                            outputs["response"] += merge_parts(artifact.parts)
-
-                case _:
-                    pass
-
-            return outputs
-    except Exception as e:
-        logger.error(f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}")
-        raise RuntimeError(
-            f"Error communicating with agent at {base_url}: {type(e).__name__}: {e}"
-        ) from e
+    outbound_msg = create_message_with_file(
+        text=message, file_payloads=file_payloads, context_id=context_id
+    )
+    return await _send(outbound_msg, base_url, streaming, consumer, registry, on_progress, deadline)
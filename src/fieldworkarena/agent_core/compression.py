@@ -0,0 +1,351 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import gzip
+import ipaddress
+import time
+from typing import Any
+import zlib
+
+from a2a.types import AgentCard, AgentExtension, FileWithBytes, FileWithUri
+import httpx
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from fieldworkarena.agent_core.streamed_payload import encoded_size, has_streamed_payloads
+from fieldworkarena.log.fwa_logger import getLogger
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+_DECOMPRESSION_ERRORS = (zlib.error, zstandard.ZstdError) if zstandard else (zlib.error,)
+
+logger = getLogger(__name__)
+
+
+# extension of the agent card declaring the Content-Encodings accepted for request bodies
+COMPRESSION_EXTENSION_URI = "urn:fieldworkarena:a2a:request-compression:v1"
+
+# MIME types of files that are already compressed: their Base64 data only shrinks to about 3/4
+INCOMPRESSIBLE_MIME_PREFIXES = ("image/", "video/", "audio/", "application/pdf", "application/zip")
+
+# estimated compressed size / size of the Base64 data of compressed files, and of the rest of a
+# request (JSON envelope, text and Base64 data of text files)
+BASE64_BINARY_RATIO = 0.77
+TEXT_RATIO = 0.35
+
+# compression speed in bytes per second at the levels used, of Base64 data of compressed files
+# and of the rest of a request
+COMPRESSION_SPEEDS = {"zstd": (150e6, 400e6), "gzip": (30e6, 150e6)}
+GZIP_LEVEL = 1
+ZSTD_LEVEL = 3
+
+# upload throughput in bytes per second assumed until it is measured, for loopback and other hosts
+LOOPBACK_THROUGHPUT = 2e9
+DEFAULT_THROUGHPUT = 12.5e6
+
+# smaller requests are never compressed, and smaller uploads mostly measure the socket buffers
+MIN_COMPRESSION_SIZE = 1024
+MIN_MEASURED_UPLOAD = 1 << 20
+# weight of the latest measured upload in the throughput estimate
+THROUGHPUT_SMOOTHING = 0.3
+
+# bodies are compressed in a thread from this size so that the event loop is not blocked
+THREAD_COMPRESSION_SIZE = 1 << 20
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+# maximum size of a decompressed request body accepted by DecompressionMiddleware
+DEFAULT_MAX_DECOMPRESSED_SIZE = 2 << 30
+
+
+def available_encodings() -> list[str]:
+    """Return the encodings this process can compress and decompress, in order of preference."""
+    return ["zstd", "gzip"] if zstandard is not None else ["gzip"]
+
+
+def compression_extension() -> AgentExtension:
+    """Return the agent card extension declaring the request encodings accepted by the agent."""
+    return AgentExtension(
+        uri=COMPRESSION_EXTENSION_URI,
+        description="Accepts request bodies compressed with the listed Content-Encodings.",
+        params={"encodings": available_encodings()},
+    )
+
+
+def negotiate_encodings(agent_card: AgentCard) -> list[str]:
+    """Return the encodings accepted by the agent and available here, in order of preference."""
+    for extension in agent_card.capabilities.extensions or []:
+        if extension.uri == COMPRESSION_EXTENSION_URI:
+            accepted = (extension.params or {}).get("encodings") or []
+            return [encoding for encoding in available_encodings() if encoding in accepted]
+    return []
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress data with a Content-Encoding (gzip or zstd)."""
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if encoding == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def decompress(data: bytes, encoding: str, max_size: int = DEFAULT_MAX_DECOMPRESSED_SIZE) -> bytes:
+    """
+    Decompress data compressed with a Content-Encoding (gzip or zstd).
+
+    Raises:
+        ValueError: If the data is corrupt or truncated, or decompresses to more than max_size.
+    """
+    try:
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(wbits=31)
+            result = decompressor.decompress(data, max_size + 1)
+            complete = decompressor.eof
+        elif encoding == "zstd" and zstandard is not None:
+            with zstandard.ZstdDecompressor().stream_reader(data) as reader:
+                result = reader.read(max_size + 1)
+            # truncated frames raise ZstdError
+            complete = True
+        else:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+    except _DECOMPRESSION_ERRORS as e:
+        raise ValueError(f"Invalid {encoding} data: {e}") from e
+
+    if len(result) > max_size:
+        raise ValueError(f"Decompressed data exceeds {max_size} bytes")
+    if not complete:
+        raise ValueError(f"Truncated {encoding} data")
+    return result
+
+
+def is_incompressible(mime_type: str | None) -> bool:
+    """True if files of the MIME type are already compressed."""
+    return mime_type is not None and mime_type.startswith(INCOMPRESSIBLE_MIME_PREFIXES)
+
+
+# size of the Base64 data of already compressed files in the request being sent
+_incompressible_bytes: ContextVar[int] = ContextVar("incompressible_bytes", default=0)
+
+
+@contextmanager
+def payload_mix(file_payloads: list[FileWithBytes | FileWithUri]) -> Iterator[None]:
+    """Tell the compression policy how much of the requests sent within is compressed file data."""
+    token = _incompressible_bytes.set(
+        sum(
+            encoded_size(payload)
+            for payload in file_payloads
+            if isinstance(payload, FileWithBytes) and is_incompressible(payload.mime_type)
+        )
+    )
+    try:
+        yield
+    finally:
+        _incompressible_bytes.reset(token)
+
+
+def is_loopback(host: str) -> bool:
+    """True if the host is this machine."""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host.strip("[]")).is_loopback
+    except ValueError:
+        return False
+
+
+class CompressionPolicy:
+    """CompressionPolicy decides whether and how to compress the requests sent to one agent.
+
+    A request is compressed when compressing it and sending the smaller body is estimated to
+    take less time than sending it as is. The compressed size is estimated from the mix of the
+    request: Base64 data of already compressed files (images, videos, PDFs) barely shrinks, while
+    the JSON envelope and text compress well. The upload throughput of the link is measured on
+    large requests, so agents on the same host are sent uncompressed requests.
+    """
+
+    def __init__(self, host: str):
+        """
+        Args:
+            host: Host of the agent.
+        """
+        # encodings accepted by the agent, set from its agent card
+        self.encodings: list[str] = []
+        self.throughput = LOOPBACK_THROUGHPUT if is_loopback(host) else DEFAULT_THROUGHPUT
+        self.requests = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_sent = 0
+
+    def choose(self, size: int, incompressible_bytes: int = 0) -> str | None:
+        """
+        Return the encoding to compress a request body with, or None to send it as is.
+
+        Args:
+            size: Size of the request body.
+            incompressible_bytes: Size of the Base64 data of already compressed files in it.
+        """
+        if not self.encodings or size < MIN_COMPRESSION_SIZE:
+            return None
+        incompressible_bytes = min(incompressible_bytes, size)
+        compressed_size = (
+            incompressible_bytes * BASE64_BINARY_RATIO + (size - incompressible_bytes) * TEXT_RATIO
+        )
+        best, best_time = None, size / self.throughput
+        for encoding in self.encodings:
+            binary_speed, text_speed = COMPRESSION_SPEEDS[encoding]
+            encoded_time = (
+                incompressible_bytes / binary_speed
+                + (size - incompressible_bytes) / text_speed
+                + compressed_size / self.throughput
+            )
+            if encoded_time < best_time:
+                best, best_time = encoding, encoded_time
+        return best
+
+    def record_request(self, size: int, sent: int) -> None:
+        """Record a request body of size bytes sent as sent bytes."""
+        self.requests += 1
+        self.compressed += sent != size
+        self.bytes_in += size
+        self.bytes_sent += sent
+
+    def record_upload(self, sent: int, seconds: float) -> None:
+        """Update the throughput estimate with the time an upload of sent bytes took."""
+        if sent < MIN_MEASURED_UPLOAD or seconds <= 0:
+            return
+        self.throughput += THROUGHPUT_SMOOTHING * (sent / seconds - self.throughput)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "encodings": self.encodings,
+            "requests": self.requests,
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_sent": self.bytes_sent,
+            "throughput": self.throughput,
+        }
+
+
+class _TimedUpload(httpx.AsyncByteStream):
+    # request body reporting how long the transport took to read (i.e. send) it
+    def __init__(self, data: bytes, on_sent: Callable[[int, float], None]):
+        self._data = data
+        self._on_sent = on_sent
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        started = time.perf_counter()
+        for offset in range(0, len(self._data), UPLOAD_CHUNK_SIZE):
+            yield self._data[offset : offset + UPLOAD_CHUNK_SIZE]
+        self._on_sent(len(self._data), time.perf_counter() - started)
+
+
+class CompressingTransport(httpx.AsyncBaseTransport):
+    """CompressingTransport compresses request bodies as decided by a CompressionPolicy."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, policy: CompressionPolicy):
+        """
+        Args:
+            transport: Transport sending the requests.
+            policy: Compression policy of the agent the requests are sent to.
+        """
+        self._transport = transport
+        self.policy = policy
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or "content-encoding" in request.headers:
+            return await self._transport.handle_async_request(request)
+
+        body = await request.aread()
+        if has_streamed_payloads(body):
+            # the files of streamed payloads are encoded while the body is sent, never compressed
+            return await self._transport.handle_async_request(request)
+        encoding = self.policy.choose(len(body), _incompressible_bytes.get())
+        data = body
+        headers = request.headers.copy()
+        if encoding is not None:
+            if len(body) >= THREAD_COMPRESSION_SIZE:
+                data = await asyncio.to_thread(compress, body, encoding)
+            else:
+                data = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(data))
+        self.policy.record_request(len(body), len(data))
+
+        request = httpx.Request(
+            request.method,
+            request.url,
+            headers=headers,
+            stream=_TimedUpload(data, self.policy.record_upload),
+            extensions=request.extensions,
+        )
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+class DecompressionMiddleware:
+    """ASGI middleware decompressing request bodies sent with a gzip or zstd Content-Encoding.
+
+    Agents using it declare compression_extension() in the capabilities of their agent card.
+    """
+
+    def __init__(self, app: ASGIApp, max_size: int = DEFAULT_MAX_DECOMPRESSED_SIZE):
+        """
+        Args:
+            app: The ASGI application.
+            max_size: Maximum size of a decompressed request body.
+        """
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        encoding = (
+            Headers(scope=scope).get("content-encoding", "identity").strip().lower()
+            if scope["type"] == "http"
+            else "identity"
+        )
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+        if encoding not in available_encodings():
+            response = PlainTextResponse(f"Unsupported Content-Encoding: {encoding}", 415)
+            await response(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        try:
+            body = await asyncio.to_thread(decompress, b"".join(chunks), encoding, self.max_size)
+        except ValueError as e:
+            logger.warning(f"Rejected request body: {e}")
+            await PlainTextResponse(str(e), 400)(scope, receive, send)
+            return
+
+        headers = [
+            (name, value)
+            for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        body_sent = False
+
+        async def receive_decompressed() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        await self.app(dict(scope, headers=headers), receive_decompressed, send)
@@ -1,12 +1,20 @@
-from typing import Any
+from typing import Annotated, Any
 
-from pydantic import BaseModel, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 
 
 class EvalRequest(BaseModel):
-    participants: dict[str, HttpUrl]  # role-endpoint mapping
+    # role-endpoint mapping, or role to the endpoints of the replicas of the participant
+    participants: dict[str, HttpUrl | Annotated[list[HttpUrl], Field(min_length=1)]]
     config: dict[str, Any]
 
+    def replica_urls(self, role: str) -> list[str]:
+        """Return the endpoints of the replicas of a participant role."""
+        endpoints = self.participants[role]
+        if isinstance(endpoints, list):
+            return [str(endpoint) for endpoint in endpoints]
+        return [str(endpoints)]
+
 
 class EvalResult(BaseModel):
     target: str
@@ -14,3 +22,7 @@ class EvalResult(BaseModel):
     total_score: float
     score_rate: float
     task_results: list[dict[str, Any]]
+    # role -> replica endpoint -> request counts and latency statistics
+    replica_stats: dict[str, dict[str, dict[str, Any]]] = Field(default_factory=dict)
+    # judgements decided by the deterministic pre-judge vs. by the LLM
+    judge_stats: dict[str, int] = Field(default_factory=dict)
@@ -0,0 +1,109 @@
+import asyncio
+import base64
+import hashlib
+
+from a2a.types import FileWithBytes, FileWithUri
+from starlette.requests import Request
+from starlette.responses import FileResponse, PlainTextResponse, Response
+from starlette.routing import Route
+
+from fieldworkarena.agent_core.streamed_payload import StreamedFileWithBytes, encoded_size
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+DEFAULT_PAYLOAD_PATH = "/payloads"
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha256(data.encode("ascii")).hexdigest()
+
+
+class PayloadServer:
+    """PayloadServer serves file payloads over HTTP so that large inputs can be sent to
+    PurpleAgents as FileWithUri parts instead of inline Base64 data.
+
+    Payloads are content-addressed by the SHA-256 of their Base64 data and reference counted,
+    so a file shared by concurrent tasks is registered once and served until all of them are done.
+    """
+
+    def __init__(self, base_url: str, path: str = DEFAULT_PAYLOAD_PATH):
+        """
+        Args:
+            base_url: External URL of the server the routes are mounted on.
+            path: URL path under which the payloads are served.
+        """
+        self.base_url = base_url.rstrip("/")
+        self.path = "/" + path.strip("/")
+        self._entries: dict[str, FileWithBytes] = {}
+        self._refcounts: dict[str, int] = {}
+
+    def routes(self) -> list[Route]:
+        """Routes to mount on the Starlette application of the green agent."""
+        return [Route(f"{self.path}/{{digest}}", self._serve, methods=["GET"])]
+
+    async def _serve(self, request: Request) -> Response:
+        digest = request.path_params["digest"]
+        payload = self._entries.get(digest)
+        if payload is None:
+            return PlainTextResponse("Payload not found", status_code=404)
+
+        headers = None
+        if payload.name:
+            headers = {"Content-Disposition": f'inline; filename="{payload.name}"'}
+        if isinstance(payload, StreamedFileWithBytes):
+            # the file of a streamed payload is served as is, without decoding anything
+            return FileResponse(payload.path, media_type=payload.mime_type, headers=headers)
+        data = await asyncio.to_thread(base64.b64decode, payload.bytes)
+        return Response(data, media_type=payload.mime_type, headers=headers)
+
+    async def register(self, payload: FileWithBytes) -> FileWithUri:
+        """Serve the payload and return the FileWithUri pointing to it."""
+        # hashing the Base64 data of a video takes a while, so it runs in a worker thread
+        digest = await asyncio.to_thread(_digest, payload.bytes)
+        if digest not in self._entries:
+            self._entries[digest] = payload
+            self._refcounts[digest] = 0
+        self._refcounts[digest] += 1
+        return FileWithUri(
+            uri=f"{self.base_url}{self.path}/{digest}",
+            mime_type=payload.mime_type,
+            name=payload.name,
+        )
+
+    def unregister(self, file: FileWithUri) -> None:
+        """Stop serving the payload once every registration of it has been released."""
+        digest = file.uri.rsplit("/", 1)[-1]
+        if digest not in self._refcounts:
+            return
+        self._refcounts[digest] -= 1
+        if self._refcounts[digest] <= 0:
+            del self._refcounts[digest]
+            del self._entries[digest]
+
+    async def to_transport(
+        self, file_payloads: list[FileWithBytes], uri_threshold_bytes: int
+    ) -> list[FileWithBytes | FileWithUri]:
+        """Replace payloads whose Base64 data is at least uri_threshold_bytes long by FileWithUri.
+
+        The returned FileWithUri must be given back with release() once the task is done.
+        """
+        transport: list[FileWithBytes | FileWithUri] = []
+        for payload in file_payloads:
+            if encoded_size(payload) >= uri_threshold_bytes:
+                file = await self.register(payload)
+                logger.info(f"Sending {payload.name} by URI: {file.uri}")
+                transport.append(file)
+            else:
+                transport.append(payload)
+        return transport
+
+    def release(self, files: list[FileWithBytes | FileWithUri]) -> None:
+        """Release the FileWithUri returned by to_transport()."""
+        for file in files:
+            if isinstance(file, FileWithUri):
+                self.unregister(file)
+
+    def __len__(self) -> int:
+        return len(self._entries)
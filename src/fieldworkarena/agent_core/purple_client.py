@@ -1,43 +1,216 @@
-from a2a.types import FileWithBytes
+import asyncio
+from collections.abc import Callable
+import random
+from typing import Any
 
-from fieldworkarena.agent_core.client_utils import send_message_with_file
+from a2a.client import A2AClientHTTPError
+from a2a.types import FileWithBytes, FileWithUri
+import httpx
+
+from fieldworkarena.agent_core.client_utils import A2AClientRegistry, send_message_with_file
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+# number of times a message is sent again after a transport failure that did not deliver it
+DEFAULT_MAX_RETRIES = 2
+# delay in seconds before the first retry, doubled for each further retry
+DEFAULT_RETRY_BACKOFF = 1.0
+# seconds to wait for the response of an agent before sending the message to its hedge replica
+DEFAULT_HEDGE_DELAY = 60.0
+
+# HTTP statuses telling that the agent did not process the request
+RETRYABLE_HTTP_STATUSES = {502, 503, 504}
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """
+    Return True if the error is a transport failure after which the message can be sent again
+    without being processed twice: the connection could not be established, or the agent (or
+    a proxy in front of it) answered that it is unavailable.
+
+    Errors after the message may have been delivered (e.g. read timeouts) are not retryable.
+    """
+    http_status = None
+    cause: BaseException | None = error
+    while cause is not None:
+        if isinstance(cause, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True
+        if isinstance(cause, httpx.TransportError):
+            return False
+        if isinstance(cause, A2AClientHTTPError) and http_status is None:
+            http_status = cause.status_code
+        cause = cause.__cause__
+    return http_status in RETRYABLE_HTTP_STATUSES
 
 
 class PurpleClient:
     """PurpleClient is used to communicate with PurpleAgents."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        registry: A2AClientRegistry | None = None,
+        streaming: bool = False,
+        deadline: float | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        retry_backoff: float = DEFAULT_RETRY_BACKOFF,
+        hedge_urls: dict[str, str] | None = None,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ):
+        """
+        Args:
+            registry: Registry of the pooled A2A clients (default: the process-wide registry).
+            streaming: If True, responses are streamed from agents that support streaming.
+            deadline: Seconds each response may take, including retries and hedged requests.
+                      It replaces the read timeout of the registry, so it may exceed it.
+                      If None, there is no deadline besides the timeouts of the connections.
+            max_retries: Number of times a message is sent again after a retryable transport
+                         failure (see is_retryable_error).
+            retry_backoff: Delay in seconds before the first retry, doubled for each retry.
+            hedge_urls: Mapping of agent URLs to the URL of a second replica of the agent.
+                        A message starting a conversation is also sent to the replica when the
+                        agent has not responded after hedge_delay, and the first response wins.
+            hedge_delay: Seconds to wait for the agent before sending the hedged request.
+        """
         self._context_ids = {}
+        # agent URL -> URL of the replica holding the conversation, after a hedged request won
+        self._routes: dict[str, str] = {}
+        self._registry = registry
+        self._streaming = streaming
+        self._deadline = deadline
+        self._max_retries = max_retries
+        self._retry_backoff = retry_backoff
+        self._hedge_urls = hedge_urls or {}
+        self._hedge_delay = hedge_delay
+        # time to first token and latency in seconds of each response
+        self.timings: list[dict[str, float | None]] = []
+        self.stats = {"retries": 0, "hedged": 0, "hedge_wins": 0}
 
     async def send_message(
         self,
         message: str,
-        file_payloads: list[FileWithBytes],
+        file_payloads: list[FileWithBytes | FileWithUri],
         url: str,
         new_conversation: bool = False,
+        on_progress: Callable[[str], None] | None = None,
     ) -> str:
         """
         Communicate with another agent by sending a message and receiving their response.
 
         Args:
             message: The message to send to the agent
-            file_payloads: The file payloads for A2A FilePart, which includes data encoded in base64.
+            file_payloads: The file payloads for A2A FilePart, either data encoded in base64 or URIs.
             url: The agent's URL endpoint
             new_conversation: If True, start fresh conversation; if False, continue existing conversation
+            on_progress: Called with the text of each intermediate status message of the agent.
 
         Returns:
             str: The agent's response message
         """  # noqa: E501
-        outputs = await send_message_with_file(
-            message=message,
-            file_payloads=file_payloads,
-            base_url=url,
-            context_id=None if new_conversation else self._context_ids.get(url, None),
-        )
+        if new_conversation:
+            self._routes.pop(url, None)
+        target_url = self._routes.get(url, url)
+        context_id = None if new_conversation else self._context_ids.get(target_url, None)
+
+        try:
+            async with asyncio.timeout(self._deadline):
+                hedge_url = self._hedge_urls.get(url)
+                # the replica does not know the conversation, so only new ones are hedged
+                if hedge_url is None or context_id is not None:
+                    served_url, outputs = await self._send_with_retries(
+                        message, file_payloads, target_url, context_id, on_progress
+                    )
+                else:
+                    served_url, outputs = await self._send_hedged(
+                        message, file_payloads, url, hedge_url, on_progress
+                    )
+        except TimeoutError as e:
+            raise RuntimeError(f"{url} did not respond within {self._deadline} seconds") from e
+
+        self.timings.append({"ttft": outputs.get("ttft"), "latency": outputs.get("latency")})
         if outputs.get("status", "completed") != "completed":
-            raise RuntimeError(f"{url} responded with: {outputs}")
-        self._context_ids[url] = outputs.get("context_id", None)
+            raise RuntimeError(f"{served_url} responded with: {outputs}")
+        if served_url != url:
+            self._routes[url] = served_url
+        self._context_ids[served_url] = outputs.get("context_id", None)
         return outputs["response"]
 
+    async def _send_with_retries(
+        self,
+        message: str,
+        file_payloads: list[FileWithBytes | FileWithUri],
+        url: str,
+        context_id: str | None,
+        on_progress: Callable[[str], None] | None,
+    ) -> tuple[str, dict[str, Any]]:
+        attempt = 0
+        while True:
+            try:
+                outputs = await send_message_with_file(
+                    message=message,
+                    file_payloads=file_payloads,
+                    base_url=url,
+                    context_id=context_id,
+                    streaming=self._streaming,
+                    registry=self._registry,
+                    on_progress=on_progress,
+                    deadline=self._deadline,
+                )
+                return url, outputs
+            except RuntimeError as e:
+                if attempt >= self._max_retries or not is_retryable_error(e):
+                    raise
+                # exponential backoff with jitter so that concurrent tasks do not retry together
+                delay = self._retry_backoff * 2**attempt * random.uniform(0.5, 1.0)
+                logger.warning(f"Retrying {url} in {delay:.1f} seconds after: {e}")
+                self.stats["retries"] += 1
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def _send_hedged(
+        self,
+        message: str,
+        file_payloads: list[FileWithBytes | FileWithUri],
+        url: str,
+        hedge_url: str,
+        on_progress: Callable[[str], None] | None,
+    ) -> tuple[str, dict[str, Any]]:
+        primary = asyncio.create_task(
+            self._send_with_retries(message, file_payloads, url, None, on_progress)
+        )
+        pending = {primary}
+        try:
+            # the hedged request is sent when the agent is slow or has failed
+            done, _ = await asyncio.wait(pending, timeout=self._hedge_delay)
+            if done and primary.exception() is None:
+                return primary.result()
+
+            logger.info(f"Hedging the request to {url} with {hedge_url}")
+            self.stats["hedged"] += 1
+            pending.add(
+                asyncio.create_task(
+                    self._send_with_retries(message, file_payloads, hedge_url, None, on_progress)
+                )
+            )
+            pending -= done
+            error: BaseException | None = primary.exception() if done else None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for request in done:
+                    if request.exception() is None:
+                        served_url, outputs = request.result()
+                        if served_url == hedge_url:
+                            self.stats["hedge_wins"] += 1
+                        return served_url, outputs
+                    error = error or request.exception()
+            raise error
+        finally:
+            for request in pending:
+                request.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
     def reset(self):
         self._context_ids = {}
+        self._routes = {}
+        self.timings = []
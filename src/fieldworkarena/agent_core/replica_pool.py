@@ -0,0 +1,121 @@
+from collections.abc import Callable
+import statistics
+import time
+from typing import Any
+
+from fieldworkarena.log.fwa_logger import getLogger
+
+logger = getLogger(__name__)
+
+
+# consecutive failures after which a replica is ejected
+DEFAULT_MAX_FAILURES = 3
+# seconds an ejected replica receives no tasks
+DEFAULT_EJECT_SECONDS = 30
+
+
+class Replica:
+    """Load and health of one replica endpoint of a participant."""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.latencies: list[float] = []
+
+    def stats(self) -> dict[str, Any]:
+        """Return the request counts and latency statistics in seconds of the replica."""
+        latencies = sorted(self.latencies)
+        stats: dict[str, Any] = {
+            "requests": self.requests,
+            "failures": self.failures,
+            "ejections": self.ejections,
+        }
+        if latencies:
+            stats.update(
+                latency_mean=statistics.fmean(latencies),
+                latency_p50=latencies[(len(latencies) - 1) // 2],
+                latency_p95=latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+                latency_max=latencies[-1],
+            )
+        return stats
+
+
+class ReplicaPool:
+    """ReplicaPool distributes the tasks of a participant role across its replica endpoints.
+
+    Each task is sent to the healthy replica with the fewest outstanding requests (ties go to
+    the replica that received the fewest requests), so slow replicas get fewer tasks. A replica
+    failing max_failures times in a row is ejected for eject_seconds; after that it receives tasks
+    again, but its next failure ejects it again until it succeeds. When all replicas are ejected,
+    tasks are still distributed across all of them rather than failed.
+
+    The pool is used from the event loop only and needs no locking.
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_failures: int = DEFAULT_MAX_FAILURES,
+        eject_seconds: float = DEFAULT_EJECT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            urls: Endpoints of the replicas.
+            max_failures: Consecutive failures after which a replica is ejected.
+            eject_seconds: Seconds an ejected replica receives no tasks.
+            clock: Source of the current time in seconds.
+        """
+        if not urls:
+            raise ValueError("ReplicaPool needs at least one replica")
+        self.replicas = {url: Replica(url) for url in urls}
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self._clock = clock
+
+    def acquire(self) -> str:
+        """Choose the replica of the next task and count it as outstanding until release()."""
+        now = self._clock()
+        candidates = [r for r in self.replicas.values() if r.ejected_until <= now]
+        replica = min(
+            candidates or self.replicas.values(), key=lambda r: (r.outstanding, r.requests)
+        )
+        replica.outstanding += 1
+        replica.requests += 1
+        return replica.url
+
+    def release(self, url: str, ok: bool, latency: float | None = None) -> None:
+        """
+        Record the outcome of a task sent to the replica.
+
+        Args:
+            url: Endpoint returned by acquire().
+            ok: False if the replica failed to respond.
+            latency: Seconds the replica took to respond.
+        """
+        replica = self.replicas[url]
+        replica.outstanding -= 1
+        if latency is not None:
+            replica.latencies.append(latency)
+        if ok:
+            replica.consecutive_failures = 0
+            return
+
+        replica.failures += 1
+        replica.consecutive_failures += 1
+        if replica.consecutive_failures >= self.max_failures:
+            replica.ejected_until = self._clock() + self.eject_seconds
+            replica.ejections += 1
+            logger.warning(
+                f"Ejected replica {url} for {self.eject_seconds} seconds after "
+                f"{replica.consecutive_failures} consecutive failures"
+            )
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the stats of each replica by endpoint."""
+        return {url: replica.stats() for url, replica in self.replicas.items()}
@@ -0,0 +1,180 @@
+import asyncio
+import base64
+from collections.abc import AsyncIterator, Iterator
+import hashlib
+import mmap
+import os
+from pathlib import Path
+import re
+import threading
+import weakref
+
+from a2a.types import FileWithBytes
+import httpx
+
+# prefix of the placeholder standing for the Base64 data of a streamed payload in request bodies
+STREAMED_PAYLOAD_PREFIX = "fwa-streamed-payload:"
+_PLACEHOLDER_PATTERN = re.compile(rb"fwa-streamed-payload:[0-9a-f]{64}")
+
+# bytes of the file encoded at a time: a multiple of 3 so that the Base64 chunks concatenate, and
+# of the page size so that the pages already sent can be dropped from memory
+ENCODE_CHUNK_SIZE = 3 << 18
+
+# placeholder -> (path, size) of the file of each streamed payload, and the number of live
+# payloads using it; the entry is dropped when the last of them is garbage-collected
+_sources: dict[str, tuple[Path, int]] = {}
+_source_refs: dict[str, int] = {}
+_sources_lock = threading.Lock()
+
+
+def base64_length(size: int) -> int:
+    """Return the length of the Base64 encoding of size bytes."""
+    return 4 * ((size + 2) // 3)
+
+
+class StreamedFileWithBytes(FileWithBytes):
+    """
+    FileWithBytes whose Base64 data is not held in memory.
+
+    Its bytes field holds a placeholder. When a request carrying it is sent through a
+    StreamedPayloadTransport, the file is memory-mapped and Base64-encoded in chunks directly
+    into the request body, so the memory used by a payload does not depend on the file size.
+    The file must not change while the payload is in use.
+    """
+
+    @classmethod
+    def from_file(
+        cls, path: Path, mime_type: str, name: str | None = None
+    ) -> "StreamedFileWithBytes":
+        """Create the streamed payload of a file."""
+        stat = path.stat()
+        key = f"{path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        placeholder = STREAMED_PAYLOAD_PREFIX + hashlib.sha256(key.encode("utf-8")).hexdigest()
+        payload = cls(bytes=placeholder, mime_type=mime_type, name=name or path.name)
+        with _sources_lock:
+            _sources[placeholder] = (path, stat.st_size)
+            _source_refs[placeholder] = _source_refs.get(placeholder, 0) + 1
+        weakref.finalize(payload, _release_source, placeholder)
+        return payload
+
+    @property
+    def path(self) -> Path:
+        """Path of the file."""
+        return _sources[self.bytes][0]
+
+    @property
+    def encoded_size(self) -> int:
+        """Length of the Base64 data of the file."""
+        return base64_length(_sources[self.bytes][1])
+
+    def iter_base64(self) -> Iterator[bytes]:
+        """Iterate over the Base64 data of the file in chunks."""
+        return _iter_base64(*_sources[self.bytes])
+
+    def read_base64(self) -> str:
+        """Return the whole Base64 data of the file."""
+        return b"".join(self.iter_base64()).decode("ascii")
+
+
+def _release_source(placeholder: str) -> None:
+    with _sources_lock:
+        _source_refs[placeholder] -= 1
+        if not _source_refs[placeholder]:
+            del _source_refs[placeholder]
+            del _sources[placeholder]
+
+
+def encoded_size(payload: FileWithBytes) -> int:
+    """Return the length of the Base64 data of a payload, streamed or not."""
+    if isinstance(payload, StreamedFileWithBytes):
+        return payload.encoded_size
+    return len(payload.bytes)
+
+
+def has_streamed_payloads(body: bytes) -> bool:
+    """True if a request body holds placeholders of streamed payloads."""
+    return STREAMED_PAYLOAD_PREFIX.encode("ascii") in body
+
+
+def _iter_base64(path: Path, size: int) -> Iterator[bytes]:
+    if size == 0:
+        return
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size != size:
+            raise RuntimeError(f"{path} changed while its payload was in use")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, "MADV_SEQUENTIAL"):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, size, ENCODE_CHUNK_SIZE):
+                yield base64.b64encode(mapped[offset : offset + ENCODE_CHUNK_SIZE])
+                # the pages sent are not needed again, keep them out of the resident set
+                if hasattr(mmap, "MADV_DONTNEED"):
+                    length = min(ENCODE_CHUNK_SIZE, size - offset)
+                    mapped.madvise(mmap.MADV_DONTNEED, offset, length)
+
+
+class _SplicedBody(httpx.AsyncByteStream):
+    # request body made of the JSON around the placeholders and the Base64 data of their files
+    def __init__(self, segments: list[bytes | tuple[Path, int]]):
+        self._segments = segments
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        for segment in self._segments:
+            if isinstance(segment, bytes):
+                yield segment
+                continue
+            # the chunks are encoded in a worker thread, so the event loop is not blocked
+            chunks = _iter_base64(*segment)
+            try:
+                while (chunk := await asyncio.to_thread(next, chunks, None)) is not None:
+                    yield chunk
+            finally:
+                chunks.close()
+
+
+class StreamedPayloadTransport(httpx.AsyncBaseTransport):
+    """StreamedPayloadTransport replaces the placeholders of StreamedFileWithBytes in request
+    bodies by the Base64 data of their files, encoded while the body is sent."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        """
+        Args:
+            transport: Transport sending the requests.
+        """
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST":
+            return await self._transport.handle_async_request(request)
+
+        body = await request.aread()
+        if not has_streamed_payloads(body):
+            return await self._transport.handle_async_request(request)
+
+        segments: list[bytes | tuple[Path, int]] = []
+        length = 0
+        position = 0
+        for match in _PLACEHOLDER_PATTERN.finditer(body):
+            source = _sources.get(match.group().decode("ascii"))
+            if source is None:
+                raise RuntimeError(f"Unknown streamed payload: {match.group().decode('ascii')}")
+            segments.append(body[position : match.start()])
+            segments.append(source)
+            length += match.start() - position + base64_length(source[1])
+            position = match.end()
+        segments.append(body[position:])
+        length += len(body) - position
+
+        headers = request.headers.copy()
+        headers["Content-Length"] = str(length)
+        request = httpx.Request(
+            request.method,
+            request.url,
+            headers=headers,
+            stream=_SplicedBody(segments),
+            extensions=request.extensions,
+        )
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
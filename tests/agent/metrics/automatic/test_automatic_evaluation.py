@@ -0,0 +1,284 @@
+"""
+Tests for automatic_evaluation.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import httpx
+from openai import RateLimitError
+import pytest
+
+import fieldworkarena.agent.metrics.automatic.automatic_evaluation as auto_eval
+from fieldworkarena.agent.metrics.automatic.automatic_evaluation import AsyncJudgeClient
+from fieldworkarena.agent.metrics.automatic.judge_cache import JudgeCache
+
+
+@pytest.fixture(autouse=True)
+def no_judge_cache(monkeypatch):
+    """Fixture disabling the process-wide judge cache unless a test sets one"""
+    monkeypatch.setattr(auto_eval, "_judge_cache", None)
+    monkeypatch.setattr(auto_eval, "_judge_cache_disabled", True)
+
+
+def make_completion(content: str) -> SimpleNamespace:
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_rate_limit_error() -> RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return RateLimitError(
+        "Rate limit reached", response=httpx.Response(429, request=request), body=None
+    )
+
+
+class TestAsyncJudgeClient:
+    """Test cases for AsyncJudgeClient class"""
+
+    @pytest.fixture
+    def openai_client(self):
+        """Fixture for a mocked AsyncOpenAI client"""
+        client = SimpleNamespace(
+            chat=SimpleNamespace(completions=SimpleNamespace(create=AsyncMock()))
+        )
+        client.close = AsyncMock()
+        return client
+
+    @pytest.fixture
+    def judge_client(self, openai_client, monkeypatch):
+        """Fixture for an AsyncJudgeClient without backoff delays"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        judge_client = AsyncJudgeClient(max_concurrency=2, max_retries=2, backoff_base=0.0)
+        with patch("openai.AsyncOpenAI", return_value=openai_client):
+            yield judge_client
+
+    async def test_create_returns_content(self, judge_client, openai_client):
+        """Test the content of the first choice is returned"""
+        openai_client.chat.completions.create.return_value = make_completion("correct")
+
+        assert await judge_client.create(model="gpt-4o", messages=[]) == "correct"
+
+    async def test_create_retries_rate_limit(self, judge_client, openai_client):
+        """Test rate-limited requests are retried"""
+        openai_client.chat.completions.create.side_effect = [
+            make_rate_limit_error(),
+            make_completion("correct"),
+        ]
+
+        assert await judge_client.create(model="gpt-4o", messages=[]) == "correct"
+        assert openai_client.chat.completions.create.await_count == 2
+        assert judge_client.retries == 1
+
+    async def test_create_raises_after_max_retries(self, judge_client, openai_client):
+        """Test the error is raised once the retries are exhausted"""
+        openai_client.chat.completions.create.side_effect = make_rate_limit_error()
+
+        with pytest.raises(RateLimitError):
+            await judge_client.create(model="gpt-4o", messages=[])
+        assert openai_client.chat.completions.create.await_count == 3
+
+    async def test_create_does_not_retry_other_errors(self, judge_client, openai_client):
+        """Test non-retryable errors are raised immediately"""
+        openai_client.chat.completions.create.side_effect = ValueError("bad request")
+
+        with pytest.raises(ValueError):
+            await judge_client.create(model="gpt-4o", messages=[])
+        assert openai_client.chat.completions.create.await_count == 1
+
+    async def test_create_limits_concurrency(self, judge_client, openai_client):
+        """Test no more than max_concurrency requests are in flight"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def create(**kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_completion("correct")
+
+        openai_client.chat.completions.create.side_effect = create
+
+        await asyncio.gather(*(judge_client.create(model="gpt-4o", messages=[]) for _ in range(6)))
+        assert max_in_flight == 2
+
+    def test_backoff_is_bounded(self):
+        """Test the jittered backoff stays within the exponential bound and the cap"""
+        judge_client = AsyncJudgeClient(backoff_base=1.0, backoff_max=5.0)
+
+        for attempt in range(6):
+            assert 0.0 <= judge_client.backoff(attempt) <= min(5.0, 2**attempt)
+
+
+class TestAsyncMatch:
+    """Test cases for the async judge functions"""
+
+    @pytest.mark.parametrize(
+        "response, expected",
+        [("correct", 1.0), ("Partially correct", 0.0), ("incorrect", 0.0), ("", 0.0)],
+    )
+    async def test_allm_fuzzy_match(self, response, expected):
+        """Test allm_fuzzy_match scores the judge response"""
+        with patch.object(auto_eval.async_judge_client, "create", AsyncMock(return_value=response)):
+            score, _ = await auto_eval.allm_fuzzy_match("pred", "reference", "question")
+
+        assert score == expected
+
+    async def test_ajson_match(self):
+        """Test ajson_match returns the judge response as the reason"""
+        with patch.object(
+            auto_eval.async_judge_client, "create", AsyncMock(return_value="Correct\nsame keys")
+        ):
+            score, reason = await auto_eval.ajson_match("{}", "{}", "question")
+
+        assert score == 1.0
+        assert reason == "correct same keys"
+
+    async def test_anumerical_match(self):
+        """Test anumerical_match scores the numerical values of the judge response"""
+        response = (
+            '{"correctness": "correct", "numerical_values": '
+            '{"count": {"teacher": "3", "student": "3", "unit": "", "type": "number"}}}'
+        )
+        with patch.object(auto_eval.async_judge_client, "create", AsyncMock(return_value=response)):
+            score, _ = await auto_eval.anumerical_match("3", "3", "question")
+
+        assert score == 1.0
+
+
+class TestJudgeCacheUsage:
+    """Test cases for the judge cache in the judge functions"""
+
+    @pytest.fixture
+    def judge_cache(self, tmp_path, monkeypatch):
+        """Fixture for a judge cache in a temporary directory"""
+        cache = JudgeCache(tmp_path / "judge_cache.sqlite3")
+        monkeypatch.setattr(auto_eval, "_judge_cache", cache)
+        yield cache
+        cache.close()
+
+    async def test_cached_response_skips_api(self, judge_cache):
+        """Test a repeated judge request is answered from the cache"""
+        create = AsyncMock(return_value="correct")
+        with patch.object(auto_eval.async_judge_client, "create", create):
+            first = await auto_eval.allm_fuzzy_match("pred", "reference", "question")
+            second = await auto_eval.allm_fuzzy_match("pred", "reference", "question")
+
+        assert first == second == (1.0, None)
+        assert create.await_count == 1
+        assert judge_cache.stats() == {"hits": 1, "misses": 1, "writes": 1}
+
+    async def test_failed_response_is_not_cached(self, judge_cache):
+        """Test empty responses from failed requests are not cached"""
+        create = AsyncMock(side_effect=ValueError("bad request"))
+        with patch.object(auto_eval.async_judge_client, "create", create):
+            await auto_eval.allm_fuzzy_match("pred", "reference", "question")
+
+        assert len(judge_cache) == 0
+
+    def test_sync_and_async_share_entries(self, judge_cache):
+        """Test responses cached by the async path are used by the sync path"""
+        create = AsyncMock(return_value="correct")
+        with patch.object(auto_eval.async_judge_client, "create", create):
+            asyncio.run(auto_eval.allm_fuzzy_match("pred", "reference", "question"))
+        with patch.object(auto_eval, "get_client") as get_client:
+            assert auto_eval.llm_fuzzy_match("pred", "reference", "question") == (1.0, None)
+
+        get_client.assert_not_called()
+
+    def test_get_judge_cache_opt_out(self, monkeypatch):
+        """Test FWA_JUDGE_CACHE_DISABLE disables the cache"""
+        monkeypatch.setattr(auto_eval, "_judge_cache_disabled", False)
+        monkeypatch.setenv("FWA_JUDGE_CACHE_DISABLE", "1")
+
+        assert auto_eval.get_judge_cache() is None
+
+    def test_get_judge_cache_path(self, tmp_path, monkeypatch):
+        """Test FWA_JUDGE_CACHE_PATH sets the location of the cache"""
+        path = tmp_path / "cache" / "judge.sqlite3"
+        monkeypatch.setattr(auto_eval, "_judge_cache_disabled", False)
+        monkeypatch.delenv("FWA_JUDGE_CACHE_DISABLE", raising=False)
+        monkeypatch.setenv("FWA_JUDGE_CACHE_PATH", str(path))
+
+        cache = auto_eval.get_judge_cache()
+        try:
+            assert cache is not None and cache.path == path
+            assert path.exists()
+        finally:
+            cache.close()
+
+
+class TestPreJudgeFuzzyMatch:
+    """Test cases for pre_judge_fuzzy_match function"""
+
+    @pytest.mark.parametrize(
+        "pred, reference",
+        [
+            ("'Yes.'", "Yes."),
+            ("customer detected in specified area.", "Customer detected in specified area."),
+            ("Yes, it is.", "Yes."),
+            ("Entry1 is improper, Exit2 is improper", "Entry1 is improper, Exit2 is improper."),
+        ],
+    )
+    def test_definitely_correct(self, pred, reference):
+        """Test answers matching the reference are scored 1.0"""
+        assert auto_eval.pre_judge_fuzzy_match(pred, reference)[0] == 1.0
+
+    @pytest.mark.parametrize(
+        "pred, reference",
+        [
+            ("No, the worker is outside.", "Yes, the worker is located within the bounding box."),
+            (
+                "3 baskets are left.",
+                '"Need for basket collection" is required, 2 baskets are left.',
+            ),
+            ("Business hours are 9:00 to 17:00.", "Business hours are 08:00 to 20:00."),
+            ("2", "3 people"),
+        ],
+    )
+    def test_definitely_incorrect(self, pred, reference):
+        """Test answers contradicting the reference are scored 0.0"""
+        assert auto_eval.pre_judge_fuzzy_match(pred, reference)[0] == 0.0
+
+    @pytest.mark.parametrize(
+        "pred, reference",
+        [
+            ("Customer did buy the target product.", "Customer did not buy the target product."),
+            ("Customer didn't stay in front of Tablet.", "Customer stayed in front of Tablet."),
+            ("Entry1 is proper, Exit2 is improper.", "Entry1 is improper, Exit2 is improper."),
+            ("There were none.", "There was zero."),
+            ("The top speed is 8.28 km/h.", "The top speed is 2.3 m/s."),
+            ("Yes, there is a person without PPE in this image.", "Yes."),
+            ("Three people are visible in camera 2.", "3 people"),
+            (
+                "Yes, the worker is located within the designated bounding box of the image.",
+                "Yes, the worker is located within the designated bounding box.",
+            ),
+            # words qualifying the reference may make the answer partially correct or incorrect
+            ("Yes, partially", "Yes."),
+            ("safety vest and helmet missing", "safety vest and helmet"),
+            ("The worker is wearing a helmet incorrectly", "The worker is wearing a helmet"),
+            (
+                "Business hours are 08:00 to 20:00 except Sundays.",
+                "Business hours are 08:00 to 20:00.",
+            ),
+            ("Cart A failed", "Cart A"),
+            ("Left-right", "Left"),
+        ],
+    )
+    def test_ambiguous(self, pred, reference):
+        """Test ambiguous answers are left to the LLM"""
+        assert auto_eval.pre_judge_fuzzy_match(pred, reference) is None
+
+
+class TestLazyDependencies:
+    """Test cases for the lazily initialized dependencies"""
+
+    def test_get_client_is_created_once(self, monkeypatch):
+        """Test the sync OpenAI client is created on first use and reused"""
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setattr(auto_eval, "_client", None)
+
+        assert auto_eval.get_client() is auto_eval.get_client()
@@ -0,0 +1,161 @@
+"""
+Tests for batch_judge.py
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+import fieldworkarena.agent.metrics.automatic.automatic_evaluation as auto_eval
+from fieldworkarena.agent.metrics.automatic.batch_judge import (
+    FuzzyMatchBatcher,
+    abatch_llm_fuzzy_match,
+)
+from fieldworkarena.agent.metrics.automatic.judge_cache import JudgeCache
+
+BATCH_JUDGE_MODULE = "fieldworkarena.agent.metrics.automatic.batch_judge"
+
+ITEMS = [
+    ("Yes.", "Yes, the worker is in the box.", "Is the worker in the box?"),
+    ("2 people", "3 people", "How many people?"),
+    ("Customer bought it", "Customer bought the product.", "Did the customer buy?"),
+]
+
+
+def make_verdicts(*judgements: str) -> str:
+    return json.dumps(
+        {"verdicts": [{"id": i, "judgement": j} for i, j in enumerate(judgements, start=1)]}
+    )
+
+
+@pytest.fixture(autouse=True)
+def no_judge_cache(monkeypatch):
+    """Fixture disabling the process-wide judge cache unless a test sets one"""
+    monkeypatch.setattr(auto_eval, "_judge_cache", None)
+    monkeypatch.setattr(auto_eval, "_judge_cache_disabled", True)
+
+
+@pytest.fixture
+def create():
+    """Fixture for the mocked chat completion of the shared judge client"""
+    with patch.object(auto_eval.async_judge_client, "create", AsyncMock()) as create:
+        yield create
+
+
+class TestAbatchLlmFuzzyMatch:
+    """Test cases for abatch_llm_fuzzy_match function"""
+
+    async def test_one_request_for_all_items(self, create):
+        """Test all items are judged by a single chat completion"""
+        create.return_value = make_verdicts("correct", "incorrect", "Partially Correct")
+
+        results = await abatch_llm_fuzzy_match(ITEMS)
+
+        assert [score for score, _ in results] == [1.0, 0.0, 0.0]
+        assert create.await_count == 1
+        prompt = create.call_args.kwargs["messages"][1]["content"]
+        assert all(question in prompt for _, _, question in ITEMS)
+
+    async def test_fallback_on_parse_failure(self, create):
+        """Test items are judged one by one when the batch response cannot be parsed"""
+        create.side_effect = ["not json", "correct", "incorrect", "correct"]
+
+        results = await abatch_llm_fuzzy_match(ITEMS)
+
+        assert sorted(score for score, _ in results) == [0.0, 1.0, 1.0]
+        assert create.await_count == 4
+
+    async def test_fallback_for_missing_verdicts(self, create):
+        """Test only the items without a valid verdict fall back to single-item calls"""
+        create.side_effect = [
+            json.dumps(
+                {"verdicts": [{"id": 1, "judgement": "correct"}, {"id": 2, "judgement": "?"}]}
+            ),
+            "incorrect",
+            "correct",
+        ]
+
+        results = await abatch_llm_fuzzy_match(ITEMS)
+
+        assert results[0] == (1.0, None)
+        assert create.await_count == 3
+
+    async def test_verdicts_are_cached_per_item(self, create, tmp_path, monkeypatch):
+        """Test batched verdicts are reused by batches of another composition"""
+        cache = JudgeCache(tmp_path / "judge_cache.sqlite3")
+        monkeypatch.setattr(auto_eval, "_judge_cache", cache)
+        create.return_value = make_verdicts("correct", "incorrect", "correct")
+        try:
+            await abatch_llm_fuzzy_match(ITEMS)
+            results = await abatch_llm_fuzzy_match(ITEMS[::-1])
+        finally:
+            cache.close()
+
+        assert [score for score, _ in results] == [1.0, 0.0, 1.0]
+        assert create.await_count == 1
+
+    async def test_batched_verdicts_are_not_single_item_responses(
+        self, create, tmp_path, monkeypatch
+    ):
+        """Test single-item judging does not replay verdicts of the batched prompt"""
+        cache = JudgeCache(tmp_path / "judge_cache.sqlite3")
+        monkeypatch.setattr(auto_eval, "_judge_cache", cache)
+        create.side_effect = [make_verdicts("correct", "correct", "correct"), "incorrect"]
+        try:
+            await abatch_llm_fuzzy_match(ITEMS)
+            score, _ = await auto_eval.allm_fuzzy_match(*ITEMS[1])
+        finally:
+            cache.close()
+
+        assert score == 0.0
+        assert create.await_count == 2
+
+
+class TestFuzzyMatchBatcher:
+    """Test cases for FuzzyMatchBatcher class"""
+
+    async def test_full_batch_is_sent(self, create):
+        """Test concurrent requests are sent together once the batch is full"""
+        create.return_value = make_verdicts("correct", "incorrect", "correct")
+        batcher = FuzzyMatchBatcher(batch_size=3, max_wait=60)
+
+        results = await asyncio.gather(*(batcher.judge(*item) for item in ITEMS))
+
+        assert [score for score, _ in results] == [1.0, 0.0, 1.0]
+        assert create.await_count == 1
+        assert batcher.stats() == {"batches": 1, "items": 3, "fallbacks": 0}
+
+    async def test_partial_batch_is_sent_after_max_wait(self, create):
+        """Test a batch that is not full is sent after max_wait"""
+        create.return_value = make_verdicts("correct", "incorrect")
+        batcher = FuzzyMatchBatcher(batch_size=10, max_wait=0.01)
+
+        results = await asyncio.gather(*(batcher.judge(*item) for item in ITEMS[:2]))
+
+        assert [score for score, _ in results] == [1.0, 0.0]
+        assert create.await_count == 1
+
+    async def test_short_result_list_resolves_every_request(self, create):
+        """Test a result list shorter than the batch scores the batch 0 instead of hanging"""
+        batcher = FuzzyMatchBatcher(batch_size=3, max_wait=60)
+        short = AsyncMock(return_value=([(1.0, None)] * 2, 0))
+
+        with patch(f"{BATCH_JUDGE_MODULE}._abatch_llm_fuzzy_match", short):
+            results = await asyncio.wait_for(
+                asyncio.gather(*(batcher.judge(*item) for item in ITEMS)), timeout=5
+            )
+
+        assert results == [(0.0, None)] * 3
+
+    async def test_batch_size_one_is_not_batched(self, create):
+        """Test requests are judged one by one with batch_size 1"""
+        create.return_value = "correct"
+        batcher = FuzzyMatchBatcher(batch_size=1)
+
+        await asyncio.gather(*(batcher.judge(*item) for item in ITEMS))
+
+        assert create.await_count == 3
+        assert "response_format" not in create.call_args.kwargs
+        assert batcher.stats()["batches"] == 0
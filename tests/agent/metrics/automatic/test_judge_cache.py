@@ -0,0 +1,80 @@
+"""
+Tests for judge_cache.py
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from fieldworkarena.agent.metrics.automatic.judge_cache import JudgeCache
+
+
+class TestJudgeCache:
+    """Test cases for JudgeCache class"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        """Fixture for a JudgeCache in a temporary directory"""
+        cache = JudgeCache(tmp_path / "judge_cache.sqlite3")
+        yield cache
+        cache.close()
+
+    def test_get_missing_key(self, cache):
+        """Test get returns None for a key that was not cached"""
+        assert cache.get("missing") is None
+        assert cache.stats() == {"hits": 0, "misses": 1, "writes": 0}
+
+    def test_put_and_get(self, cache):
+        """Test a cached response is returned"""
+        cache.put("key", "correct")
+
+        assert cache.get("key") == "correct"
+        assert len(cache) == 1
+        assert cache.stats() == {"hits": 1, "misses": 0, "writes": 1}
+
+    async def test_async_access_runs_off_the_event_loop(self, cache):
+        """Test aget and aput query the database from a worker thread"""
+        threads = []
+
+        def record_thread(method):
+            def wrapper(*args):
+                threads.append(threading.get_ident())
+                return method(*args)
+
+            return wrapper
+
+        with (
+            patch.object(cache, "get", record_thread(cache.get)),
+            patch.object(cache, "put", record_thread(cache.put)),
+        ):
+            await cache.aput("key", "correct")
+            assert await cache.aget("key") == "correct"
+
+        assert len(threads) == 2
+        assert threading.get_ident() not in threads
+
+    def test_entries_persist(self, tmp_path):
+        """Test entries are kept across instances"""
+        path = tmp_path / "judge_cache.sqlite3"
+        cache = JudgeCache(path)
+        cache.put("key", "correct")
+        cache.close()
+
+        reopened = JudgeCache(path)
+        try:
+            assert reopened.get("key") == "correct"
+        finally:
+            reopened.close()
+
+    def test_make_key(self):
+        """Test the key depends on every request parameter but not on argument order"""
+        messages = [{"role": "user", "content": "question"}]
+        key = JudgeCache.make_key(model="gpt-4o", messages=messages, temperature=0)
+
+        assert key == JudgeCache.make_key(temperature=0, messages=messages, model="gpt-4o")
+        assert key != JudgeCache.make_key(model="gpt-4o-mini", messages=messages, temperature=0)
+        assert key != JudgeCache.make_key(model="gpt-4o", messages=messages, temperature=1)
+        assert key != JudgeCache.make_key(
+            model="gpt-4o", messages=[{"role": "user", "content": "other"}], temperature=0
+        )
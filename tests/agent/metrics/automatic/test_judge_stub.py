@@ -0,0 +1,164 @@
+"""
+Tests for judge_rules.py, judge_stub.py and judge_backend.py
+"""
+
+import json
+import subprocess
+import sys
+
+from openai import OpenAI, RateLimitError
+import pytest
+from starlette.testclient import TestClient
+
+import fieldworkarena.agent.metrics.automatic.automatic_evaluation as auto_eval
+from fieldworkarena.agent.metrics.automatic.automatic_evaluation import AsyncJudgeClient
+from fieldworkarena.agent.metrics.automatic.batch_judge import _batch_fuzzy_match_messages
+from fieldworkarena.agent.metrics.automatic.judge_backend import (
+    OpenAIJudgeBackend,
+    StubJudgeBackend,
+    create_judge_backend,
+)
+from fieldworkarena.agent.metrics.automatic.judge_rules import judge_item, respond
+from fieldworkarena.agent.metrics.automatic.judge_stub import create_app
+
+STUB_BASE_URL = "http://testserver/v1"
+
+
+@pytest.fixture(autouse=True)
+def no_judge_cache(monkeypatch):
+    """Fixture disabling the process-wide judge cache"""
+    monkeypatch.setattr(auto_eval, "_judge_cache", None)
+    monkeypatch.setattr(auto_eval, "_judge_cache_disabled", True)
+
+
+class TestRespond:
+    """Test cases for the rule-based responses of the stub"""
+
+    @pytest.mark.parametrize(
+        "pred, reference, expected",
+        [
+            (
+                "Customer detected in specified area.",
+                "customer detected in specified area.",
+                "correct",
+            ),
+            (
+                "The customer was detected in the specified area",
+                "Customer detected in specified area.",
+                "correct",
+            ),
+            ("2 baskets are left.", "3 baskets are left.", "incorrect"),
+            ("Nothing happened.", "Customer stayed in front of Tablet.", "incorrect"),
+        ],
+    )
+    def test_judge_item(self, pred, reference, expected):
+        """Test the rule-based verdicts"""
+        assert judge_item(pred, reference) == expected
+
+    def test_fuzzy_match_prompt(self):
+        """Test the llm_fuzzy_match prompt is answered with a verdict it can score"""
+        messages = auto_eval._fuzzy_match_messages("Yes.", "Yes.", "Is there a worker?")
+
+        assert auto_eval._score_fuzzy_match(respond(messages)) == (1.0, None)
+
+    def test_numerical_match_prompt(self):
+        """Test the numerical_match prompt is answered with JSON it can score"""
+        messages = auto_eval._numerical_match_messages("3 people", "3 people", "How many?")
+
+        score, json_data = auto_eval._score_numerical_match(respond(messages), 0.5)
+
+        assert score == 1.0
+        assert json_data["numerical_values"]["value"]["student"] == "3"
+
+    def test_batch_prompt(self):
+        """Test the batch prompt is answered with one verdict per item"""
+        messages = _batch_fuzzy_match_messages(
+            [("Yes.", "Yes.", "Is there a worker?"), ("2 people", "3 people", "How many?")]
+        )
+
+        verdicts = json.loads(respond(messages))["verdicts"]
+
+        assert verdicts == [{"id": 1, "judgement": "correct"}, {"id": 2, "judgement": "incorrect"}]
+
+
+class TestStubServer:
+    """Test cases for the OpenAI-compatible stub server"""
+
+    def test_chat_completions(self):
+        """Test the server answers the OpenAI client"""
+        with TestClient(create_app()) as http_client:
+            client = OpenAI(api_key="stub", base_url=STUB_BASE_URL, http_client=http_client)
+            response = client.chat.completions.create(
+                model="gpt-4o",
+                messages=auto_eval._fuzzy_match_messages("Yes.", "Yes.", "Is there a worker?"),
+            )
+
+        assert response.choices[0].message.content == "correct"
+        assert response.usage.total_tokens > 0
+
+    def test_error_injection(self):
+        """Test injected errors surface as rate-limit errors"""
+        with TestClient(create_app(error_rate=1.0)) as http_client:
+            client = OpenAI(
+                api_key="stub", base_url=STUB_BASE_URL, http_client=http_client, max_retries=0
+            )
+            with pytest.raises(RateLimitError):
+                client.chat.completions.create(model="gpt-4o", messages=[])
+
+            assert http_client.get("/stats").json() == {"requests": 1, "errors": 1}
+
+
+class TestJudgeBackend:
+    """Test cases for the judge backends"""
+
+    async def test_stub_backend_judges_offline(self, monkeypatch):
+        """Test the judge functions run on the in-process stub backend"""
+        monkeypatch.setattr(auto_eval, "async_judge_client", AsyncJudgeClient(StubJudgeBackend()))
+
+        score, _ = await auto_eval.allm_fuzzy_match("Yes.", "Yes.", "Is there a worker?")
+
+        assert score == 1.0
+
+    def test_create_judge_backend(self, monkeypatch):
+        """Test the backend is selected by FWA_JUDGE_BACKEND"""
+        monkeypatch.setenv("FWA_JUDGE_BACKEND", "stub")
+        assert isinstance(create_judge_backend(), StubJudgeBackend)
+
+        monkeypatch.delenv("FWA_JUDGE_BACKEND")
+        assert isinstance(create_judge_backend(), OpenAIJudgeBackend)
+
+        with pytest.raises(ValueError):
+            create_judge_backend("unknown")
+
+    def test_default_backend_is_created_on_first_use(self, monkeypatch):
+        """Test a bad FWA_JUDGE_BACKEND is reported by the first judgement, not at creation"""
+        monkeypatch.setenv("FWA_JUDGE_BACKEND", "unknown")
+        client = AsyncJudgeClient()
+
+        with pytest.raises(ValueError, match="Unknown judge backend"):
+            client.cache_key(model="gpt-4o", messages=[])
+
+        monkeypatch.setenv("FWA_JUDGE_BACKEND", "stub")
+        assert isinstance(client.backend, StubJudgeBackend)
+
+    def test_backends_have_separate_cache_keys(self):
+        """Test cached responses of the stub are never served for the OpenAI API"""
+        request = {"model": "gpt-4o", "messages": []}
+
+        stub_key = AsyncJudgeClient(StubJudgeBackend()).cache_key(**request)
+        openai_key = AsyncJudgeClient(OpenAIJudgeBackend()).cache_key(**request)
+
+        assert stub_key != openai_key
+
+    def test_backends_do_not_load_the_stub_server(self):
+        """Test importing the judge backends loads neither the stub server nor uvicorn"""
+        script = (
+            "import sys; import fieldworkarena.agent.metrics.automatic.judge_backend; "
+            "print(sorted(m for m in sys.modules if m == 'uvicorn' or m.endswith('judge_stub')))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", script], capture_output=True, text=True, timeout=60
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "[]"
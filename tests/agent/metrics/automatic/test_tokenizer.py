@@ -0,0 +1,135 @@
+"""
+Tests for tokenizer.py
+"""
+
+import json
+from pathlib import Path
+
+import nltk
+import pytest
+
+from fieldworkarena.agent.metrics.automatic.automatic_evaluation import must_exclude, must_include
+from fieldworkarena.agent.metrics.automatic.tokenizer import tokenize_reference, word_tokenize
+
+TASKS_DIR = Path(__file__).parents[4] / "benchmark" / "tasks" / "group2"
+# expected nltk.word_tokenize outputs, regenerated by running this module with the punkt data
+FIXTURE_PATH = Path(__file__).parents[3] / "fixtures" / "tokenizer" / "word_tokenize.json"
+
+# punctuation, quotes, clitics and sentence-final periods
+TEXTS = [
+    "Good muffins cost $3.88 (roughly 3,36 euros)\nin New York.  Please buy me\ntwo of them.",
+    "I don't know, can't you? They're here; we'll see. I cannot go, gonna stay.",
+    '\'hello\' said the workers\' boss... wait -- what?! "quoted" ("paren")',
+    "time is 00: 00:03:53 to 00:09:00. e.g. this, i.e. that.",
+    "The speed was 2.3 m/s. Next one.",
+    'He said "yes." Then left.',
+    "Kyowa PV Co., Ltd. (under the Safety and Health Law.)under the law",
+    '{"incident": [{"time": "00:01:02", "type": "no_helmet"}]}',
+    "“smart” ‘quotes’ «x» – y — z -5 degrees",
+    "''quoted'' and a..b",
+    "end e.g.",
+    "",
+]
+
+
+def load_references() -> list[str]:
+    references = set()
+    for path in sorted(TASKS_DIR.glob("*.json")):
+        for task in json.loads(path.read_text(encoding="utf-8")):
+            for conversation in task["conversations"]:
+                if conversation["from"] == "gpt":
+                    references.add(conversation["value"])
+    return sorted(references)
+
+
+def load_fixture() -> dict[str, list[str]]:
+    cases = json.loads(FIXTURE_PATH.read_text(encoding="utf-8"))
+    return {case["text"]: case["tokens"] for case in cases}
+
+
+def write_fixture() -> None:
+    references = load_references()
+    texts = TEXTS + references + [reference.lower() for reference in references]
+    lines = [
+        json.dumps({"text": text, "tokens": nltk.word_tokenize(text)}, ensure_ascii=False)
+        for text in dict.fromkeys(texts)
+    ]
+    FIXTURE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    FIXTURE_PATH.write_text("[\n" + ",\n".join(lines) + "\n]\n", encoding="utf-8")
+
+
+def has_punkt() -> bool:
+    try:
+        nltk.data.find("tokenizers/punkt_tab")
+        return True
+    except LookupError:
+        return False
+
+
+class TestWordTokenize:
+    """Test cases for word_tokenize function"""
+
+    def test_parity_with_nltk(self):
+        """Test the texts and the reference answers of the benchmark are tokenized like
+        nltk.word_tokenize"""
+        fixture = load_fixture()
+        assert fixture
+
+        mismatches = [text for text, tokens in fixture.items() if word_tokenize(text) != tokens]
+        assert mismatches == []
+
+    @pytest.mark.skipif(not TASKS_DIR.exists(), reason="benchmark tasks are not available")
+    def test_fixture_covers_references(self):
+        """Test the fixture holds every reference answer of the benchmark"""
+        fixture = load_fixture()
+
+        missing = [reference for reference in load_references() if reference not in fixture]
+        assert missing == []
+
+    @pytest.mark.skipif(not has_punkt(), reason="nltk punkt data is not installed")
+    def test_fixture_matches_nltk(self):
+        """Test the fixture holds the current outputs of nltk.word_tokenize"""
+        mismatches = [
+            text for text, tokens in load_fixture().items() if nltk.word_tokenize(text) != tokens
+        ]
+        assert mismatches == []
+
+    def test_nltk_documentation_example(self):
+        """Test the example of the NLTK documentation gives the documented Punkt tokenization"""
+        text = "Good muffins cost $3.88\nin New York.  Please buy me\ntwo of them.\n\nThanks."
+
+        expected = "Good muffins cost $ 3.88 in New York . Please buy me two of them . Thanks ."
+        assert word_tokenize(text) == expected.split()
+
+    def test_tokenize_reference_is_memoized(self):
+        """Test a tokenized reference is reused"""
+        tokenize_reference.cache_clear()
+
+        tokens = tokenize_reference("The worker is in the box.")
+
+        assert tokens == ("The", "worker", "is", "in", "the", "box", ".")
+        assert tokenize_reference("The worker is in the box.") is tokens
+        assert tokenize_reference.cache_info().hits == 1
+
+
+class TestMustInclude:
+    """Test cases for must_include and must_exclude functions"""
+
+    @pytest.mark.parametrize(
+        "ref, pred, expected",
+        [
+            ("0", "There are 10 baskets.", 0.0),
+            ("0", "There are 0 baskets.", 1.0),
+            ("'Yes'", "yes, the worker wears a helmet.", 1.0),
+            ("two baskets", "Two baskets are left.", 1.0),
+            ("two baskets", "Three baskets are left.", 0.0),
+        ],
+    )
+    def test_must_include(self, ref, pred, expected):
+        """Test a single-word reference must be a token of the answer"""
+        assert must_include(ref, pred) == (expected, None)
+        assert must_exclude(ref, pred) == (1.0 - expected, None)
+
+
+if __name__ == "__main__":
+    write_fixture()
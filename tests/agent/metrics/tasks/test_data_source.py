@@ -6,6 +6,8 @@ import base64
 import io
 import os
 from pathlib import Path
+import threading
+import time
 from unittest.mock import Mock, patch
 
 from a2a.types import FileWithBytes
@@ -13,7 +15,11 @@ from huggingface_hub.utils import HfHubHTTPError
 from PIL import Image
 import pytest
 
-from fieldworkarena.agent.metrics.tasks.data_source import BenchmarkDataSource
+from fieldworkarena.agent.metrics.tasks.data_source import (
+    BenchmarkDataSource,
+    LocalDirectoryDataSource,
+)
+from fieldworkarena.agent_core.streamed_payload import StreamedFileWithBytes
 
 
 class TestBenchmarkDataSource:
@@ -79,6 +85,7 @@ class TestBenchmarkDataSource:
         assert ds.repo_type == "dataset"
         assert ds.cache_dir is None
         assert ds.force_download is False
+        assert ds.payload_store is None
 
     @pytest.mark.integration
     def test_validate_access_success_integration(self, real_data_source):
@@ -184,6 +191,31 @@ class TestBenchmarkDataSource:
         decoded_img = Image.open(io.BytesIO(decoded_bytes))
         assert decoded_img.mode == "RGB"
         assert decoded_img.format == "JPEG"
+        assert data_source.jpeg_stats == {"passthrough": 0, "reencoded": 1}
+
+    def test_load_base64_baseline_jpg_passthrough(self, data_source, tmp_path):
+        """Test a baseline RGB JPEG is sent without re-encoding"""
+        test_file = tmp_path / "test.jpg"
+        img = Image.new("RGB", (100, 100), color="red")
+        img.save(test_file, format="JPEG", quality=95)
+
+        result = data_source._load_base64(test_file)
+
+        assert base64.b64decode(result) == test_file.read_bytes()
+        assert data_source.jpeg_stats == {"passthrough": 1, "reencoded": 0}
+
+    def test_load_base64_progressive_jpg_reencoded(self, data_source, tmp_path):
+        """Test a progressive JPEG is re-encoded"""
+        test_file = tmp_path / "test.jpg"
+        img = Image.new("RGB", (100, 100), color="red")
+        img.save(test_file, format="JPEG", progressive=True)
+
+        result = data_source._load_base64(test_file)
+
+        decoded_img = Image.open(io.BytesIO(base64.b64decode(result)))
+        assert decoded_img.format == "JPEG"
+        assert not decoded_img.info.get("progressive")
+        assert data_source.jpeg_stats == {"passthrough": 0, "reencoded": 1}
 
     @patch("fieldworkarena.agent.metrics.tasks.data_source.hf_hub_download")
     def test_download_success(self, mock_hf_hub_download, data_source):
@@ -412,6 +444,113 @@ class TestBenchmarkDataSource:
         with pytest.raises(FileNotFoundError):
             data_source._load_single_file("test.txt")
 
+    @patch.object(BenchmarkDataSource, "_download")
+    @patch.object(BenchmarkDataSource, "_load_base64")
+    def test_load_single_file_uses_payload_cache(
+        self, mock_load_base64, mock_download, data_source, tmp_path
+    ):
+        """Test a file referenced twice is encoded only once"""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("Hello, World!")
+        mock_download.return_value = test_file
+        mock_load_base64.return_value = "base64encodedcontent"
+
+        first = data_source._load_single_file("test.txt")
+        second = data_source._load_single_file("test.txt")
+
+        assert first == second
+        assert mock_load_base64.call_count == 1
+        stats = data_source.payload_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @patch.object(BenchmarkDataSource, "_download")
+    @patch.object(BenchmarkDataSource, "_load_base64")
+    def test_load_single_file_payload_cache_invalidated_by_revision(
+        self, mock_load_base64, mock_download, data_source, tmp_path
+    ):
+        """Test a changed file is encoded again"""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("Hello, World!")
+        mock_download.return_value = test_file
+        mock_load_base64.return_value = "base64encodedcontent"
+
+        data_source._load_single_file("test.txt")
+        test_file.write_text("Hello, World! (updated)")
+        data_source._load_single_file("test.txt")
+
+        assert mock_load_base64.call_count == 2
+
+    @patch.object(BenchmarkDataSource, "_load_base64")
+    def test_load_encoded_uses_payload_store(self, mock_load_base64, mock_access_token, tmp_path):
+        """Test encoded payloads are persisted and served by a restarted data source"""
+        test_file = tmp_path / "test.txt"
+        test_file.write_text("Hello, World!")
+        mock_load_base64.return_value = "base64encodedcontent"
+        store_dir = tmp_path / "store"
+
+        first = BenchmarkDataSource(
+            access_token=mock_access_token, payload_store_dir=str(store_dir)
+        )
+        assert first._load_encoded(test_file) == "base64encodedcontent"
+
+        second = BenchmarkDataSource(
+            access_token=mock_access_token, payload_store_dir=str(store_dir)
+        )
+        assert second._load_encoded(test_file) == "base64encodedcontent"
+
+        assert mock_load_base64.call_count == 1
+        assert second.payload_store.stats()["hits"] == 1
+
+    @patch.object(BenchmarkDataSource, "_download")
+    @patch.object(BenchmarkDataSource, "_load_base64")
+    def test_load_single_file_streams_large_files(
+        self, mock_load_base64, mock_download, mock_access_token, tmp_path
+    ):
+        """Test files above the stream threshold are not encoded in memory"""
+        test_file = tmp_path / "test.mp4"
+        test_file.write_bytes(os.urandom(1000))
+        mock_download.return_value = test_file
+        data_source = BenchmarkDataSource(
+            access_token=mock_access_token, stream_threshold_bytes=1000
+        )
+
+        result = data_source._load_single_file("test.mp4")
+
+        assert isinstance(result, StreamedFileWithBytes)
+        assert result.mime_type == "video/mp4"
+        assert result.name == "test.mp4"
+        assert result.read_base64() == base64.b64encode(test_file.read_bytes()).decode("ascii")
+        mock_load_base64.assert_not_called()
+
+    @patch.object(BenchmarkDataSource, "_download")
+    @patch.object(BenchmarkDataSource, "_load_base64")
+    def test_load_single_file_does_not_stream_images(
+        self, mock_load_base64, mock_download, mock_access_token, tmp_path
+    ):
+        """Test JPEG images are held in memory whatever their size"""
+        test_file = tmp_path / "test.jpg"
+        test_file.write_bytes(os.urandom(1000))
+        mock_download.return_value = test_file
+        mock_load_base64.return_value = "base64encodedcontent"
+        data_source = BenchmarkDataSource(access_token=mock_access_token, stream_threshold_bytes=1)
+
+        result = data_source._load_single_file("test.jpg")
+
+        assert not isinstance(result, StreamedFileWithBytes)
+        assert result.bytes == "base64encodedcontent"
+
+    def test_file_revision_uses_blob_name(self, data_source, tmp_path):
+        """Test the blob name is used as revision for Hugging Face cache symlinks"""
+        blobs_dir = tmp_path / "blobs"
+        blobs_dir.mkdir()
+        blob = blobs_dir / "0123abcd"
+        blob.write_text("content")
+        link = tmp_path / "test.txt"
+        link.symlink_to(blob)
+
+        assert data_source._file_revision(link) == "0123abcd"
+
     @patch.object(BenchmarkDataSource, "_load_single_file")
     def test_load_file_payload_list_format(self, mock_load_single_file, data_source):
         """Test load_file_payload with list format (V1)"""
@@ -477,6 +616,72 @@ class TestBenchmarkDataSource:
         assert len(result) == 0
         mock_load_single_file.assert_not_called()
 
+    @patch.object(BenchmarkDataSource, "_load_single_file")
+    async def test_aload_file_payload_preserves_order(self, mock_load_single_file, data_source):
+        """Test aload_file_payload returns payloads in input order"""
+
+        def load(file_name):
+            # finish the first file last
+            if file_name == "file1.txt":
+                time.sleep(0.05)
+            return FileWithBytes(bytes=file_name, mime_type="text/plain", name=file_name)
+
+        mock_load_single_file.side_effect = load
+
+        result = await data_source.aload_file_payload("file1.txt file2.txt file3.txt")
+
+        assert [f.name for f in result] == ["file1.txt", "file2.txt", "file3.txt"]
+
+    @patch.object(BenchmarkDataSource, "_load_single_file")
+    async def test_aload_file_payload_runs_in_parallel(self, mock_load_single_file, data_source):
+        """Test aload_file_payload loads files at the same time up to max_parallel"""
+        active = 0
+        max_active = 0
+        lock = threading.Lock()
+
+        def load(file_name):
+            nonlocal active, max_active
+            with lock:
+                active += 1
+                max_active = max(max_active, active)
+            time.sleep(0.05)
+            with lock:
+                active -= 1
+            return FileWithBytes(bytes=file_name, mime_type="text/plain", name=file_name)
+
+        mock_load_single_file.side_effect = load
+
+        await data_source.aload_file_payload(
+            ["file1.txt", "file2.txt", "file3.txt", "file4.txt"], max_parallel=2
+        )
+
+        assert max_active == 2
+
+    @patch.object(BenchmarkDataSource, "_load_single_file")
+    async def test_aload_file_payload_raises_first_error(self, mock_load_single_file, data_source):
+        """Test aload_file_payload raises the error of the first failing file in input order"""
+
+        def load(file_name):
+            if file_name == "file1.txt":
+                time.sleep(0.05)
+                raise FileNotFoundError("file1 not found")
+            raise ValueError("file2 error")
+
+        mock_load_single_file.side_effect = load
+
+        with pytest.raises(FileNotFoundError):
+            await data_source.aload_file_payload(["file1.txt", "file2.txt"])
+
+    @patch.object(BenchmarkDataSource, "_load_single_file")
+    async def test_aload_file_payload_unexpected_error(self, mock_load_single_file, data_source):
+        """Test aload_file_payload wraps unexpected errors in RuntimeError"""
+        mock_load_single_file.side_effect = KeyError("unexpected")
+
+        with pytest.raises(RuntimeError) as exc_info:
+            await data_source.aload_file_payload(["file.txt"])
+
+        assert "Unexpected error loading file payloads" in str(exc_info.value)
+
 
 class TestBenchmarkDataSourceIntegration:
     """Integration tests for BenchmarkDataSource with real HuggingFace API"""
@@ -545,3 +750,45 @@ class TestBenchmarkDataSourceIntegration:
             real_data_source._download("data/document/nonexistent_file_xyz123.txt")
 
         assert "not found" in str(exc_info.value).lower()
+
+
+class TestLocalDirectoryDataSource:
+    """Test cases for LocalDirectoryDataSource class"""
+
+    @pytest.fixture
+    def root_dir(self, tmp_path):
+        """Fixture for a local mirror of the dataset repository"""
+        document_dir = tmp_path / "data" / "document"
+        document_dir.mkdir(parents=True)
+        (document_dir / "test.txt").write_text("Hello, World!")
+        return tmp_path
+
+    def test_validate_access_success(self, root_dir):
+        """Test access validation of an existing mirror"""
+        # Should not raise any exception
+        LocalDirectoryDataSource(root_dir=str(root_dir)).validate_access()
+
+    def test_validate_access_missing_directory(self, tmp_path):
+        """Test access validation without data directory"""
+        with pytest.raises(ValueError) as exc_info:
+            LocalDirectoryDataSource(root_dir=str(tmp_path)).validate_access()
+
+        assert "Data directory not found" in str(exc_info.value)
+
+    def test_load_file_payload(self, root_dir):
+        """Test loading a file from the local mirror"""
+        ds = LocalDirectoryDataSource(root_dir=str(root_dir))
+
+        result = ds.load_file_payload(["test.txt"])
+
+        assert len(result) == 1
+        assert base64.b64decode(result[0].bytes).decode("utf-8") == "Hello, World!"
+        assert result[0].mime_type == "text/plain"
+        assert result[0].name == "test.txt"
+
+    def test_load_file_payload_missing_file(self, root_dir):
+        """Test loading a file missing from the local mirror"""
+        ds = LocalDirectoryDataSource(root_dir=str(root_dir))
+
+        with pytest.raises(FileNotFoundError):
+            ds.load_file_payload(["missing.txt"])
@@ -0,0 +1,69 @@
+"""
+Tests for payload_cache.py
+"""
+
+from a2a.types import FileWithBytes
+
+from fieldworkarena.agent.metrics.tasks.payload_cache import PayloadCache
+
+
+def make_payload(name: str, size: int) -> FileWithBytes:
+    return FileWithBytes(bytes="A" * size, mime_type="text/plain", name=name)
+
+
+def test_get_miss_and_hit():
+    """Test hits and misses are counted"""
+    cache = PayloadCache(max_bytes=100)
+    payload = make_payload("a.txt", 10)
+
+    assert cache.get("a") is None
+    cache.put("a", payload)
+    assert cache.get("a") is payload
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+    assert stats["current_bytes"] == 10
+
+
+def test_evicts_least_recently_used():
+    """Test the least recently used entry is evicted when the byte cap is exceeded"""
+    cache = PayloadCache(max_bytes=25)
+    cache.put("a", make_payload("a.txt", 10))
+    cache.put("b", make_payload("b.txt", 10))
+    cache.get("a")
+    cache.put("c", make_payload("c.txt", 10))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["current_bytes"] == 20
+
+
+def test_oversized_payload_is_not_cached():
+    """Test payloads larger than the byte cap are not cached"""
+    cache = PayloadCache(max_bytes=5)
+    cache.put("a", make_payload("a.txt", 10))
+
+    assert len(cache) == 0
+    assert cache.stats()["current_bytes"] == 0
+
+
+def test_put_replaces_existing_entry():
+    """Test putting an existing key replaces the entry without double counting"""
+    cache = PayloadCache(max_bytes=100)
+    cache.put("a", make_payload("a.txt", 10))
+    cache.put("a", make_payload("a.txt", 20))
+
+    assert len(cache) == 1
+    assert cache.stats()["current_bytes"] == 20
+
+
+def test_disabled_cache():
+    """Test max_bytes=0 disables the cache"""
+    cache = PayloadCache(max_bytes=0)
+    cache.put("a", make_payload("a.txt", 1))
+
+    assert cache.get("a") is None
@@ -0,0 +1,41 @@
+"""
+Tests for payload_store.py
+"""
+
+from fieldworkarena.agent.metrics.tasks.payload_store import (
+    PAYLOAD_STORE_VERSION,
+    EncodedPayloadStore,
+)
+
+
+def test_put_and_get(tmp_path):
+    """Test a stored payload is returned"""
+    store = EncodedPayloadStore(tmp_path)
+    store.put("abcdef", "SGVsbG8sIFdvcmxkIQ==")
+
+    assert store.get("abcdef") == "SGVsbG8sIFdvcmxkIQ=="
+    assert (tmp_path / f"v{PAYLOAD_STORE_VERSION}" / "ab" / "abcdef.b64").exists()
+    assert store.stats() == {"hits": 1, "misses": 0, "writes": 1}
+
+
+def test_get_missing_key(tmp_path):
+    """Test a missing entry returns None"""
+    store = EncodedPayloadStore(tmp_path)
+
+    assert store.get("missing") is None
+    assert store.stats()["misses"] == 1
+
+
+def test_get_empty_payload(tmp_path):
+    """Test an empty payload can be stored"""
+    store = EncodedPayloadStore(tmp_path)
+    store.put("empty", "")
+
+    assert store.get("empty") == ""
+
+
+def test_persists_across_instances(tmp_path):
+    """Test entries written by one instance are served by a new one"""
+    EncodedPayloadStore(tmp_path).put("abcdef", "QUJD")
+
+    assert EncodedPayloadStore(tmp_path).get("abcdef") == "QUJD"
@@ -0,0 +1,198 @@
+"""
+Tests for prefetcher.py
+"""
+
+import asyncio
+import threading
+from unittest.mock import Mock
+
+from a2a.types import FileWithBytes
+import pytest
+
+from fieldworkarena.agent.metrics.tasks.data_source import DataSource
+from fieldworkarena.agent.metrics.tasks.prefetcher import PayloadPrefetcher
+
+
+def make_payload(name: str, size: int) -> FileWithBytes:
+    return FileWithBytes(bytes="A" * size, mime_type="text/plain", name=name)
+
+
+class FakeDataSource(DataSource):
+    """DataSource delegating load_file_payload to a mock"""
+
+    def __init__(self):
+        self.load_file_payload = Mock()
+
+    def validate_access(self) -> None:
+        pass
+
+    def _load_base64(self, path: str) -> str:
+        return ""
+
+    def load_file_payload(self, file_name):
+        raise NotImplementedError
+
+
+class TestPayloadPrefetcher:
+    """Test cases for PayloadPrefetcher class"""
+
+    @pytest.fixture
+    def data_source(self):
+        """Fixture for a data source returning one 10-byte payload per file name"""
+        ds = FakeDataSource()
+        ds.load_file_payload.side_effect = lambda input_data: [
+            make_payload(name, 10) for name in input_data.split()
+        ]
+        return ds
+
+    async def test_get_returns_payloads_in_task_order(self, data_source):
+        """Test payloads are returned for the requested task position"""
+        input_data_list = ["a.txt", "b.txt c.txt", "d.txt"]
+
+        async with PayloadPrefetcher(data_source, input_data_list, max_tasks=3) as prefetcher:
+            for index, input_data in enumerate(input_data_list):
+                payloads = await prefetcher.get(index)
+                assert [p.name for p in payloads] == input_data.split()
+                await prefetcher.release(index)
+
+        assert data_source.load_file_payload.call_count == 3
+
+    async def test_get_raises_load_error(self, data_source):
+        """Test errors from the data source are raised to the consumer of the task"""
+        data_source.load_file_payload.side_effect = FileNotFoundError("File not found")
+
+        async with PayloadPrefetcher(data_source, ["missing.txt"]) as prefetcher:
+            with pytest.raises(FileNotFoundError):
+                await prefetcher.get(0)
+
+    async def test_max_tasks_limits_held_payloads(self, data_source):
+        """Test no more than max_tasks payloads are scheduled before release"""
+        async with PayloadPrefetcher(
+            data_source, ["a.txt", "b.txt", "c.txt", "d.txt"], max_tasks=2
+        ) as prefetcher:
+            await prefetcher.get(0)
+            await prefetcher.get(1)
+            await asyncio.sleep(0.05)
+            assert data_source.load_file_payload.call_count == 2
+
+            await prefetcher.release(0)
+            await prefetcher.get(2)
+            assert data_source.load_file_payload.call_count == 3
+
+    async def test_max_bytes_limits_loaded_payloads(self, data_source):
+        """Test no load starts while the byte budget is used up"""
+        async with PayloadPrefetcher(
+            data_source, ["a.txt", "b.txt", "c.txt", "d.txt"], max_tasks=3, max_bytes=10
+        ) as prefetcher:
+            for index in range(3):
+                await prefetcher.get(index)
+            await asyncio.sleep(0.05)
+            assert prefetcher.loaded_bytes == 30
+            assert data_source.load_file_payload.call_count == 3
+
+            await prefetcher.release(0)
+            await asyncio.sleep(0.05)
+            assert data_source.load_file_payload.call_count == 3
+
+            await prefetcher.release(1)
+            await prefetcher.release(2)
+            await prefetcher.get(3)
+            assert prefetcher.loaded_bytes == 10
+
+    async def test_tasks_are_loaded_in_parallel(self, data_source):
+        """Test the loads of up to max_tasks tasks run at the same time"""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def load(input_data):
+            # fails unless the three loads wait at the barrier together
+            barrier.wait()
+            return [make_payload(input_data, 1)]
+
+        data_source.load_file_payload.side_effect = load
+
+        async with PayloadPrefetcher(
+            data_source, ["a.txt", "b.txt", "c.txt"], max_tasks=3
+        ) as prefetcher:
+            for index in range(3):
+                assert len(await prefetcher.get(index)) == 1
+
+    async def test_oversized_payload_does_not_stall(self, data_source):
+        """Test a single payload larger than the budget is still loaded"""
+        async with PayloadPrefetcher(data_source, ["a.txt", "b.txt"], max_bytes=1) as prefetcher:
+            for index in range(2):
+                payloads = await prefetcher.get(index)
+                assert len(payloads) == 1
+                await prefetcher.release(index)
+
+    async def test_loads_run_in_thread_pool(self, data_source):
+        """Test payloads are loaded outside of the event loop thread"""
+        loop_thread = threading.get_ident()
+        threads = []
+
+        def load(input_data):
+            threads.append(threading.get_ident())
+            return [make_payload(input_data, 1)]
+
+        data_source.load_file_payload.side_effect = load
+
+        async with PayloadPrefetcher(data_source, ["a.txt"]) as prefetcher:
+            await prefetcher.get(0)
+
+        assert threads and loop_thread not in threads
+
+    async def test_input_data_is_consumed_lazily(self, data_source):
+        """Test the input_data iterable is only read as far as the loads have started"""
+        consumed = []
+
+        def input_data_stream():
+            for input_data in ["a.txt", "b.txt", "c.txt", "d.txt"]:
+                consumed.append(input_data)
+                yield input_data
+
+        async with PayloadPrefetcher(data_source, input_data_stream(), max_tasks=2) as prefetcher:
+            await prefetcher.get(0)
+            await asyncio.sleep(0.05)
+            assert consumed == ["a.txt", "b.txt", "c.txt"]
+
+            for index in range(4):
+                await prefetcher.get(index)
+                await prefetcher.release(index)
+            assert consumed == ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+    async def test_get_past_the_end_raises(self, data_source):
+        """Test waiting for a task past the end of the input_data raises IndexError"""
+        async with PayloadPrefetcher(data_source, iter(["a.txt"])) as prefetcher:
+            with pytest.raises(IndexError):
+                await prefetcher.get(1)
+
+    async def test_input_data_error_is_raised_to_pending_and_later_gets(self, data_source):
+        """Test an error of the input_data iterable fails the tasks it did not reach"""
+
+        def input_data_stream():
+            yield "a.txt"
+            yield "b.txt"
+            raise ValueError("Broken task list")
+
+        async with PayloadPrefetcher(data_source, input_data_stream(), max_tasks=1) as prefetcher:
+            pending = asyncio.create_task(prefetcher.get(2))
+            assert [p.name for p in await prefetcher.get(0)] == ["a.txt"]
+            await prefetcher.release(0)
+            assert [p.name for p in await prefetcher.get(1)] == ["b.txt"]
+            await prefetcher.release(1)
+
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(pending, timeout=1)
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(prefetcher.get(3), timeout=1)
+
+    async def test_get_after_release_raises(self, data_source):
+        """Test the payloads of a released task cannot be waited for"""
+        async with PayloadPrefetcher(data_source, ["a.txt", "b.txt"]) as prefetcher:
+            await prefetcher.get(0)
+            await prefetcher.release(0)
+            await prefetcher.release(1)
+
+            with pytest.raises(RuntimeError):
+                await prefetcher.get(0)
+            with pytest.raises(RuntimeError):
+                await prefetcher.get(1)
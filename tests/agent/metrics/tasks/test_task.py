@@ -0,0 +1,67 @@
+import dataclasses
+
+import pytest
+
+from fieldworkarena.agent.metrics.tasks.task import Task
+
+RAW_TASK = {
+    "id": "1.1.2001",
+    "input_data": "Cam001-Coffee1.mp4  Coffee_Maker_Cleaning_Manual.txt",
+    "output_format": "text",
+    "eval_func": "numerical_match",
+    "conversations": [
+        {"from": "human", "value": "What is the start time?"},
+        {"from": "gpt", "value": "The start time is 00:00:10."},
+    ],
+    "unused": "not retained",
+}
+
+
+def test_from_raw():
+    """Test a raw task is converted to a record with normalized files"""
+    task = Task.from_raw(RAW_TASK)
+
+    assert task.id == "1.1.2001"
+    assert task.files == ("Cam001-Coffee1.mp4", "Coffee_Maker_Cleaning_Manual.txt")
+    assert task.query == "What is the start time?"
+    assert task.answer == "The start time is 00:00:10."
+    assert task.output_format == "text"
+    assert task.eval_func == "numerical_match"
+
+
+def test_from_raw_list_input_data():
+    """Test the files of a V1 task are kept in order"""
+    task = Task.from_raw({"id": "1.1.0001", "input_data": ["a.mp4", "b.txt"]})
+
+    assert task.files == ("a.mp4", "b.txt")
+    assert task.query is None
+
+
+def test_record_is_compact_and_immutable():
+    """Test records have no instance dictionary and cannot be modified"""
+    task = Task.from_raw(RAW_TASK)
+
+    assert not hasattr(task, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        task.query = "modified"
+
+
+def test_eval_func_is_interned():
+    """Test records of different tasks share their eval_func string"""
+    eval_func = "".join(["numerical", "_match"])
+    task = Task.from_raw({**RAW_TASK, "eval_func": eval_func})
+
+    assert task.eval_func is Task.from_raw(RAW_TASK).eval_func
+
+
+def test_dict_round_trip():
+    """Test a record is restored from its dictionary"""
+    task = Task.from_raw(RAW_TASK)
+
+    assert Task.from_dict(task.to_dict()) == task
+
+
+def test_has_video():
+    """Test tasks with a video input file are recognized"""
+    assert Task.from_raw(RAW_TASK).has_video
+    assert not Task.from_raw({"id": "1.1.0001", "input_data": ["a.jpg", "b.TXT"]}).has_video
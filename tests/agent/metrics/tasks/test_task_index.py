@@ -0,0 +1,133 @@
+import json
+import os
+from pathlib import Path
+import shutil
+
+import pytest
+
+from fieldworkarena.agent.metrics.tasks.task_index import (
+    TaskIndex,
+    compute_tasks_hash,
+    default_index_path,
+    get_task_index,
+    open_task_index,
+)
+from fieldworkarena.agent.metrics.tasks.task_loader import TaskLoader
+
+# Get the fixtures directory path
+FIXTURES_DIR = Path(__file__).parent.parent.parent.parent / "fixtures"
+BENCHMARK_DIR = FIXTURES_DIR / "scenarios" / "fwa" / "benchmark"
+TASK_IDS_PATH = str(BENCHMARK_DIR / "all_task_ids.toml")
+
+
+@pytest.fixture
+def tasks_dir(tmp_path):
+    """Fixture for a copy of the fixture tasks directory"""
+    tasks_dir = tmp_path / "group2"
+    shutil.copytree(BENCHMARK_DIR / "tasks" / "group2", tasks_dir)
+    return tasks_dir
+
+
+def test_default_index_path(tasks_dir):
+    """Test the index is stored next to the tasks directory"""
+    assert default_index_path(tasks_dir) == tasks_dir.parent / "group2.index.json"
+
+
+def test_build_compact_records(tasks_dir):
+    """Test the index holds the compact record of every task"""
+    index = TaskIndex.build(tasks_dir)
+
+    record = index.get("1.1.0001")
+    assert record.files == ("West5_G210_HANKUMI.mp4",)
+    assert record.query.startswith("In this video, please indicate the start and end times")
+    assert record.answer.startswith("The detected equipment assembly work cycle")
+    assert record.eval_func == "numerical_match"
+    assert "missing" not in index
+
+
+def test_lookup_in_file_order(tasks_dir):
+    """Test lookup returns the tasks in the order of the task files, ignoring unknown ids"""
+    index = TaskIndex.build(tasks_dir)
+
+    records = index.lookup(["2.1.0001", "1.1.0001", "missing", "1.1.0001"])
+
+    assert [record.id for record in records] == ["1.1.0001", "2.1.0001"]
+
+
+def test_open_writes_and_reuses_index(tasks_dir, monkeypatch):
+    """Test the index file is written once and then loaded without parsing the task files"""
+    index = open_task_index(tasks_dir)
+    index_path = default_index_path(tasks_dir)
+    assert index_path.exists()
+
+    monkeypatch.setattr(TaskIndex, "build", classmethod(lambda cls, tasks_dir: pytest.fail()))
+    reopened = open_task_index(tasks_dir)
+
+    assert reopened.records == index.records
+    assert reopened.tasks_hash == compute_tasks_hash(tasks_dir)
+
+
+def test_open_rebuilds_stale_index(tasks_dir):
+    """Test the index is rebuilt when a task file changes"""
+    open_task_index(tasks_dir)
+
+    task_file = sorted(tasks_dir.glob("*.json"))[0]
+    tasks = json.loads(task_file.read_text(encoding="utf-8"))
+    tasks[0]["eval_func"] = "exact_match"
+    task_file.write_text(json.dumps(tasks), encoding="utf-8")
+    index = open_task_index(tasks_dir)
+
+    assert index.get(tasks[0]["id"]).eval_func == "exact_match"
+    assert TaskIndex.load(default_index_path(tasks_dir)).tasks_hash == index.tasks_hash
+
+
+def test_open_ignores_corrupt_index(tasks_dir):
+    """Test a corrupt index file is rebuilt"""
+    default_index_path(tasks_dir).write_text("{not json", encoding="utf-8")
+
+    index = open_task_index(tasks_dir)
+
+    assert "1.1.0001" in index
+
+
+def test_open_nonexistent_tasks_dir(tmp_path):
+    """Test opening the index of a non-existent tasks directory raises FileNotFoundError"""
+    with pytest.raises(FileNotFoundError):
+        open_task_index(tmp_path / "not_exist")
+
+
+def test_get_task_index_is_opened_once(tasks_dir):
+    """Test the index of a tasks directory is shared within the process"""
+    assert get_task_index(tasks_dir) is get_task_index(tasks_dir)
+
+
+def test_get_task_index_reopens_changed_tasks(tasks_dir):
+    """Test the index of a tasks directory is opened again when a task file changes"""
+    index = get_task_index(tasks_dir)
+
+    task_file = sorted(tasks_dir.glob("*.json"))[0]
+    tasks = json.loads(task_file.read_text(encoding="utf-8"))
+    tasks[0]["eval_func"] = "exact_match"
+    task_file.write_text(json.dumps(tasks), encoding="utf-8")
+    stat = task_file.stat()
+    os.utime(task_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    reopened = get_task_index(tasks_dir)
+
+    assert reopened is not index
+    assert reopened.get(tasks[0]["id"]).eval_func == "exact_match"
+    assert get_task_index(tasks_dir) is reopened
+
+
+def test_extract_tasks_matches_task_files(tasks_dir, tmp_path):
+    """Test extract_tasks from the index returns the same tasks as scanning the task files"""
+    loader = TaskLoader(
+        tasks_dir=str(tasks_dir),
+        ids_path=TASK_IDS_PATH,
+        index_path=str(tmp_path / "index.json"),
+    )
+
+    result = loader.extract_tasks("all")
+
+    expected_ids = [task["id"] for task in loader.load_tasks_by_ids("all")]
+    assert [task.id for task in result] == expected_ids
+    assert (tmp_path / "index.json").exists()
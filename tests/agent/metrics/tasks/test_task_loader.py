@@ -1,8 +1,12 @@
+import os
 from pathlib import Path
+import shutil
+import tomllib
 
 import pytest
 
-from fieldworkarena.agent.metrics.tasks.task_loader import TaskLoader, build_goal
+from fieldworkarena.agent.metrics.tasks.task import Task
+from fieldworkarena.agent.metrics.tasks.task_loader import TaskLoader, build_goal, get_task_loader
 
 # Get the fixtures directory path
 FIXTURES_DIR = Path(__file__).parent.parent.parent.parent / "fixtures"
@@ -12,6 +16,18 @@ TASK_IDS_PATH = str(BENCHMARK_DIR / "all_task_ids.toml")
 TASKS_DIR = str(BENCHMARK_DIR / "tasks" / "group2")
 
 
+def make_task(query: str, input_data, output_format: str) -> Task:
+    """Build the Task record of a raw task with the given fields"""
+    return Task.from_raw(
+        {
+            "id": "0.0.0000",
+            "input_data": input_data,
+            "output_format": output_format,
+            "conversations": [{"from": "human", "value": query}],
+        }
+    )
+
+
 def test_load_task_ids_factory():
     """Test loading factory task IDs"""
     loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
@@ -77,18 +93,18 @@ def test_extract_tasks_factory():
 
     # Check first task
     task = result[0]
-    assert task["id"] == "1.1.0001"
-    assert task["input_data"] == ["West5_G210_HANKUMI.mp4"]
+    assert task.id == "1.1.0001"
+    assert task.files == ("West5_G210_HANKUMI.mp4",)
     assert (
-        task["query"]
+        task.query
         == "In this video, please indicate the start and end times of the equipment assembly work cycle. This cycle is from when the worker starts working at the work desk to when the worker completes the work and leaves the work desk."
     )
     assert (
-        task["answer"]
+        task.answer
         == "The detected equipment assembly work cycle start and end times are from 00: 00:03:53 to 00:09:00."
     )
-    assert task["output_format"] == "text"
-    assert task["eval_func"] == "numerical_match"
+    assert task.output_format == "text"
+    assert task.eval_func == "numerical_match"
 
 
 def test_extract_tasks_warehouse():
@@ -99,17 +115,17 @@ def test_extract_tasks_warehouse():
 
     # Check first task
     task = result[0]
-    assert task["id"] == "1.1.0033"
-    assert task["input_data"] == ["Table_2_in_English.pdf"]
+    assert task.id == "1.1.0033"
+    assert task.files == ("Table_2_in_English.pdf",)
     assert (
-        task["query"]
+        task.query
         == 'In this PDF file, please extract and complete the precaution for "Man-powered Transportation Work."'
     )
     assert (
-        task["answer"]
+        task.answer
         == "The following are cautionary notes for manual transportation work.  ①Do not repeatedly hold or move, or repeat the intermediate step. ②To reduce or reduce movement from bottom to top and from top to bottom. ③Do not handle the product below 0cm above the floor or above the chest. ④Do not work while moving backwards. ⑤Don't swing long things around. ⑥When handling hazardous and hazardous materials, we shall strictly observe the precautions concerning these matters. ⑦Consider the weight of the baggage and handle the baggage that is too much for your own power more than others. ⑧Hands should be held for as little time as possible. ⑨Orient correctly (facing straight), lightly bend knees, lower back, straight back and hold firmly."
     )
-    assert task["eval_func"] == "fuzzy_match"
+    assert task.eval_func == "fuzzy_match"
 
 
 def test_extract_tasks_retail():
@@ -119,16 +135,14 @@ def test_extract_tasks_retail():
     assert len(result) == 2
 
     task = result[0]
-    assert task["id"] == "1.1.2001"
-    assert task["input_data"] == "Cam001-Coffee1.mp4  Coffee_Maker_Cleaning_Manual.txt"
+    assert task.id == "1.1.2001"
+    assert task.files == ("Cam001-Coffee1.mp4", "Coffee_Maker_Cleaning_Manual.txt")
     assert (
-        task["query"]
+        task.query
         == 'In this video, what is the start time and what is the end time of CoffeeMaker Cleaning. The start and end times must be output from the time of the movie itself. The procudeure is in "Coffee_Maker_Cleaning_Manual.txt". If the specified work is not found in the video, report as "No specified motion".'
     )
-    assert (
-        task["answer"] == "The specified motion start and end times are from 00:00:10 to 00:02:36."
-    )
-    assert task["eval_func"] == "numerical_match"
+    assert task.answer == "The specified motion start and end times are from 00:00:10 to 00:02:36."
+    assert task.eval_func == "numerical_match"
 
 
 def test_extract_tasks_all():
@@ -138,7 +152,7 @@ def test_extract_tasks_all():
     assert len(result) == 8  # 3 factory + 3 warehouse + 2 retail
 
     # Check all task IDs are present
-    task_ids = [task["id"] for task in result]
+    task_ids = [task.id for task in result]
     assert "1.1.0001" in task_ids
     assert "1.1.0023" in task_ids
     assert "1.1.0031" in task_ids
@@ -155,19 +169,75 @@ def test_extract_tasks_with_multiple_input_data():
     result = loader.extract_tasks("factory")
 
     # Find task with multiple input files
-    task_with_multiple_inputs = [t for t in result if t["id"] == "1.1.0023"][0]
-    assert len(task_with_multiple_inputs["input_data"]) == 2
-    assert "West5_Checkmask_4_00h24m00s_00h34m34s.mp4" in task_with_multiple_inputs["input_data"]
-    assert "7_MaskCheck_RouterAssembly.txt" in task_with_multiple_inputs["input_data"]
+    task_with_multiple_inputs = [t for t in result if t.id == "1.1.0023"][0]
+    assert len(task_with_multiple_inputs.files) == 2
+    assert "West5_Checkmask_4_00h24m00s_00h34m34s.mp4" in task_with_multiple_inputs.files
+    assert "7_MaskCheck_RouterAssembly.txt" in task_with_multiple_inputs.files
+
+
+def test_iter_tasks_is_lazy_and_ordered():
+    """Test iter_tasks yields the tasks of extract_tasks one at a time"""
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+
+    tasks = loader.iter_tasks("all")
+
+    assert not isinstance(tasks, list)
+    assert next(tasks).id == "1.1.0001"
+    assert [task.id for task in loader.iter_tasks("all")] == [
+        task.id for task in loader.extract_tasks("all")
+    ]
+    assert loader.count_tasks("all") == 8
+
+
+def test_iter_tasks_nonexistent_target_raises_immediately():
+    """Test iter_tasks raises KeyError before iteration for a non-existent target"""
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+    with pytest.raises(KeyError):
+        loader.iter_tasks("not_exist")
+
+
+def test_load_task_ids_reuses_parsed_toml(monkeypatch):
+    """Test the TOML file is parsed once while it does not change"""
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+    loader.load_task_ids("factory")
+
+    monkeypatch.setattr(tomllib, "load", lambda f: pytest.fail("TOML file parsed again"))
+    ids = loader.load_task_ids("factory")
+    ids.append("modified")
+
+    assert loader.load_task_ids("factory") == ids[:-1]
+
+
+def test_load_task_ids_reloads_changed_toml(tmp_path):
+    """Test the TOML file is parsed again when it changes"""
+    ids_path = tmp_path / "all_task_ids.toml"
+    shutil.copy(TASK_IDS_PATH, ids_path)
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=str(ids_path))
+    assert len(loader.load_task_ids("retail")) == 2
+
+    ids_path.write_text('retail = ["fieldworkarena.1.1.2001"]\n', encoding="utf-8")
+    stat = ids_path.stat()
+    os.utime(ids_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert loader.load_task_ids("retail") == ["fieldworkarena.1.1.2001"]
+
+
+def test_get_task_loader_is_shared():
+    """Test the same loader is returned for the same files"""
+    loader = get_task_loader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+
+    assert get_task_loader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH) is loader
+    other_ids_path = str(BENCHMARK_DIR / "all_task_ids_copy.toml")
+    assert get_task_loader(tasks_dir=TASKS_DIR, ids_path=other_ids_path) is not loader
 
 
 def test_build_goal_with_list_input_data():
     """Test building goal with list input_data (V1 format)"""
-    task = {
-        "query": "What is the start time?",
-        "input_data": ["test_video_1.mp4", "data.txt"],
-        "output_format": "text",
-    }
+    task = make_task(
+        query="What is the start time?",
+        input_data=["test_video_1.mp4", "data.txt"],
+        output_format="text",
+    )
 
     result = build_goal(task)
 
@@ -183,11 +253,11 @@ def test_build_goal_with_list_input_data():
 
 def test_build_goal_with_string_input_data():
     """Test building goal with string input_data (V2 format) - space-separated files"""
-    task = {
-        "query": "How many items are there?",
-        "input_data": "warehouse_items.csv warehouse_log.txt",
-        "output_format": "number",
-    }
+    task = make_task(
+        query="How many items are there?",
+        input_data="warehouse_items.csv warehouse_log.txt",
+        output_format="number",
+    )
 
     result = build_goal(task)
 
@@ -203,11 +273,11 @@ def test_build_goal_with_string_input_data():
 
 def test_build_goal_with_single_input():
     """Test building goal with single input_data in list"""
-    task = {
-        "query": "What is the quality score?",
-        "input_data": ["retail_video_1.mp4"],
-        "output_format": "text",
-    }
+    task = make_task(
+        query="What is the quality score?",
+        input_data=["retail_video_1.mp4"],
+        output_format="text",
+    )
 
     result = build_goal(task)
 
@@ -221,7 +291,7 @@ def test_build_goal_with_single_input():
 
 def test_build_goal_with_empty_input_data():
     """Test building goal with empty input_data list"""
-    task = {"query": "General question?", "input_data": [], "output_format": "text"}
+    task = make_task(query="General question?", input_data=[], output_format="text")
 
     result = build_goal(task)
 
@@ -235,11 +305,11 @@ def test_build_goal_with_empty_input_data():
 
 def test_build_goal_with_multiple_string_files():
     """Test building goal with multiple space-separated files in string format"""
-    task = {
-        "query": "Analyze the coffee machine cleaning process",
-        "input_data": "Cam001-Coffee1.mp4  Coffee_Maker_Cleaning_Manual.txt",
-        "output_format": "text",
-    }
+    task = make_task(
+        query="Analyze the coffee machine cleaning process",
+        input_data="Cam001-Coffee1.mp4  Coffee_Maker_Cleaning_Manual.txt",
+        output_format="text",
+    )
 
     result = build_goal(task)
 
@@ -0,0 +1,37 @@
+"""
+Tests for prefetch_data.py
+"""
+
+from pathlib import Path
+
+from fieldworkarena.agent.metrics.tasks import TaskLoader
+from fieldworkarena.agent.prefetch_data import collect_repo_paths
+
+# Get the fixtures directory path
+BENCHMARK_DIR = Path(__file__).parent.parent / "fixtures" / "scenarios" / "fwa" / "benchmark"
+TASK_IDS_PATH = str(BENCHMARK_DIR / "all_task_ids.toml")
+TASKS_DIR = str(BENCHMARK_DIR / "tasks" / "group2")
+
+
+def test_collect_repo_paths_factory():
+    """Test collecting repository paths of factory tasks"""
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+
+    assert collect_repo_paths(loader, "factory") == [
+        "data/document/7_MaskCheck_RouterAssembly.txt",
+        "data/document/English_FQ510-050_Handa_Tank_Cleaning.pdf",
+        "data/movie/West5_Checkmask_4_00h24m00s_00h34m34s.mp4",
+        "data/movie/West5_G210_HANKUMI.mp4",
+    ]
+
+
+def test_collect_repo_paths_string_input_data():
+    """Test collecting repository paths of V2 tasks with space-separated input data"""
+    loader = TaskLoader(tasks_dir=TASKS_DIR, ids_path=TASK_IDS_PATH)
+
+    repo_paths = collect_repo_paths(loader, "retail")
+
+    assert "data/movie/Cam001-Coffee1.mp4" in repo_paths
+    assert "data/document/Coffee_Maker_Cleaning_Manual.txt" in repo_paths
+    assert "data/image/uniform(front-shot).jpg" in repo_paths
+    assert len(repo_paths) == len(set(repo_paths))
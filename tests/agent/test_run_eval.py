@@ -0,0 +1,207 @@
+"""
+Tests for FWAGreenAgent.run_eval with fake Purple Agents and a fake data source
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+from a2a.types import FileWithBytes
+import pytest
+
+from fieldworkarena.agent.fwa_green_agent import FWAGreenAgent
+from fieldworkarena.agent.metrics.tasks import Task
+from fieldworkarena.agent.metrics.tasks.data_source import DataSource, normalize_file_names
+from fieldworkarena.agent.metrics.tasks.payload_cache import PayloadCache
+from fieldworkarena.agent_core.models import EvalRequest
+
+AGENT_MODULE = "fieldworkarena.agent.fwa_green_agent"
+PRIMARY_URL = "http://127.0.0.1:9019/"
+REPLICA_URL = "http://127.0.0.1:9020/"
+
+
+def make_task(number: int, files: str = "manual.txt") -> Task:
+    return Task.from_raw(
+        {
+            "id": f"1.1.{number:04d}",
+            "input_data": files,
+            "output_format": "text",
+            "eval_func": "fuzzy_match",
+            "conversations": [
+                {"from": "human", "value": f"question {number}"},
+                {"from": "gpt", "value": f"answer {number}"},
+            ],
+        }
+    )
+
+
+class FakeTaskLoader:
+    """Yields the tasks lazily, as TaskLoader.iter_tasks does"""
+
+    def __init__(self, tasks: list[Task]):
+        self.tasks = tasks
+
+    def iter_tasks(self, target: str):
+        yield from self.tasks
+
+    def count_tasks(self, target: str) -> int:
+        return len(self.tasks)
+
+
+class FakeDataSource(DataSource):
+    """Returns one small payload per file name of a task"""
+
+    def __init__(self):
+        self.payload_cache = PayloadCache()
+        self.payload_store = None
+        self.jpeg_stats = {}
+
+    def validate_access(self) -> None:
+        pass
+
+    def _load_base64(self, path: str) -> str:
+        return ""
+
+    def load_file_payload(self, input_data) -> list[FileWithBytes]:
+        return [
+            FileWithBytes(bytes="QQ==", mime_type="text/plain", name=name)
+            for name in normalize_file_names(input_data)
+        ]
+
+
+class FakePurpleAgents:
+    """Replaces PurpleClient: answers question N with "answer N" after a scripted delay"""
+
+    def __init__(self, delays: dict[int, float] | None = None, failing: set[int] = frozenset()):
+        self.delays = delays or {}
+        self.failing = failing
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls: list[tuple[int, str, list[str]]] = []
+        self.client_kwargs: list[dict] = []
+
+    def __call__(self, **kwargs) -> "FakePurpleAgents.Client":
+        self.client_kwargs.append(kwargs)
+        return self.Client(self)
+
+    class Client:
+        def __init__(self, agents: "FakePurpleAgents"):
+            self.agents = agents
+            self.timings = []
+            self.stats = {"retries": 0, "hedged": 0, "hedge_wins": 0}
+
+        async def send_message(self, message, file_payloads, url, **kwargs) -> str:
+            agents = self.agents
+            number = int(message.split("question ")[1].split()[0])
+            agents.calls.append((number, url, [payload.name for payload in file_payloads]))
+            agents.in_flight += 1
+            agents.max_in_flight = max(agents.max_in_flight, agents.in_flight)
+            try:
+                await asyncio.sleep(agents.delays.get(number, 0.01))
+            finally:
+                agents.in_flight -= 1
+            if number in agents.failing:
+                raise RuntimeError(f"{url} failed")
+            self.timings.append({"ttft": 0.0, "latency": 0.0})
+            return f"answer {number}"
+
+
+async def run_eval(agent: FWAGreenAgent, tasks: list[Task], fake: FakePurpleAgents, **config):
+    """Run an evaluation and return its EvalResult as a dictionary"""
+    request = EvalRequest(
+        participants={"agent": config.pop("participants", PRIMARY_URL)},
+        config={"target": "factory", **config},
+    )
+    updater = Mock(update_status=AsyncMock(), add_artifact=AsyncMock())
+    with (
+        patch(f"{AGENT_MODULE}.get_task_loader", return_value=FakeTaskLoader(tasks)),
+        patch(f"{AGENT_MODULE}.PurpleClient", fake),
+    ):
+        await agent.run_eval(request, updater)
+    return json.loads(updater.add_artifact.call_args.kwargs["parts"][0].root.text)
+
+
+@pytest.fixture
+def agent():
+    agent = FWAGreenAgent()
+    agent._data_source = FakeDataSource()
+    return agent
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+async def test_results_follow_task_order(agent, concurrency):
+    """Test results are reported in task order whatever the completion order"""
+    tasks = [make_task(number) for number in range(6)]
+    # earlier tasks take longer, so concurrent tasks complete in reverse order
+    fake = FakePurpleAgents(delays={number: 0.06 - 0.01 * number for number in range(6)})
+
+    result = await run_eval(agent, tasks, fake, concurrency=concurrency)
+
+    assert [r["task_id"] for r in result["task_results"]] == [task.id for task in tasks]
+    assert result["total_score"] == 6.0
+    assert fake.max_in_flight == concurrency
+
+
+async def test_failing_task_does_not_abort_the_others(agent):
+    """Test a task whose agent fails scores 0 while the other tasks are evaluated"""
+    tasks = [make_task(number) for number in range(4)]
+    fake = FakePurpleAgents(failing={1})
+
+    result = await run_eval(agent, tasks, fake, concurrency=2, max_retries=0)
+
+    assert [r["score"] for r in result["task_results"]] == [1.0, 0.0, 1.0, 1.0]
+    assert "failed" in result["task_results"][1]["error"]
+    assert result["total_tasks"] == 4
+
+
+async def test_payloads_and_deadlines_per_task(agent):
+    """Test each task receives its own payloads and the deadline of its kind"""
+    tasks = [make_task(0, "manual.txt"), make_task(1, "video.mp4 manual.txt")]
+    fake = FakePurpleAgents()
+
+    await run_eval(agent, tasks, fake, concurrency=2, video_deadline=600, text_deadline=60)
+
+    assert sorted((number, files) for number, _, files in fake.calls) == [
+        (0, ["manual.txt"]),
+        (1, ["video.mp4", "manual.txt"]),
+    ]
+    assert sorted(kwargs["deadline"] for kwargs in fake.client_kwargs) == [60, 600]
+
+
+async def test_tasks_are_distributed_across_replicas(agent):
+    """Test concurrent tasks are spread across replicas and their outcomes are recorded"""
+    tasks = [make_task(number) for number in range(4)]
+    fake = FakePurpleAgents(delays=dict.fromkeys(range(4), 0.05), failing={3})
+
+    result = await run_eval(
+        agent, tasks, fake, concurrency=2, max_retries=0, participants=[PRIMARY_URL, REPLICA_URL]
+    )
+
+    urls = [url for _, url, _ in fake.calls]
+    assert urls.count(PRIMARY_URL) == urls.count(REPLICA_URL) == 2
+    stats = result["replica_stats"]["agent"]
+    assert stats[PRIMARY_URL]["requests"] == stats[REPLICA_URL]["requests"] == 2
+    assert stats[PRIMARY_URL]["failures"] + stats[REPLICA_URL]["failures"] == 1
+
+
+async def test_judge_stats_are_per_evaluation(agent):
+    """Test the judge stats of an evaluation do not include earlier evaluations"""
+    tasks = [make_task(number) for number in range(3)]
+
+    first = await run_eval(agent, tasks, FakePurpleAgents())
+    second = await run_eval(agent, tasks, FakePurpleAgents())
+
+    assert first["judge_stats"] == second["judge_stats"] == {"pre_judged": 3, "llm": 0}
+
+
+@pytest.mark.parametrize("eval_func", ["json_match", "numerical_match"])
+async def test_judge_stats_count_every_llm_judgement(agent, eval_func):
+    """Test the json_match and numerical_match judgements are counted as LLM calls"""
+    judge_stats = {"pre_judged": 0, "llm": 0}
+    judge_fn = AsyncMock(return_value=(1.0, None))
+
+    with patch(f"{AGENT_MODULE}.auto_eval.a{eval_func}", judge_fn):
+        await agent.judge("question", "answer", "answer", eval_func, judge_stats=judge_stats)
+
+    judge_fn.assert_awaited_once()
+    assert judge_stats == {"pre_judged": 0, "llm": 1}
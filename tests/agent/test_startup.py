@@ -0,0 +1,50 @@
+"""
+Startup tests for the green agent.
+
+Importing the green agent must not load the judge dependencies (openai, nltk) nor need
+OPENAI_API_KEY or network access, so that fwa-server starts fast, also offline.
+"""
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+# fwa-server --help must finish within this many seconds
+STARTUP_BUDGET_SECONDS = float(os.getenv("FWA_STARTUP_BUDGET_SECONDS", "5.0"))
+
+
+def run_python(cwd: Path, *args: str) -> tuple[subprocess.CompletedProcess, float]:
+    # the green agent writes its log file to the working directory
+    env = {k: v for k, v in os.environ.items() if k != "OPENAI_API_KEY"}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, cwd=cwd, timeout=60
+    )
+    return result, time.perf_counter() - start
+
+
+def test_import_does_not_load_judge_dependencies(tmp_path):
+    """Test importing the green agent loads neither openai nor nltk"""
+    result, _ = run_python(
+        tmp_path,
+        "-c",
+        "import sys; import fieldworkarena.agent.fwa_green_agent; "
+        "print(sorted(m for m in ('nltk', 'openai') if m in sys.modules))",
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "[]"
+
+
+def test_help_starts_within_budget(tmp_path):
+    """Test fwa-server --help runs without OPENAI_API_KEY within the startup budget"""
+    # warm up the bytecode cache so the measurement is the import cost only
+    run_python(tmp_path, "-m", "fieldworkarena.agent.fwa_green_agent", "--help")
+
+    result, elapsed = run_python(tmp_path, "-m", "fieldworkarena.agent.fwa_green_agent", "--help")
+
+    assert result.returncode == 0, result.stderr
+    assert "usage" in result.stdout
+    assert elapsed < STARTUP_BUDGET_SECONDS, f"fwa-server --help took {elapsed:.2f}s"
@@ -0,0 +1,327 @@
+"""
+Tests for client_utils.py
+"""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, Mock, patch
+
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    Artifact,
+    Part,
+    Role,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+import httpx
+import pytest
+
+from fieldworkarena.agent_core.client_utils import (
+    A2AClientRegistry,
+    ResponseAssembler,
+    create_message,
+    send_message,
+)
+from fieldworkarena.agent_core.compression import compression_extension
+from fieldworkarena.agent_core.purple_client import PurpleClient
+
+BASE_URL = "http://127.0.0.1:9019"
+
+
+@pytest.fixture
+def agent_card():
+    return AgentCard(
+        name="Test Purple Agent",
+        description="Test Purple Agent",
+        url=BASE_URL,
+        version="1.0.0",
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[],
+    )
+
+
+@pytest.fixture
+def mock_resolver(agent_card):
+    with patch("fieldworkarena.agent_core.client_utils.A2ACardResolver") as mock_resolver_cls:
+        mock_resolver_cls.return_value.get_agent_card = AsyncMock(return_value=agent_card)
+        yield mock_resolver_cls
+
+
+async def test_get_client_is_reused(mock_resolver):
+    """Test the client and agent card are reused across calls"""
+    registry = A2AClientRegistry()
+    try:
+        first = await registry.get_client(BASE_URL)
+        second = await registry.get_client(BASE_URL)
+
+        assert first is second
+        assert mock_resolver.return_value.get_agent_card.await_count == 1
+        assert len(registry._httpx_clients) == 1
+    finally:
+        await registry.aclose()
+
+
+async def test_get_client_with_consumer_is_not_shared(mock_resolver):
+    """Test clients with a consumer are created per call on the pooled connection"""
+    registry = A2AClientRegistry()
+    try:
+        shared = await registry.get_client(BASE_URL)
+        with_consumer = await registry.get_client(BASE_URL, consumer=AsyncMock())
+
+        assert with_consumer is not shared
+        assert mock_resolver.return_value.get_agent_card.await_count == 1
+    finally:
+        await registry.aclose()
+
+
+async def test_agent_card_expires(mock_resolver):
+    """Test the agent card is fetched again after the TTL"""
+    registry = A2AClientRegistry(card_ttl=0)
+    try:
+        await registry.get_client(BASE_URL)
+        await registry.get_client(BASE_URL)
+
+        assert mock_resolver.return_value.get_agent_card.await_count == 2
+    finally:
+        await registry.aclose()
+
+
+async def test_invalidate_refetches_agent_card(mock_resolver):
+    """Test the agent card is fetched again after invalidation"""
+    registry = A2AClientRegistry()
+    try:
+        first = await registry.get_client(BASE_URL)
+        registry.invalidate(BASE_URL)
+        second = await registry.get_client(BASE_URL)
+
+        assert first is not second
+        assert mock_resolver.return_value.get_agent_card.await_count == 2
+    finally:
+        await registry.aclose()
+
+
+async def test_aclose_closes_connections(mock_resolver):
+    """Test aclose closes the pooled httpx clients"""
+    registry = A2AClientRegistry()
+    httpx_client = await registry.get_httpx_client(BASE_URL)
+
+    await registry.aclose()
+
+    assert httpx_client.is_closed
+    assert not registry._httpx_clients
+
+
+async def test_compression_negotiated_from_agent_card(mock_resolver, agent_card):
+    """Test request compression follows the compression extension of the agent card"""
+    agent_card.capabilities.extensions = [compression_extension()]
+    registry = A2AClientRegistry()
+    disabled = A2AClientRegistry(compression=False)
+    try:
+        await registry.get_client(BASE_URL)
+        await disabled.get_client(BASE_URL)
+
+        assert "gzip" in registry.compression_stats()[BASE_URL]["encodings"]
+        assert disabled.compression_stats()[BASE_URL]["encodings"] == []
+    finally:
+        await registry.aclose()
+        await disabled.aclose()
+
+
+async def test_send_message_invalidates_on_error(mock_resolver):
+    """Test a communication error drops the cached client and agent card"""
+    registry = A2AClientRegistry()
+    try:
+        client = await registry.get_client(BASE_URL)
+        with patch.object(client, "send_message", Mock(side_effect=ConnectionError("refused"))):
+            with pytest.raises(RuntimeError):
+                await send_message("hello", BASE_URL, registry=registry)
+
+        assert BASE_URL not in registry._cards
+        assert await registry.get_client(BASE_URL) is not client
+    finally:
+        await registry.aclose()
+
+
+def make_task(state: TaskState, text: str | None = None, artifacts: list[Artifact] | None = None):
+    message = create_message(text=text, context_id="ctx") if text is not None else None
+    return Task(
+        id="task",
+        context_id="ctx",
+        status=TaskStatus(state=state, message=message),
+        artifacts=artifacts,
+    )
+
+
+def make_artifact(text: str, artifact_id: str = "answer") -> Artifact:
+    return Artifact(artifact_id=artifact_id, parts=[Part(TextPart(text=text))])
+
+
+def streamed_events():
+    """Events of a streamed response: a progress status, two chunks of an artifact and the end"""
+    task = make_task(TaskState.working)
+    return [
+        (task, None),
+        (
+            task,
+            TaskStatusUpdateEvent(
+                task_id="task",
+                context_id="ctx",
+                status=TaskStatus(
+                    state=TaskState.working, message=create_message(text="watching the video")
+                ),
+                final=False,
+            ),
+        ),
+        (
+            task,
+            TaskArtifactUpdateEvent(
+                task_id="task", context_id="ctx", artifact=make_artifact("The start ")
+            ),
+        ),
+        (
+            task,
+            TaskArtifactUpdateEvent(
+                task_id="task",
+                context_id="ctx",
+                artifact=make_artifact("time is 00:00:10."),
+                append=True,
+            ),
+        ),
+        (
+            task,
+            TaskStatusUpdateEvent(
+                task_id="task",
+                context_id="ctx",
+                status=TaskStatus(state=TaskState.completed),
+                final=True,
+            ),
+        ),
+    ]
+
+
+def test_assembler_task_response():
+    """Test the response of a non-streamed task is its status message and artifacts"""
+    task = make_task(
+        TaskState.completed, "Answer:\n", [make_artifact("first"), make_artifact("second", "b")]
+    )
+    assembler = ResponseAssembler()
+    assembler.add((task, None))
+
+    outputs = assembler.finish()
+
+    assert outputs["response"] == "Answer:\nfirstsecond"
+    assert outputs["status"] == "completed"
+    assert outputs["context_id"] == "ctx"
+    assert outputs["ttft"] <= outputs["latency"]
+
+
+def test_assembler_streamed_response():
+    """Test streamed artifact chunks are assembled and progress is reported"""
+    progress = []
+    assembler = ResponseAssembler(on_progress=progress.append)
+    for event in streamed_events():
+        assembler.add(event)
+
+    outputs = assembler.finish()
+
+    assert outputs["response"] == "The start \ntime is 00:00:10."
+    assert outputs["status"] == "completed"
+    assert progress == ["watching the video"]
+    assert outputs["ttft"] is not None
+
+
+def test_assembler_message_response():
+    """Test a message response is returned as is"""
+    assembler = ResponseAssembler()
+    assembler.add(create_message(text="hello", context_id="ctx"))
+
+    outputs = assembler.finish()
+
+    assert outputs["response"] == "hello"
+    assert outputs["context_id"] == "ctx"
+    assert "status" not in outputs
+
+
+async def test_send_message_streaming(mock_resolver):
+    """Test a streamed response is assembled from all events"""
+    registry = A2AClientRegistry()
+
+    async def stream(message, context=None):
+        for event in streamed_events():
+            yield event
+
+    try:
+        client = await registry.get_client(BASE_URL, streaming=True)
+        progress = []
+        with patch.object(client, "send_message", stream):
+            outputs = await send_message(
+                "hello", BASE_URL, streaming=True, registry=registry, on_progress=progress.append
+            )
+
+        assert outputs["response"] == "The start \ntime is 00:00:10."
+        assert progress == ["watching the video"]
+        assert outputs["latency"] >= outputs["ttft"]
+    finally:
+        await registry.aclose()
+
+
+class SlowTransport(httpx.AsyncBaseTransport):
+    """Responds after a delay, timing out like a real connection when the read timeout is shorter"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        read_timeout = request.extensions["timeout"]["read"]
+        if read_timeout is not None and read_timeout < self.delay:
+            await asyncio.sleep(read_timeout)
+            raise httpx.ReadTimeout("timed out", request=request)
+        await asyncio.sleep(self.delay)
+        rpc_request = json.loads(await request.aread())
+        message = create_message(role=Role.agent, text="done")
+        return httpx.Response(
+            200,
+            json={
+                "jsonrpc": "2.0",
+                "id": rpc_request["id"],
+                "result": message.model_dump(mode="json", exclude_none=True),
+            },
+        )
+
+
+@pytest.fixture
+def slow_agent(mock_resolver):
+    """Agent responding after longer than the timeout of the registry"""
+    registry = A2AClientRegistry(timeout=0.05, compression=False)
+    with patch(
+        "fieldworkarena.agent_core.client_utils.httpx.AsyncHTTPTransport",
+        return_value=SlowTransport(delay=0.2),
+    ):
+        yield registry
+
+
+async def test_read_timeout_without_deadline(slow_agent):
+    """Test a response slower than the registry timeout fails without a deadline"""
+    client = PurpleClient(registry=slow_agent, max_retries=0)
+    try:
+        with pytest.raises(RuntimeError, match="timed out"):
+            await client.send_message("hello", [], BASE_URL)
+    finally:
+        await slow_agent.aclose()
+
+
+async def test_deadline_replaces_read_timeout(slow_agent):
+    """Test a response slower than the registry timeout is received within the deadline"""
+    client = PurpleClient(registry=slow_agent, deadline=1.0, max_retries=0)
+    try:
+        assert await client.send_message("hello", [], BASE_URL) == "done"
+    finally:
+        await slow_agent.aclose()
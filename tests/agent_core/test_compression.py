@@ -0,0 +1,175 @@
+"""
+Tests for compression.py
+"""
+
+import base64
+import gzip
+import os
+
+from a2a.types import AgentCapabilities, AgentCard, FileWithBytes
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from fieldworkarena.agent_core.compression import (
+    CompressingTransport,
+    CompressionPolicy,
+    DecompressionMiddleware,
+    compress,
+    compression_extension,
+    decompress,
+    negotiate_encodings,
+    payload_mix,
+)
+from fieldworkarena.agent_core.streamed_payload import StreamedFileWithBytes
+
+REMOTE_HOST = "purple.example.com"
+
+
+def make_card(extensions=None) -> AgentCard:
+    return AgentCard(
+        name="Test Purple Agent",
+        description="Test Purple Agent",
+        url="http://127.0.0.1:9019",
+        version="1.0.0",
+        default_input_modes=["text"],
+        default_output_modes=["text"],
+        capabilities=AgentCapabilities(extensions=extensions),
+        skills=[],
+    )
+
+
+def make_policy(host: str = REMOTE_HOST) -> CompressionPolicy:
+    policy = CompressionPolicy(host)
+    policy.encodings = ["gzip"]
+    return policy
+
+
+def test_negotiate_encodings():
+    """Test the encodings are taken from the compression extension of the agent card"""
+    assert "gzip" in negotiate_encodings(make_card([compression_extension()]))
+    assert negotiate_encodings(make_card()) == []
+
+
+def test_round_trip():
+    """Test compressed data is restored and oversized or corrupt data is rejected"""
+    data = b'{"text": "' + b"field work " * 1000 + b'"}'
+    compressed = compress(data, "gzip")
+
+    assert decompress(compressed, "gzip") == data
+    with pytest.raises(ValueError):
+        decompress(compressed, "gzip", max_size=100)
+    with pytest.raises(ValueError):
+        decompress(compressed[:-20], "gzip")
+    with pytest.raises(ValueError):
+        decompress(b"not gzip", "gzip")
+
+
+def test_policy_compresses_text_on_remote_links():
+    """Test text requests to remote agents are compressed"""
+    assert make_policy().choose(1 << 20) == "gzip"
+
+
+def test_policy_skips_loopback_and_small_requests():
+    """Test requests to agents on the same host and small requests are not compressed"""
+    assert make_policy("127.0.0.1").choose(1 << 20) is None
+    assert make_policy().choose(100) is None
+    assert CompressionPolicy(REMOTE_HOST).choose(1 << 20) is None
+
+
+def test_policy_adapts_to_payload_mix_and_throughput():
+    """Test compressed file data and fast links make compression not worth it"""
+    policy = make_policy()
+
+    assert policy.choose(10 << 20) == "gzip"
+    assert policy.choose(10 << 20, incompressible_bytes=10 << 20) is None
+
+    for _ in range(10):
+        policy.record_upload(1 << 30, 1.0)
+    assert policy.choose(10 << 20) is None
+
+
+async def test_transport_compresses_request_body():
+    """Test the transport sends a compressed body the agent can decompress"""
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["encoding"] = request.headers.get("content-encoding")
+        received["body"] = decompress(request.content, "gzip")
+        return httpx.Response(200)
+
+    policy = make_policy()
+    transport = CompressingTransport(httpx.MockTransport(handler), policy)
+    body = b"field work " * 1000
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.post(f"http://{REMOTE_HOST}/", content=body)
+
+    assert received == {"encoding": "gzip", "body": body}
+    assert policy.stats()["bytes_sent"] < policy.stats()["bytes_in"] == len(body)
+
+
+async def test_transport_uses_payload_mix():
+    """Test requests made of video data are sent as is"""
+    video = base64.b64encode(os.urandom(1 << 20)).decode("ascii")
+    payloads = [FileWithBytes(bytes=video, mime_type="video/mp4", name="video.mp4")]
+    policy = make_policy()
+    transport = CompressingTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200)), policy
+    )
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with payload_mix(payloads):
+            await client.post(f"http://{REMOTE_HOST}/", content=video.encode("ascii"))
+
+    assert policy.stats()["compressed"] == 0
+
+
+async def test_transport_does_not_compress_streamed_payloads(tmp_path):
+    """Test bodies with streamed payloads are passed on for the files to be spliced in"""
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"field work " * 1000)
+    payload = StreamedFileWithBytes.from_file(path, "text/plain")
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["encoding"] = request.headers.get("content-encoding")
+        received["body"] = request.content
+        return httpx.Response(200)
+
+    policy = make_policy()
+    transport = CompressingTransport(httpx.MockTransport(handler), policy)
+    body = f'{{"bytes": "{payload.bytes}"}}'.encode("ascii")
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.post(f"http://{REMOTE_HOST}/", content=body)
+
+    assert received == {"encoding": None, "body": body}
+
+
+def test_middleware_decompresses_request_body():
+    """Test the application receives the decompressed body"""
+
+    async def echo(request: Request) -> JSONResponse:
+        body = await request.body()
+        encoding = request.headers.get("content-encoding")
+        return JSONResponse({"length": len(body), "encoding": encoding})
+
+    app = Starlette(routes=[Route("/", echo, methods=["POST"])])
+    app.add_middleware(DecompressionMiddleware, max_size=1 << 20)
+    client = TestClient(app)
+    body = b"field work " * 1000
+
+    compressed = client.post("/", content=gzip.compress(body), headers={"Content-Encoding": "gzip"})
+    plain = client.post("/", content=body)
+    unsupported = client.post("/", content=body, headers={"Content-Encoding": "br"})
+    oversized = client.post(
+        "/", content=gzip.compress(b"a" * (2 << 20)), headers={"Content-Encoding": "gzip"}
+    )
+
+    assert compressed.json() == {"length": len(body), "encoding": None}
+    assert plain.json() == {"length": len(body), "encoding": None}
+    assert unsupported.status_code == 415
+    assert oversized.status_code == 400
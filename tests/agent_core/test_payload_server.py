@@ -0,0 +1,81 @@
+"""
+Tests for payload_server.py
+"""
+
+import base64
+
+from a2a.types import FileWithBytes, FileWithUri
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from fieldworkarena.agent_core.payload_server import PayloadServer
+from fieldworkarena.agent_core.streamed_payload import StreamedFileWithBytes
+
+
+def make_payload(name: str, content: bytes, mime_type: str = "video/mp4") -> FileWithBytes:
+    return FileWithBytes(
+        bytes=base64.b64encode(content).decode("utf-8"), mime_type=mime_type, name=name
+    )
+
+
+async def test_to_transport_uses_threshold():
+    """Test only payloads of at least the threshold size are sent by URI"""
+    server = PayloadServer("http://127.0.0.1:9009/")
+    small = make_payload("small.txt", b"a", mime_type="text/plain")
+    large = make_payload("large.mp4", b"a" * 100)
+
+    transport = await server.to_transport([small, large], uri_threshold_bytes=10)
+
+    assert transport[0] is small
+    assert isinstance(transport[1], FileWithUri)
+    assert transport[1].uri.startswith("http://127.0.0.1:9009/payloads/")
+    assert transport[1].mime_type == "video/mp4"
+    assert transport[1].name == "large.mp4"
+
+
+async def test_serves_registered_payload():
+    """Test the decoded payload is served at the URI"""
+    server = PayloadServer("http://testserver")
+    client = TestClient(Starlette(routes=server.routes()))
+    file = await server.register(make_payload("video.mp4", b"video content"))
+
+    response = client.get(file.uri)
+
+    assert response.status_code == 200
+    assert response.content == b"video content"
+    assert response.headers["content-type"] == "video/mp4"
+
+
+async def test_release_is_reference_counted():
+    """Test a payload shared by two tasks is served until both release it"""
+    server = PayloadServer("http://testserver")
+    client = TestClient(Starlette(routes=server.routes()))
+    payload = make_payload("video.mp4", b"video content")
+
+    first = await server.to_transport([payload], uri_threshold_bytes=0)
+    second = await server.to_transport([payload], uri_threshold_bytes=0)
+    assert first[0].uri == second[0].uri
+    assert len(server) == 1
+
+    server.release(first)
+    assert client.get(second[0].uri).status_code == 200
+
+    server.release(second)
+    assert client.get(second[0].uri).status_code == 404
+    assert len(server) == 0
+
+
+async def test_serves_streamed_payload_from_file(tmp_path):
+    """Test a streamed payload is served from its file"""
+    path = tmp_path / "video.mp4"
+    path.write_bytes(b"video content")
+    server = PayloadServer("http://testserver")
+    client = TestClient(Starlette(routes=server.routes()))
+    payload = StreamedFileWithBytes.from_file(path, "video/mp4")
+
+    transport = await server.to_transport([payload], uri_threshold_bytes=payload.encoded_size)
+    response = client.get(transport[0].uri)
+
+    assert response.status_code == 200
+    assert response.content == b"video content"
+    assert response.headers["content-type"] == "video/mp4"
@@ -0,0 +1,148 @@
+"""
+Tests for purple_client.py
+"""
+
+import asyncio
+from unittest.mock import patch
+
+from a2a.client import A2AClientHTTPError, A2AClientTimeoutError
+import httpx
+import pytest
+
+from fieldworkarena.agent_core.purple_client import PurpleClient, is_retryable_error
+
+PRIMARY_URL = "http://127.0.0.1:9019"
+REPLICA_URL = "http://127.0.0.1:9020"
+
+
+def chain(*errors: Exception) -> Exception:
+    """Chain the errors as the causes of the first one"""
+    for error, cause in zip(errors, errors[1:], strict=False):
+        error.__cause__ = cause
+    return errors[0]
+
+
+def transport_error(cause: Exception, status_code: int = 503) -> Exception:
+    """Build the error raised by send_message_with_file for a transport failure"""
+    return chain(
+        RuntimeError("Error communicating with agent"),
+        A2AClientHTTPError(status_code, str(cause)),
+        cause,
+    )
+
+
+class FakeAgents:
+    """Replaces send_message_with_file with scripted responses per URL"""
+
+    def __init__(self, delays: dict[str, float] | None = None, errors: list[Exception] = ()):
+        self.delays = delays or {}
+        self.errors = list(errors)
+        self.calls: list[tuple[str, str | None]] = []
+
+    async def __call__(self, *, base_url, context_id, **kwargs):
+        self.calls.append((base_url, context_id))
+        await asyncio.sleep(self.delays.get(base_url, 0))
+        if self.errors:
+            raise self.errors.pop(0)
+        return {
+            "response": f"answer of {base_url}",
+            "context_id": f"ctx-{base_url}",
+            "status": "completed",
+            "ttft": 0.0,
+            "latency": 0.0,
+        }
+
+
+@pytest.fixture
+def fake_agents():
+    agents = FakeAgents()
+    with patch("fieldworkarena.agent_core.purple_client.send_message_with_file", agents):
+        yield agents
+
+
+def test_is_retryable_error():
+    """Test only failures that did not deliver the message are retryable"""
+    assert is_retryable_error(transport_error(httpx.ConnectError("refused")))
+    assert is_retryable_error(transport_error(httpx.PoolTimeout("pool")))
+    assert is_retryable_error(transport_error(ValueError("unavailable"), status_code=503))
+    assert not is_retryable_error(transport_error(httpx.ReadError("reset")))
+    assert not is_retryable_error(transport_error(ValueError("server error"), status_code=500))
+    assert not is_retryable_error(
+        chain(RuntimeError("error"), A2AClientTimeoutError("timeout"), httpx.ReadTimeout("read"))
+    )
+    assert not is_retryable_error(RuntimeError("not completed"))
+
+
+async def test_retry_after_connect_error(fake_agents):
+    """Test a message is sent again after a connection failure"""
+    fake_agents.errors = [transport_error(httpx.ConnectError("refused"))]
+    client = PurpleClient(retry_backoff=0)
+
+    response = await client.send_message("hello", [], PRIMARY_URL)
+
+    assert response == f"answer of {PRIMARY_URL}"
+    assert len(fake_agents.calls) == 2
+    assert client.stats["retries"] == 1
+
+
+async def test_retries_are_bounded(fake_agents):
+    """Test the error is raised once the retries are exhausted"""
+    fake_agents.errors = [transport_error(httpx.ConnectError("refused")) for _ in range(3)]
+    client = PurpleClient(max_retries=2, retry_backoff=0)
+
+    with pytest.raises(RuntimeError):
+        await client.send_message("hello", [], PRIMARY_URL)
+    assert len(fake_agents.calls) == 3
+
+
+async def test_no_retry_after_delivery(fake_agents):
+    """Test a message that may have been delivered is not sent again"""
+    fake_agents.errors = [transport_error(httpx.ReadError("reset"))]
+    client = PurpleClient(retry_backoff=0)
+
+    with pytest.raises(RuntimeError):
+        await client.send_message("hello", [], PRIMARY_URL)
+    assert len(fake_agents.calls) == 1
+
+
+async def test_deadline(fake_agents):
+    """Test a response exceeding the deadline fails the message"""
+    fake_agents.delays = {PRIMARY_URL: 1}
+    client = PurpleClient(deadline=0.05)
+
+    with pytest.raises(RuntimeError, match="did not respond within"):
+        await client.send_message("hello", [], PRIMARY_URL)
+
+
+async def test_hedged_request_wins(fake_agents):
+    """Test a slow agent is hedged with its replica, which then holds the conversation"""
+    fake_agents.delays = {PRIMARY_URL: 1}
+    client = PurpleClient(hedge_urls={PRIMARY_URL: REPLICA_URL}, hedge_delay=0.01)
+
+    response = await client.send_message("hello", [], PRIMARY_URL)
+    fake_agents.delays = {}
+    await client.send_message("and then?", [], PRIMARY_URL)
+
+    assert response == f"answer of {REPLICA_URL}"
+    assert client.stats == {"retries": 0, "hedged": 1, "hedge_wins": 1}
+    assert fake_agents.calls[-1] == (REPLICA_URL, f"ctx-{REPLICA_URL}")
+
+
+async def test_fast_agent_is_not_hedged(fake_agents):
+    """Test no hedged request is sent when the agent responds before the hedge delay"""
+    client = PurpleClient(hedge_urls={PRIMARY_URL: REPLICA_URL}, hedge_delay=1)
+
+    response = await client.send_message("hello", [], PRIMARY_URL)
+
+    assert response == f"answer of {PRIMARY_URL}"
+    assert fake_agents.calls == [(PRIMARY_URL, None)]
+
+
+async def test_failed_agent_is_hedged_immediately(fake_agents):
+    """Test the replica is used without waiting for the hedge delay when the agent fails"""
+    fake_agents.errors = [RuntimeError("agent failed")]
+    client = PurpleClient(hedge_urls={PRIMARY_URL: REPLICA_URL}, hedge_delay=60)
+
+    response = await asyncio.wait_for(client.send_message("hello", [], PRIMARY_URL), 1)
+
+    assert response == f"answer of {REPLICA_URL}"
@@ -0,0 +1,82 @@
+"""
+Tests for replica_pool.py
+"""
+
+import pytest
+
+from fieldworkarena.agent_core.models import EvalRequest
+from fieldworkarena.agent_core.replica_pool import ReplicaPool
+
+REPLICA_A = "http://127.0.0.1:9019/"
+REPLICA_B = "http://127.0.0.1:9020/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_least_outstanding_requests():
+    """Test tasks go to the replica with the fewest outstanding requests"""
+    pool = ReplicaPool([REPLICA_A, REPLICA_B])
+
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first, ok=True, latency=1.0)
+    third = pool.acquire()
+
+    assert {first, second} == {REPLICA_A, REPLICA_B}
+    assert third == first
+
+
+def test_failing_replica_is_ejected():
+    """Test a replica failing max_failures times in a row is ejected until eject_seconds pass"""
+    clock = FakeClock()
+    pool = ReplicaPool([REPLICA_A, REPLICA_B], max_failures=2, eject_seconds=30, clock=clock)
+
+    for _ in range(2):
+        healthy, failing = pool.acquire(), pool.acquire()
+        pool.release(healthy, ok=True, latency=1.0)
+        pool.release(failing, ok=False)
+
+    assert failing == REPLICA_B
+    assert pool.stats()[REPLICA_B]["ejections"] == 1
+    assert [pool.acquire() for _ in range(3)] == [REPLICA_A] * 3
+
+    clock.now = 31
+    assert pool.acquire() == REPLICA_B
+
+
+def test_all_replicas_ejected():
+    """Test tasks are still distributed when every replica is ejected"""
+    pool = ReplicaPool([REPLICA_A], max_failures=1)
+
+    pool.release(pool.acquire(), ok=False)
+
+    assert pool.acquire() == REPLICA_A
+
+
+def test_stats():
+    """Test the request counts and latency statistics of each replica"""
+    pool = ReplicaPool([REPLICA_A, REPLICA_B])
+    for latency in (1.0, 2.0, 3.0):
+        pool.release(pool.acquire(), ok=True, latency=latency)
+
+    stats = pool.stats()
+
+    assert stats[REPLICA_A]["requests"] + stats[REPLICA_B]["requests"] == 3
+    assert sum(s.get("latency_mean", 0) * s["requests"] for s in stats.values()) == 6.0
+    assert "latency_p95" in stats[REPLICA_A]
+
+
+def test_eval_request_replicas():
+    """Test participants accept a single endpoint or a list of replica endpoints"""
+    req = EvalRequest(participants={"agent": [REPLICA_A, REPLICA_B], "judge": REPLICA_A}, config={})
+
+    assert req.replica_urls("agent") == [REPLICA_A, REPLICA_B]
+    assert req.replica_urls("judge") == [REPLICA_A]
+    with pytest.raises(ValueError):
+        EvalRequest(participants={"agent": []}, config={})
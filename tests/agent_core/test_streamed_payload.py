@@ -0,0 +1,118 @@
+"""
+Tests for streamed_payload.py
+"""
+
+import base64
+import gc
+import json
+import os
+
+from a2a.types import FilePart, Message, Part, Role, TextPart
+import httpx
+import pytest
+
+from fieldworkarena.agent_core.streamed_payload import (
+    ENCODE_CHUNK_SIZE,
+    StreamedFileWithBytes,
+    StreamedPayloadTransport,
+    _sources,
+    encoded_size,
+    has_streamed_payloads,
+)
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    # spans several chunks and ends with a partial one
+    path = tmp_path / "video.mp4"
+    path.write_bytes(os.urandom(2 * ENCODE_CHUNK_SIZE + 1000))
+    return path
+
+
+def test_iter_base64_matches_b64encode(video_file):
+    """Test the chunks concatenate to the Base64 data of the whole file"""
+    payload = StreamedFileWithBytes.from_file(video_file, "video/mp4")
+    expected = base64.b64encode(video_file.read_bytes())
+
+    chunks = list(payload.iter_base64())
+
+    assert len(chunks) == 3
+    assert b"".join(chunks) == expected
+    assert payload.encoded_size == encoded_size(payload) == len(expected)
+    assert payload.name == "video.mp4"
+
+
+def test_empty_file(tmp_path):
+    """Test an empty file has empty Base64 data"""
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    payload = StreamedFileWithBytes.from_file(path, "text/plain")
+
+    assert payload.read_base64() == ""
+    assert payload.encoded_size == 0
+
+
+def test_changed_file_is_rejected(video_file):
+    """Test a file modified after the payload was created is not sent truncated"""
+    payload = StreamedFileWithBytes.from_file(video_file, "video/mp4")
+    video_file.write_bytes(b"truncated")
+
+    with pytest.raises(RuntimeError, match="changed"):
+        payload.read_base64()
+
+
+def test_source_is_released_with_the_last_payload(video_file):
+    """Test the file of a streamed payload is forgotten once no payload of it is left"""
+    first = StreamedFileWithBytes.from_file(video_file, "video/mp4")
+    second = StreamedFileWithBytes.from_file(video_file, "video/mp4", "copy.mp4")
+    placeholder = first.bytes
+
+    del first
+    gc.collect()
+    assert second.read_base64() == base64.b64encode(video_file.read_bytes()).decode()
+
+    del second
+    gc.collect()
+    assert placeholder not in _sources
+
+
+async def test_transport_splices_file_into_body(video_file):
+    """Test the Base64 data of the file is sent in place of the placeholder"""
+    payload = StreamedFileWithBytes.from_file(video_file, "video/mp4")
+    message = Message(
+        role=Role.user,
+        message_id="1",
+        parts=[Part(TextPart(text="Describe the video")), Part(FilePart(file=payload))],
+    )
+    body = message.model_dump_json(exclude_none=True).encode("utf-8")
+    assert has_streamed_payloads(body)
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["length"] = int(request.headers["content-length"])
+        received["body"] = request.content
+        return httpx.Response(200)
+
+    transport = StreamedPayloadTransport(httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.post("http://purple.example.com/", content=body)
+
+    sent = json.loads(received["body"])
+    assert sent["parts"][1]["file"]["bytes"] == base64.b64encode(video_file.read_bytes()).decode()
+    assert sent["parts"][0]["text"] == "Describe the video"
+    assert received["length"] == len(received["body"])
+
+
+async def test_transport_passes_other_requests():
+    """Test requests without placeholders are sent unchanged"""
+    received = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received["body"] = request.content
+        return httpx.Response(200)
+
+    transport = StreamedPayloadTransport(httpx.MockTransport(handler))
+    async with httpx.AsyncClient(transport=transport) as client:
+        await client.post("http://purple.example.com/", content=b'{"bytes": "aGVsbG8="}')
+
+    assert received["body"] == b'{"bytes": "aGVsbG8="}'